@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: openzwave.aggregate
+
+This file is part of **python-openzwave** project https://github.com/bibi21000/python-openzwave.
+    :platform: Unix, Windows, MacOS X
+    :sinopsis: openzwave API
+
+.. moduleauthor: bibi21000 aka Sébastien GALLET <bibi21000@gmail.com>
+
+License : GPL(v3)
+
+**python-openzwave** is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+**python-openzwave** is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with python-openzwave. If not, see http://www.gnu.org/licenses.
+
+"""
+import logging
+import time
+
+logging.getLogger('openzwave').addHandler(logging.NullHandler())
+
+#The units of power and their factor to kWh when integrated over seconds
+POWER_UNITS = {'W': 3600000.0, 'kW': 3600.0}
+#The units of energy meters : the energy is the difference of the readings
+ENERGY_UNITS = ('kWh',)
+
+class ZWaveWindow(object):
+    """
+    The accumulators of a value over a fixed window of time (ie a minute, an hour).
+
+    Windows are aligned on the period (ie 12:00 to 13:00 for an hour).
+    Updating the accumulators is O(1). Only the current window
+    and the previous one are kept.
+
+    """
+
+    def __init__(self, period):
+        """
+        Initialize the window
+
+        :param period: The length of the window in seconds
+        :type period: int
+
+        """
+        self._period = period
+        self._start = None
+        self._previous = None
+
+    @property
+    def period(self):
+        """
+        The length of the window in seconds.
+
+        :rtype: int
+
+        """
+        return self._period
+
+    def _open(self, start, base):
+        """
+        Start a new window.
+
+        """
+        self._start = start
+        self._count = 0
+        self._total = 0.0
+        self._min = None
+        self._max = None
+        self._base = base
+        self._last = base
+        self._integral = 0.0
+
+    def _snapshot(self):
+        """
+        The accumulators of the current window as a dict.
+
+        """
+        return {'start': self._start,
+                'end': self._start + self._period,
+                'count': self._count,
+                'min': self._min,
+                'max': self._max,
+                'mean': self._total / self._count if self._count else None,
+                'first': self._base,
+                'last': self._last,
+                'integral': self._integral,
+                }
+
+    def update(self, timestamp, data, last_timestamp=None, last_data=None):
+        """
+        Add a sample to the window.
+
+        The integral over time uses the previous sample of the value : the
+        previous data is supposed constant until the new sample.
+
+        :param timestamp: The time of the sample
+        :type timestamp: float
+        :param data: The data of the sample
+        :type data: float
+        :param last_timestamp: The time of the previous sample of the value
+        :type last_timestamp: float
+        :param last_data: The data of the previous sample of the value
+        :type last_data: float
+
+        """
+        start = timestamp - timestamp % self._period
+        if self._start is None:
+            self._open(start, last_data)
+        elif start > self._start:
+            if last_timestamp is not None:
+                self._integral += last_data * (self._start + self._period - max(last_timestamp, self._start))
+            self._previous = self._snapshot()
+            self._open(start, last_data)
+        if last_timestamp is not None:
+            self._integral += last_data * (timestamp - max(last_timestamp, self._start))
+        self._count += 1
+        self._total += data
+        if self._min is None or data < self._min:
+            self._min = data
+        if self._max is None or data > self._max:
+            self._max = data
+        if self._base is None:
+            self._base = data
+        self._last = data
+
+    def current(self, now=None):
+        """
+        The accumulators of the current window.
+
+        :param now: The current time. Default to now
+        :type now: float
+        :return: A dict : {'start', 'end', 'count', 'min', 'max', 'mean', 'first', 'last', 'integral'} or None if no sample was received in the window
+        :rtype: dict()
+
+        """
+        if now is None:
+            now = time.time()
+        if self._start is None or now >= self._start + self._period:
+            return None
+        return self._snapshot()
+
+    def previous(self, now=None):
+        """
+        The accumulators of the last complete window.
+
+        :param now: The current time. Default to now
+        :type now: float
+        :return: A dict like current() or None
+        :rtype: dict()
+
+        """
+        if now is None:
+            now = time.time()
+        if self._start is None:
+            return None
+        if now >= self._start + self._period:
+            if now >= self._start + 2 * self._period:
+                return None
+            return self._snapshot()
+        if self._previous is not None and self._previous['end'] == self._start:
+            return self._previous
+        return None
+
+class ZWaveAggregate(object):
+    """
+    The windows of a value : per minute and per hour by default.
+
+    When the units of the value are a power (W, kW) or an energy (kWh),
+    the energy of the windows is computed in kWh.
+
+    """
+
+    def __init__(self, periods=(60, 3600), units=None):
+        """
+        Initialize the aggregate
+
+        :param periods: The length of the windows in seconds
+        :type periods: tuple()
+        :param units: The units of the value
+        :type units: str
+
+        """
+        self._windows = [ZWaveWindow(period) for period in periods]
+        self._units = units
+        self._last_timestamp = None
+        self._last_data = None
+
+    @property
+    def units(self):
+        """
+        The units of the value.
+
+        :rtype: str
+
+        """
+        return self._units
+
+    @property
+    def periods(self):
+        """
+        The length of the windows in seconds.
+
+        :rtype: list()
+
+        """
+        return [window.period for window in self._windows]
+
+    def update(self, timestamp, data):
+        """
+        Add a sample to all the windows.
+
+        :param timestamp: The time of the sample
+        :type timestamp: float
+        :param data: The data of the sample
+        :type data: float
+
+        """
+        if self._last_timestamp is not None and timestamp < self._last_timestamp:
+            logging.warning('Skip sample older than the last one for aggregate : %s < %s', timestamp, self._last_timestamp)
+            return
+        data = float(data)
+        for window in self._windows:
+            window.update(timestamp, data, self._last_timestamp, self._last_data)
+        self._last_timestamp = timestamp
+        self._last_data = data
+
+    def _energy(self, snapshot):
+        """
+        Add the energy in kWh to the accumulators of a window.
+
+        """
+        if snapshot is None:
+            return None
+        snapshot = dict(snapshot)
+        if self._units in POWER_UNITS:
+            snapshot['energy'] = snapshot['integral'] / POWER_UNITS[self._units]
+        elif self._units in ENERGY_UNITS and snapshot['first'] is not None:
+            snapshot['energy'] = snapshot['last'] - snapshot['first']
+        return snapshot
+
+    def to_dict(self, now=None):
+        """
+        The accumulators of the windows.
+
+        :param now: The current time. Default to now
+        :type now: float
+        :return: A dict : {period: {'current': {...}, 'previous': {...}}, ...}. Look at ZWaveWindow.current for the accumulators.
+            An 'energy' key (in kWh) is added for power and energy values.
+        :rtype: dict()
+
+        """
+        if now is None:
+            now = time.time()
+        return dict([(window.period, {'current': self._energy(window.current(now)), \
+            'previous': self._energy(window.previous(now))}) for window in self._windows])
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: openzwave.association
+
+This file is part of **python-openzwave** project https://github.com/bibi21000/python-openzwave.
+    :platform: Unix, Windows, MacOS X
+    :sinopsis: openzwave API
+
+.. moduleauthor: bibi21000 aka Sébastien GALLET <bibi21000@gmail.com>
+
+License : GPL(v3)
+
+**python-openzwave** is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+**python-openzwave** is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with python-openzwave. If not, see http://www.gnu.org/licenses.
+
+"""
+import logging
+import threading
+from .util import dispatcher
+
+logging.getLogger('openzwave').addHandler(logging.NullHandler())
+
+class ZWaveAssociations(object):
+    """
+    The associations of all the nodes of a network, with a reverse index
+    to find the nodes controlling a node.
+
+    The associations of a node are read from its groups when they are needed
+    and kept until a Group notification of the node. Only the nodes changed
+    are read again : the reverse lookups are dict lookups.
+
+    An association is a tuple (node_id, group_index, target_node_id).
+
+    """
+
+    def __init__(self, network):
+        """
+        Initialize the associations
+
+        :param network: The network
+        :type network: ZWaveNetwork
+
+        """
+        self._network = network
+        self._lock = threading.Lock()
+        self._forward = dict()
+        self._reverse = dict()
+        self._dirty = set()
+        self._loaded = False
+        self._refreshes = 0
+        dispatcher.connect(self._handle_node, network.SIGNAL_GROUP)
+        dispatcher.connect(self._handle_node, network.SIGNAL_NODE_ADDED)
+        dispatcher.connect(self._handle_node, network.SIGNAL_NODE_REMOVED)
+        dispatcher.connect(self._handle_node, network.SIGNAL_NODE_QUERIES_COMPLETE)
+
+    def __str__(self):
+        """
+        The string representation of the associations.
+
+        :rtype: str
+
+        """
+        return 'nodes: [%s] refreshes: [%s]' % \
+          (len(self._forward), self._refreshes)
+
+    def close(self):
+        """
+        Stop following the changes of the network.
+
+        """
+        dispatcher.disconnect(self._handle_node, self._network.SIGNAL_GROUP)
+        dispatcher.disconnect(self._handle_node, self._network.SIGNAL_NODE_ADDED)
+        dispatcher.disconnect(self._handle_node, self._network.SIGNAL_NODE_REMOVED)
+        dispatcher.disconnect(self._handle_node, self._network.SIGNAL_NODE_QUERIES_COMPLETE)
+        self.invalidate()
+
+    def _handle_node(self, network, node):
+        """
+        The receiver of the signals which may change the associations of a node.
+
+        """
+        if network is self._network:
+            self.invalidate(node.node_id)
+
+    def invalidate(self, node_id=None):
+        """
+        Forget the associations of a node. They will be read again when needed.
+
+        :param node_id: The node or None for all the nodes
+        :type node_id: int
+
+        """
+        with self._lock:
+            if node_id is None:
+                self._loaded = False
+                self._dirty.clear()
+            else:
+                self._dirty.add(node_id)
+
+    @property
+    def refreshes(self):
+        """
+        The number of times the associations of a node were read from its groups.
+
+        :rtype: int
+
+        """
+        return self._refreshes
+
+    def _read(self, node_id):
+        """
+        The associations of a node : {group_index: frozenset(targets)}, None if the node is gone.
+
+        """
+        nodes = self._network.nodes
+        if nodes is None or node_id not in nodes:
+            return None
+        return dict([(index, frozenset(group.associations)) \
+            for index, group in nodes[node_id].groups.items()])
+
+    def _unlink(self, node_id):
+        """
+        Remove the associations of a node from the indexes. Must be called with the lock held.
+
+        """
+        for index, targets in self._forward.pop(node_id, {}).items():
+            for target in targets:
+                sources = self._reverse.get(target, None)
+                if sources is not None:
+                    sources.discard((node_id, index))
+                    if len(sources) == 0:
+                        del(self._reverse[target])
+
+    def _load(self):
+        """
+        Read the associations of the nodes changed.
+
+        """
+        with self._lock:
+            if not self._loaded:
+                nodes = self._network.nodes
+                self._forward = dict()
+                self._reverse = dict()
+                self._dirty = set(nodes.keys()) if nodes is not None else set()
+                self._loaded = True
+            if len(self._dirty) == 0:
+                return
+            dirty, self._dirty = self._dirty, set()
+        read = dict([(node_id, self._read(node_id)) for node_id in dirty])
+        with self._lock:
+            self._refreshes += len(read)
+            for node_id, groups in read.items():
+                #Changed again while reading : it will be read at the next call
+                if node_id in self._dirty:
+                    continue
+                self._unlink(node_id)
+                if groups is None:
+                    continue
+                self._forward[node_id] = groups
+                for index, targets in groups.items():
+                    for target in targets:
+                        self._reverse.setdefault(target, set()).add((node_id, index))
+
+    def controllers(self, node_id):
+        """
+        The groups controlling a node : who sends commands to node_id.
+
+        :param node_id: The node controlled
+        :type node_id: int
+        :return: A set of (node_id, group_index)
+        :rtype: set()
+
+        """
+        self._load()
+        with self._lock:
+            return set(self._reverse.get(node_id, ()))
+
+    def controller_nodes(self, node_id):
+        """
+        The nodes controlling a node.
+
+        :param node_id: The node controlled
+        :type node_id: int
+        :rtype: set()
+
+        """
+        return set([source for source, index in self.controllers(node_id)])
+
+    def targets(self, node_id):
+        """
+        The nodes controlled by a node, by group.
+
+        :param node_id: The node controlling
+        :type node_id: int
+        :return: A dict {group_index: set(target_node_ids)}
+        :rtype: dict()
+
+        """
+        self._load()
+        with self._lock:
+            return dict([(index, set(targets)) for index, targets in \
+                self._forward.get(node_id, {}).items()])
+
+    def is_associated(self, node_id, target_node_id):
+        """
+        Does a node control another one in one of its groups.
+
+        :param node_id: The node controlling
+        :type node_id: int
+        :param target_node_id: The node controlled
+        :type target_node_id: int
+        :rtype: bool
+
+        """
+        self._load()
+        with self._lock:
+            for source, index in self._reverse.get(target_node_id, ()):
+                if source == node_id:
+                    return True
+        return False
+
+    def associations(self):
+        """
+        All the associations of the network.
+
+        :return: A sorted list of (node_id, group_index, target_node_id)
+        :rtype: list()
+
+        """
+        self._load()
+        with self._lock:
+            return sorted([(node_id, index, target) for node_id, groups in self._forward.items() \
+                for index, targets in groups.items() for target in targets])
+
+    def to_dict(self):
+        """
+        The associations as a dict, ready for json.
+
+        :return: A dict {'forward': {node_id: {group_index: [targets]}}, 'reverse': {node_id: [[node_id, group_index]]}}
+        :rtype: dict()
+
+        """
+        self._load()
+        with self._lock:
+            forward = dict([(node_id, dict([(index, sorted(targets)) for index, targets in groups.items()])) \
+                for node_id, groups in self._forward.items()])
+            reverse = dict([(target, sorted([list(source) for source in sources])) \
+                for target, sources in self._reverse.items()])
+        return {'forward': forward, 'reverse': reverse}
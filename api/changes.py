@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: openzwave.changes
+
+This file is part of **python-openzwave** project https://github.com/bibi21000/python-openzwave.
+    :platform: Unix, Windows, MacOS X
+    :sinopsis: openzwave API
+
+.. moduleauthor: bibi21000 aka Sébastien GALLET <bibi21000@gmail.com>
+
+License : GPL(v3)
+
+**python-openzwave** is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+**python-openzwave** is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with python-openzwave. If not, see http://www.gnu.org/licenses.
+
+"""
+import logging
+import time
+import threading
+import itertools
+from collections import deque
+
+logging.getLogger('openzwave').addHandler(logging.NullHandler())
+
+class ZWaveChangeLog(object):
+    """
+    A bounded log of the changes of nodes and values.
+
+    Every change gets a sequence number. The sequence numbers always
+    increase, so a client only needs to remember the last one it has seen
+    and ask for the changes since it.
+
+    When the log has wrapped (the changes asked for are not in the log anymore)
+    or when the network has been reset, the client must take a new snapshot
+    of the network : the reset flag of the result is set.
+
+    """
+
+    def __init__(self, size=2048):
+        """
+        Initialize the change log
+
+        :param size: The maximum number of changes kept in the log
+        :type size: int
+
+        """
+        self._lock = threading.Lock()
+        self._changes = deque(maxlen=size)
+        self._seq = 0
+        self._reset_seq = 0
+
+    @property
+    def size(self):
+        """
+        The maximum number of changes kept in the log.
+
+        :rtype: int
+
+        """
+        return self._changes.maxlen
+
+    @property
+    def seq(self):
+        """
+        The sequence number of the last change.
+
+        :rtype: int
+
+        """
+        return self._seq
+
+    def record(self, kind, node_id, value_id=None):
+        """
+        Add a change to the log.
+
+        :param kind: The kind of change. The notification type is used (ValueChanged, NodeAdded, ...)
+        :type kind: str
+        :param node_id: The node changed
+        :type node_id: int
+        :param value_id: The value changed or None for a change of the node
+        :type value_id: int
+        :return: The sequence number of the change
+        :rtype: int
+
+        """
+        with self._lock:
+            self._seq += 1
+            self._changes.append((self._seq, kind, node_id, value_id, time.time()))
+            return self._seq
+
+    def reset(self):
+        """
+        Clear the log. Clients will have to take a new snapshot.
+
+        :return: The sequence number of the reset
+        :rtype: int
+
+        """
+        with self._lock:
+            self._changes.clear()
+            self._seq += 1
+            self._reset_seq = self._seq
+            return self._seq
+
+    def since(self, seq, coalesce=True):
+        """
+        Retrieve the changes made after a sequence number.
+
+        :param seq: The last sequence number seen by the client. Use 0 for a new client.
+        :type seq: int
+        :param coalesce: Only keep the last change of each kind for a node or a value
+        :type coalesce: bool
+        :return: A dict : {'seq': last sequence number, 'reset': True if the client must take a new snapshot, 'changes': [change, ...]}.
+            A change is a dict : {'seq':..., 'kind':..., 'node_id':..., 'value_id':..., 'time':...}
+        :rtype: dict()
+
+        """
+        with self._lock:
+            current = self._seq
+            if seq >= current:
+                return {'seq': current, 'reset': seq > current, 'changes': []}
+            if len(self._changes) == 0:
+                first = current + 1
+            else:
+                first = self._changes[0][0]
+            if seq < self._reset_seq or seq < first - 1:
+                return {'seq': current, 'reset': True, 'changes': []}
+            entries = list(itertools.islice(self._changes, seq - first + 1, None))
+        if coalesce:
+            last = dict()
+            for entry in entries:
+                last[(entry[1], entry[2], entry[3])] = entry
+            entries = sorted(last.values())
+        changes = [{'seq': entry[0], 'kind': entry[1], 'node_id': entry[2], \
+            'value_id': entry[3], 'time': entry[4]} for entry in entries]
+        return {'seq': current, 'reset': False, 'changes': changes}
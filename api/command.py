@@ -255,7 +255,7 @@ class ZWaveNodeBasic(ZWaveNodeInterface):
         is_switch (label) : says if the value with label=label is a switch
         get_switch (label) : retrieve the value where label=label
     """
-
+    __slots__ = ()
 
     def get_battery_level(self, value_id=None):
         """
@@ -349,6 +349,7 @@ class ZWaveNodeSwitch(ZWaveNodeInterface):
     Represents an interface to switches and dimmers Commands
 
     """
+    __slots__ = ()
 
     def get_switches_all(self):
         """
@@ -557,6 +558,7 @@ class ZWaveNodeSensor(ZWaveNodeInterface):
     Represents an interface to Sensor Commands
 
     """
+    __slots__ = ()
 
     def get_sensors(self, type='All'):
         """
@@ -586,6 +588,68 @@ class ZWaveNodeSensor(ZWaveNodeInterface):
             readonly=True, writeonly=False))
         return values
 
+    def enable_sensors_aggregates(self, label=None, periods=(60, 3600)):
+        """
+        The command 0x31 (COMMAND_CLASS_SENSOR_MULTILEVEL) of this node.
+        The command 0x32 (COMMAND_CLASS_METER) of this node.
+        Aggregate the numeric sensors over windows of time.
+        Look at ZWaveValue.enable_aggregate.
+
+        :param label: Only the sensors with this label (ie Power, Temperature)
+        :type label: str
+        :param periods: The length of the windows in seconds
+        :type periods: tuple()
+        :return: The number of sensors aggregated
+        :rtype: int
+
+        """
+        ret = 0
+        for value in self._get_aggregable_sensors(label):
+            value.enable_aggregate(periods)
+            ret += 1
+        return ret
+
+    def get_sensors_aggregates(self, label=None, now=None):
+        """
+        The command 0x31 (COMMAND_CLASS_SENSOR_MULTILEVEL) of this node.
+        The command 0x32 (COMMAND_CLASS_METER) of this node.
+        Retrieve the aggregates of the sensors. No value nor sample is scanned :
+        the values with aggregates are registered by label in the node and
+        the accumulators are updated when the values change.
+
+        :param label: Only the sensors with this label (ie Power, Temperature)
+        :type label: str
+        :param now: The current time. Default to now
+        :type now: float
+        :return: A dict : {value_id: {'label', 'units', 'windows': ZWaveAggregate.to_dict()}}
+        :rtype: dict()
+
+        """
+        ret = dict()
+        for value in self._get_aggregated_values(label):
+            if value.aggregate is None:
+                continue
+            ret[value.value_id] = {'label': value.get_cached('label'), \
+                'units': value.aggregate.units, \
+                'windows': value.aggregate.to_dict(now)}
+        return ret
+
+    def _get_aggregable_sensors(self, label=None):
+        """
+        The numeric values of the commands 0x31 and 0x32.
+
+        """
+        ret = []
+        for class_id in (0x31, 0x32):
+            for value in self.get_values(class_id=class_id, genre='User', \
+                readonly=True, writeonly=False).values():
+                if (value.get_cached('type') or value.type) not in ('Byte', 'Short', 'Int', 'Decimal'):
+                    continue
+                if label is not None and (value.get_cached('label') or value.label) != label:
+                    continue
+                ret.append(value)
+        return ret
+
     def get_sensor_value(self, value_id):
         """
         The command 0x30 (COMMAND_CLASS_SENSOR_BINARY) of this node.
@@ -607,6 +671,7 @@ class ZWaveNodeSecurity(ZWaveNodeInterface):
     Represents an interface to Security Commands
 
     """
+    __slots__ = ()
 
     def get_protections(self):
         """
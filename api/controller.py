@@ -26,8 +26,11 @@ along with python-openzwave. If not, see http://www.gnu.org/licenses.
 """
 from .util import dispatcher
 import logging
+import threading
 import time
-from openzwave.object import ZWaveObject
+from collections import deque
+from openzwave.object import ZWaveObject, ZWaveException
+from openzwave.future import ZWaveFuture
 from libopenzwave import PyStatDriver
 
 logging.getLogger('openzwave').addHandler(logging.NullHandler())
@@ -127,6 +130,10 @@ class ZWaveController(ZWaveObject):
         self._library_type_name = None
         self._library_version = None
         self._python_library_version = None
+        self._command = None
+        self._starting = None
+        self._commands = deque()
+        self._commands_lock = threading.RLock()
 
     def __str__(self):
         """
@@ -429,12 +436,11 @@ class ZWaveController(ZWaveObject):
 
         :param node_id: Used only with the ReplaceFailedNode command, to specify the node that is going to be replaced.
         :type node_id: int
-        :return: True if the command was accepted and has started.
-        :rtype: bool
+        :return: The command, true if it was accepted and has started
+        :rtype: ZWaveControllerCommand
 
         """
-        return self._network.manager.beginControllerCommand(self._network.home_id, \
-            self.CMD_SENDNODEINFORMATION, self.zwcallback, nodeId=node_id)
+        return self._begin_command(self.CMD_SENDNODEINFORMATION, nodeId=node_id)
 
     def begin_command_replication_send(self, high_power = False):
         """
@@ -444,23 +450,21 @@ class ZWaveController(ZWaveObject):
         be physically close to the device for security reasons.  If _highPower is true, the controller will
         operate at normal power levels instead.  Defaults to false.
         :type high_power: bool
-        :return: True if the command was accepted and has started.
-        :rtype: bool
+        :return: The command, true if it was accepted and has started
+        :rtype: ZWaveControllerCommand
 
         """
-        return self._network.manager.beginControllerCommand(self._network.home_id, \
-            self.CMD_REPLICATIONSEND, self.zwcallback, highPower=high_power)
+        return self._begin_command(self.CMD_REPLICATIONSEND, highPower=high_power)
 
     def begin_command_request_network_update(self):
         """
         Update the controller with network information from the SUC/SIS.
 
-        :return: True if the command was accepted and has started.
-        :rtype: bool
+        :return: The command, true if it was accepted and has started
+        :rtype: ZWaveControllerCommand
 
         """
-        return self._network.manager.beginControllerCommand(self._network.home_id, \
-            self.CMD_REQUESTNETWORKUPDATE, self.zwcallback)
+        return self._begin_command(self.CMD_REQUESTNETWORKUPDATE)
 
     def begin_command_add_device(self, high_power = False):
         """
@@ -471,12 +475,11 @@ class ZWaveController(ZWaveObject):
         be physically close to the device for security reasons.  If _highPower is true, the controller will
         operate at normal power levels instead.  Defaults to false.
         :type high_power: bool
-        :return: True if the command was accepted and has started.
-        :rtype: bool
+        :return: The command, true if it was accepted and has started
+        :rtype: ZWaveControllerCommand
 
         """
-        return self._network.manager.beginControllerCommand(self._network.home_id, \
-            self.CMD_ADDDEVICE, self.zwcallback, highPower=high_power)
+        return self._begin_command(self.CMD_ADDDEVICE, highPower=high_power)
 
     def begin_command_remove_device(self, high_power = False):
         """
@@ -487,12 +490,11 @@ class ZWaveController(ZWaveObject):
         be physically close to the device for security reasons.  If _highPower is true, the controller will
         operate at normal power levels instead.  Defaults to false.
         :type high_power: bool
-        :return: True if the command was accepted and has started.
-        :rtype: bool
+        :return: The command, true if it was accepted and has started
+        :rtype: ZWaveControllerCommand
 
         """
-        return self._network.manager.beginControllerCommand(self._network.home_id, \
-            self.CMD_REMOVEDEVICE, self.zwcallback, highPower=high_power)
+        return self._begin_command(self.CMD_REMOVEDEVICE, highPower=high_power)
 
     def begin_command_remove_failed_node(self, node_id):
         """
@@ -503,12 +505,11 @@ class ZWaveController(ZWaveObject):
 
         :param node_id: Used only with the ReplaceFailedNode command, to specify the node that is going to be replaced.
         :type node_id: int
-        :return: True if the command was accepted and has started.
-        :rtype: bool
+        :return: The command, true if it was accepted and has started
+        :rtype: ZWaveControllerCommand
 
         """
-        return self._network.manager.beginControllerCommand(self._network.home_id, \
-            self.CMD_REMOVEFAILEDNODE, self.zwcallback, nodeId=node_id)
+        return self._begin_command(self.CMD_REMOVEFAILEDNODE, nodeId=node_id)
 
     def begin_command_has_node_failed(self, node_id):
         """
@@ -516,12 +517,11 @@ class ZWaveController(ZWaveObject):
 
         :param node_id: Used only with the ReplaceFailedNode command, to specify the node that is going to be replaced.
         :type node_id: int
-        :return: True if the command was accepted and has started.
-        :rtype: bool
+        :return: The command, true if it was accepted and has started
+        :rtype: ZWaveControllerCommand
 
         """
-        return self._network.manager.beginControllerCommand(self._network.home_id, \
-            self.CMD_HASNODEFAILED, self.zwcallback, nodeId=node_id)
+        return self._begin_command(self.CMD_HASNODEFAILED, nodeId=node_id)
 
     def begin_command_replace_failed_node(self, node_id):
         """
@@ -530,12 +530,11 @@ class ZWaveController(ZWaveObject):
 
         :param node_id: Used only with the ReplaceFailedNode command, to specify the node that is going to be replaced.
         :type node_id: int
-        :return: True if the command was accepted and has started.
-        :rtype: bool
+        :return: The command, true if it was accepted and has started
+        :rtype: ZWaveControllerCommand
 
         """
-        return self._network.manager.beginControllerCommand(self._network.home_id, \
-            self.CMD_REPLACEFAILEDNODE, self.zwcallback, nodeId=node_id)
+        return self._begin_command(self.CMD_REPLACEFAILEDNODE, nodeId=node_id)
 
     def begin_command_request_node_neigbhor_update(self, node_id):
         """
@@ -544,23 +543,21 @@ class ZWaveController(ZWaveObject):
 
         :param node_id: Used only with the ReplaceFailedNode command, to specify the node that is going to be replaced.
         :type node_id: int
-        :return: True if the command was accepted and has started.
-        :rtype: bool
+        :return: The command, true if it was accepted and has started
+        :rtype: ZWaveControllerCommand
 
         """
-        return self._network.manager.beginControllerCommand(self._network.home_id, \
-            self.CMD_REQUESTNODENEIGHBORUPDATE, self.zwcallback, nodeId=node_id)
+        return self._begin_command(self.CMD_REQUESTNODENEIGHBORUPDATE, nodeId=node_id)
 
     def begin_command_create_new_primary(self):
         """
         Add a new controller to the Z-Wave network. Used when old primary fails. Requires SUC.
 
-        :return: True if the command was accepted and has started.
-        :rtype: bool
+        :return: The command, true if it was accepted and has started
+        :rtype: ZWaveControllerCommand
 
         """
-        return self._network.manager.beginControllerCommand(self._network.home_id, \
-            self.CMD_CREATENEWPRIMARY, self.zwcallback)
+        return self._begin_command(self.CMD_CREATENEWPRIMARY)
 
     def begin_command_transfer_primary_role(self, high_power = False):
         """
@@ -572,23 +569,21 @@ class ZWaveController(ZWaveObject):
         be physically close to the device for security reasons.  If _highPower is true, the controller will
         operate at normal power levels instead.  Defaults to false.
         :type high_power: bool
-        :return: True if the command was accepted and has started.
-        :rtype: bool
+        :return: The command, true if it was accepted and has started
+        :rtype: ZWaveControllerCommand
 
         """
-        return self._network.manager.beginControllerCommand(self._network.home_id, \
-            self.CMD_TRANSFERPRIMARYROLE, self.zwcallback, highPower=high_power)
+        return self._begin_command(self.CMD_TRANSFERPRIMARYROLE, highPower=high_power)
 
     def begin_command_receive_configuration(self):
         """
         -
 
-        :return: True if the command was accepted and has started.
-        :rtype: bool
+        :return: The command, true if it was accepted and has started
+        :rtype: ZWaveControllerCommand
 
         """
-        return self._network.manager.beginControllerCommand(self._network.home_id, \
-            self.CMD_RECEIVECONFIGURATION, self.zwcallback)
+        return self._begin_command(self.CMD_RECEIVECONFIGURATION)
 
     def begin_command_assign_return_route(self, from_node_id, to_node_id):
         """
@@ -598,12 +593,11 @@ class ZWaveController(ZWaveObject):
         :type from_node_id: int
         :param to_node_id: The node that we will change the route
         :type to_node_id: int
-        :return: True if the command was accepted and has started.
-        :rtype: bool
+        :return: The command, true if it was accepted and has started
+        :rtype: ZWaveControllerCommand
 
         """
-        return self._network.manager.beginControllerCommand(self._network.home_id, \
-            self.CMD_ASSIGNRETURNROUTE, self.zwcallback, nodeId=from_node_id, arg=to_node_id)
+        return self._begin_command(self.CMD_ASSIGNRETURNROUTE, nodeId=from_node_id, arg=to_node_id)
 
     def begin_command_delete_all_return_routes(self, node_id):
         """
@@ -611,12 +605,11 @@ class ZWaveController(ZWaveObject):
 
         :param node_id: Used only with the ReplaceFailedNode command, to specify the node that is going to be replaced.
         :type node_id: int
-        :return: True if the command was accepted and has started.
-        :rtype: bool
+        :return: The command, true if it was accepted and has started
+        :rtype: ZWaveControllerCommand
 
         """
-        return self._network.manager.beginControllerCommand(self._network.home_id, \
-            self.CMD_DELETEALLRETURNROUTES, self.zwcallback, nodeId=node_id)
+        return self._begin_command(self.CMD_DELETEALLRETURNROUTES, nodeId=node_id)
 
     def begin_command_create_button(self, node_id, arg=0):
         """
@@ -626,12 +619,11 @@ class ZWaveController(ZWaveObject):
         :type node_id: int
         :param arg:
         :type arg: int
-        :return: True if the command was accepted and has started.
-        :rtype: bool
+        :return: The command, true if it was accepted and has started
+        :rtype: ZWaveControllerCommand
 
         """
-        return self._network.manager.beginControllerCommand(self._network.home_id, \
-            self.CMD_CREATEBUTTON, self.zwcallback, nodeId=node_id, arg=arg)
+        return self._begin_command(self.CMD_CREATEBUTTON, nodeId=node_id, arg=arg)
 
     def begin_command_delete_button(self, node_id, arg=0):
         """
@@ -641,12 +633,66 @@ class ZWaveController(ZWaveObject):
         :type node_id: int
         :param arg:
         :type arg: int
-        :return: True if the command was accepted and has started.
-        :rtype: bool
+        :return: The command, true if it was accepted and has started
+        :rtype: ZWaveControllerCommand
+
+        """
+        return self._begin_command(self.CMD_DELETEBUTTON, nodeId=node_id, arg=arg)
+
+    def _begin_command(self, command, **kwargs):
+        """
+        Start a command on the controller.
+
+        :param command: The command (CMD_*)
+        :type command: int
+        :param kwargs: The arguments of beginControllerCommand : highPower, nodeId, arg
+        :type kwargs: dict()
+        :return: The command, true if it was accepted and has started
+        :rtype: ZWaveControllerCommand
+
+        """
+        handle = ZWaveControllerCommand(self, command, kwargs)
+        #The library queues the commands : the states are reported to the
+        #oldest accepted one. The lock holds back the states reported by the
+        #driver thread until the handle is queued. The ones reported from this
+        #thread before beginControllerCommand returns go to the starting handle.
+        with self._commands_lock:
+            self._starting = handle
+            try:
+                accepted = self._network.manager.beginControllerCommand(self._network.home_id, \
+                    command, self.zwcallback, **kwargs)
+            finally:
+                self._starting = None
+            if accepted and not handle.done():
+                self._commands.append(handle)
+            if accepted:
+                self._command = handle
+        handle._started(accepted)
+        return handle
+
+    @property
+    def command(self):
+        """
+        The command currently running on the controller or, if none, the last one started, or None.
+
+        :rtype: ZWaveControllerCommand
+
+        """
+        with self._commands_lock:
+            if self._commands:
+                return self._commands[0]
+            return self._command
+
+    @property
+    def commands(self):
+        """
+        The accepted commands waiting for a final state, the running one first.
+
+        :rtype: list()
 
         """
-        return self._network.manager.beginControllerCommand(self._network.home_id, \
-            self.CMD_DELETEBUTTON, self.zwcallback, nodeId=node_id, arg=arg)
+        with self._commands_lock:
+            return list(self._commands)
 
     def cancel_command(self):
         """
@@ -669,8 +715,211 @@ class ZWaveController(ZWaveObject):
         logging.debug('Controller state change : %s' % (args))
         state = args['state']
         message = args['message']
+        with self._commands_lock:
+            if self._commands:
+                handle = self._commands[0]
+                if state in ZWaveControllerCommand.FINAL_STATES:
+                    self._commands.popleft()
+            else:
+                handle = self._starting
+        if handle is not None:
+            handle._update(state, message, args.get('error', None))
         if state == self.SIGNAL_CTRL_WAITING:
             dispatcher.send(self.SIGNAL_CTRL_WAITING, \
                 **{'state': state, 'message': message, 'network': self._network, 'controller': self})
         dispatcher.send(self.SIGNAL_CONTROLLER, \
             **{'state': state, 'message': message, 'network': self._network, 'controller': self})
+
+class ZWaveControllerCommand(ZWaveFuture):
+    """
+    A command started on the controller.
+
+    It is a future resolved with the final state of the command : Completed,
+    Failed, Error or Cancel (NodeOK or NodeFailed for HasNodeFailed).
+    Every state reported is kept with its time, to measure the duration of
+    inclusions, neighbor updates, ...
+
+    It is true when the command was accepted by the library, like the
+    boolean returned by the begin_command_* methods before.
+    A command refused by the library fails with a ZWaveException.
+
+    """
+    FINAL_STATES = (ZWaveController.SIGNAL_CTRL_COMPLETED, ZWaveController.SIGNAL_CTRL_FAILED, \
+        ZWaveController.SIGNAL_CTRL_ERROR, ZWaveController.SIGNAL_CTRL_CANCEL, \
+        ZWaveController.SIGNAL_CTRL_NODEOK, ZWaveController.SIGNAL_CTRL_NODEFAILED)
+
+    def __init__(self, controller, command, arguments=None):
+        """
+        Initialize the command
+
+        :param controller: The controller
+        :type controller: ZWaveController
+        :param command: The command (CMD_*)
+        :type command: int
+        :param arguments: The arguments of the command : highPower, nodeId, arg
+        :type arguments: dict()
+
+        """
+        ZWaveFuture.__init__(self)
+        self._controller = controller
+        self._cmd = command
+        self._arguments = arguments if arguments is not None else dict()
+        self._accepted = None
+        self._start = time.time()
+        self._end = None
+        self._states = []
+        self._error = None
+
+    def __str__(self):
+        """
+        The string representation of the command.
+
+        :rtype: str
+
+        """
+        return 'command: [%s] state: [%s] elapsed: [%.1f]' % \
+          (self._cmd, self.state, self.elapsed)
+
+    def __bool__(self):
+        """
+        Was the command accepted by the library.
+
+        :rtype: bool
+
+        """
+        return bool(self._accepted)
+
+    __nonzero__ = __bool__
+
+    @property
+    def command(self):
+        """
+        The command (CMD_*).
+
+        :rtype: int
+
+        """
+        return self._cmd
+
+    @property
+    def arguments(self):
+        """
+        The arguments of the command : highPower, nodeId, arg.
+
+        :rtype: dict()
+
+        """
+        return self._arguments
+
+    @property
+    def accepted(self):
+        """
+        Was the command accepted by the library. None while it is starting.
+
+        :rtype: bool
+
+        """
+        return self._accepted
+
+    @property
+    def state(self):
+        """
+        The last state reported or None.
+
+        :rtype: str
+
+        """
+        with self._condition:
+            return self._states[-1]['state'] if self._states else None
+
+    @property
+    def error(self):
+        """
+        The last error code reported by the library (PyControllerError index) or None.
+
+        :rtype: int
+
+        """
+        return self._error
+
+    @property
+    def states(self):
+        """
+        The states reported : [{'state':..., 'message':..., 'time':..., 'elapsed':...}].
+        elapsed is the time since the start of the command.
+
+        :rtype: list()
+
+        """
+        with self._condition:
+            return [dict(state) for state in self._states]
+
+    def timing(self, state):
+        """
+        The time between the start of the command and the first report of a state.
+
+        :param state: The state (ie 'InProgress')
+        :type state: str
+        :return: The time in seconds or None if the state was not reported
+        :rtype: float
+
+        """
+        with self._condition:
+            for entry in self._states:
+                if entry['state'] == state:
+                    return entry['elapsed']
+        return None
+
+    @property
+    def elapsed(self):
+        """
+        The duration of the command : up to its final state, or up to now when it's running.
+
+        :rtype: float
+
+        """
+        end = self._end if self._end is not None else time.time()
+        return end - self._start
+
+    def cancel(self):
+        """
+        Cancel the command on the controller, if it is still the running one.
+
+        :return: True if the cancel was sent
+        :rtype: bool
+
+        """
+        commands = self._controller.commands
+        if self.done() or not commands or commands[0] is not self:
+            return False
+        self._controller.cancel_command()
+        return True
+
+    def _started(self, accepted):
+        """
+        The library has answered to beginControllerCommand.
+
+        """
+        self._accepted = bool(accepted)
+        if not self._accepted and not self.done():
+            self._end = time.time()
+            self.set_exception(ZWaveException("Command %s refused by the library" % self._cmd))
+
+    def _update(self, state, message, error=None):
+        """
+        A state is reported by the controller.
+
+        """
+        now = time.time()
+        with self._condition:
+            if self._done:
+                return
+            self._states.append({'state': state, 'message': message, \
+                'time': now, 'elapsed': now - self._start})
+            if error:
+                self._error = error
+            final = state in self.FINAL_STATES
+            if final:
+                self._end = now
+        if final:
+            self.set_result(state)
@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: openzwave.fanout
+
+This file is part of **python-openzwave** project https://github.com/bibi21000/python-openzwave.
+    :platform: Unix, Windows, MacOS X
+    :sinopsis: openzwave API
+
+.. moduleauthor: bibi21000 aka Sébastien GALLET <bibi21000@gmail.com>
+
+License : GPL(v3)
+
+**python-openzwave** is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+**python-openzwave** is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with python-openzwave. If not, see http://www.gnu.org/licenses.
+
+"""
+import logging
+import time
+import threading
+from collections import OrderedDict
+from .util import dispatcher, robust_apply
+from openzwave.object import ZWaveException
+
+logging.getLogger('openzwave').addHandler(logging.NullHandler())
+
+class ZWaveSubscriber(object):
+    """
+    A subscriber to louie signals with its own bounded queue and delivery thread.
+
+    The signals are queued by the notification thread and delivered to the
+    receiver by the thread of the subscriber. A slow receiver only fills
+    its own queue : when the queue is full, the policy decides what is lost.
+
+    Policies :
+
+        * POLICY_DROP_OLDEST = 'drop_oldest' : the oldest signal in the queue is dropped.
+        * POLICY_DROP_NEWEST = 'drop_newest' : the new signal is dropped.
+        * POLICY_COALESCE = 'coalesce' : a signal replaces the queued one for the same node and value. The oldest signal is dropped when the queue is full.
+
+    The receiver is called like a louie receiver : with the named arguments
+    of the signal it accepts (signal, network, node, value, ...).
+
+    """
+    POLICY_DROP_OLDEST = 'drop_oldest'
+    POLICY_DROP_NEWEST = 'drop_newest'
+    POLICY_COALESCE = 'coalesce'
+
+    def __init__(self, receiver, signals, maxsize=256, policy='drop_oldest', name=None):
+        """
+        Initialize a subscriber
+
+        :param receiver: The function to call for each signal
+        :type receiver: callable
+        :param signals: The signals to receive
+        :type signals: list()
+        :param maxsize: The maximum number of signals in the queue
+        :type maxsize: int
+        :param policy: What to do when the queue is full : 'drop_oldest', 'drop_newest' or 'coalesce'
+        :type policy: str
+        :param name: The name of the subscriber, used in the statistics and the name of the thread
+        :type name: str
+
+        """
+        if policy not in (self.POLICY_DROP_OLDEST, self.POLICY_DROP_NEWEST, self.POLICY_COALESCE):
+            raise ZWaveException("Unknown policy %s" % policy)
+        self._receiver = receiver
+        self._signals = tuple(signals)
+        self._maxsize = maxsize
+        self._policy = policy
+        self._name = name if name is not None else getattr(receiver, '__name__', 'subscriber')
+        self._queue = OrderedDict()
+        self._condition = threading.Condition()
+        self._counter = 0
+        self._running = False
+        self._thread = None
+        self._received = 0
+        self._delivered = 0
+        self._dropped = 0
+        self._coalesced = 0
+        self._errors = 0
+        self._max_depth = 0
+        self._lag_last = 0.0
+        self._lag_max = 0.0
+        self._lag_total = 0.0
+
+    def __str__(self):
+        """
+        The string representation of the subscriber.
+
+        :rtype: str
+
+        """
+        return 'name: [%s] policy: [%s] queue: [%s/%s]' % \
+          (self._name, self._policy, len(self._queue), self._maxsize)
+
+    @property
+    def name(self):
+        """
+        The name of the subscriber.
+
+        :rtype: str
+
+        """
+        return self._name
+
+    @property
+    def signals(self):
+        """
+        The signals received by the subscriber.
+
+        :rtype: tuple()
+
+        """
+        return self._signals
+
+    @property
+    def policy(self):
+        """
+        The policy used when the queue is full.
+
+        :rtype: str
+
+        """
+        return self._policy
+
+    @property
+    def depth(self):
+        """
+        The number of signals waiting in the queue.
+
+        :rtype: int
+
+        """
+        return len(self._queue)
+
+    def start(self):
+        """
+        Start the delivery thread.
+
+        """
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name='ZWaveSubscriber-%s' % self._name)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """
+        Stop the delivery thread. Signals still in the queue are lost.
+
+        :param timeout: The time to wait for the thread
+        :type timeout: float
+
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def put(self, signal, named):
+        """
+        Queue a signal. Never blocks.
+
+        :param signal: The signal
+        :type signal: str
+        :param named: The named arguments of the signal
+        :type named: dict()
+        :return: False if the signal was dropped
+        :rtype: bool
+
+        """
+        with self._condition:
+            self._received += 1
+            if self._policy == self.POLICY_COALESCE:
+                key = (signal, getattr(named.get('node', None), 'node_id', None), \
+                    getattr(named.get('value', None), 'value_id', None))
+                if key in self._queue:
+                    first_time = self._queue[key][2]
+                    self._queue[key] = (signal, named, first_time)
+                    self._coalesced += 1
+                    return True
+            else:
+                self._counter += 1
+                key = self._counter
+            if len(self._queue) >= self._maxsize:
+                self._dropped += 1
+                if self._policy == self.POLICY_DROP_NEWEST:
+                    return False
+                self._queue.popitem(last=False)
+            self._queue[key] = (signal, named, time.time())
+            if len(self._queue) > self._max_depth:
+                self._max_depth = len(self._queue)
+            self._condition.notify()
+            return True
+
+    def _run(self):
+        """
+        The delivery loop.
+
+        """
+        while True:
+            with self._condition:
+                while self._running and len(self._queue) == 0:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                key, item = self._queue.popitem(last=False)
+            signal, named, queued = item
+            try:
+                robust_apply(self._receiver, signal=signal, **named)
+            except:
+                import sys, traceback
+                self._errors += 1
+                logging.error('Subscriber %s : %s' % (self._name, traceback.format_exception(*sys.exc_info())))
+            lag = time.time() - queued
+            self._delivered += 1
+            self._lag_last = lag
+            self._lag_total += lag
+            if lag > self._lag_max:
+                self._lag_max = lag
+
+    @property
+    def stats(self):
+        """
+        The statistics of the subscriber.
+
+            * received : number of signals received
+            * delivered : number of signals delivered to the receiver
+            * dropped : number of signals dropped because the queue was full
+            * coalesced : number of signals replaced by a newer one
+            * errors : number of exceptions raised by the receiver
+            * depth : number of signals in the queue
+            * max_depth : maximum number of signals in the queue
+            * lag_last : time in seconds between queuing and delivery of the last signal
+            * lag_max : maximum lag
+            * lag_avg : average lag
+
+        :rtype: dict()
+
+        """
+        return {'name': self._name,
+                'received': self._received,
+                'delivered': self._delivered,
+                'dropped': self._dropped,
+                'coalesced': self._coalesced,
+                'errors': self._errors,
+                'depth': len(self._queue),
+                'max_depth': self._max_depth,
+                'lag_last': self._lag_last,
+                'lag_max': self._lag_max,
+                'lag_avg': self._lag_total / self._delivered if self._delivered else 0.0,
+                }
+
+class ZWaveFanout(object):
+    """
+    Distribute the louie signals to the subscribers.
+
+    Only one receiver by signal is connected to the dispatcher. It copies
+    the signal in the queues of the subscribers, so the notification thread
+    never waits for a receiver. The signals of the other networks of the
+    process are dropped.
+
+    """
+
+    def __init__(self, network=None):
+        """
+        Initialize the fan-out
+
+        :param network: The network of the signals relayed. All the signals if None
+        :type network: ZWaveNetwork
+
+        """
+        self._network = network
+        self._lock = threading.Lock()
+        self._subscribers = dict()
+
+    @property
+    def subscribers(self):
+        """
+        The subscribers.
+
+        :rtype: list()
+
+        """
+        ret = []
+        with self._lock:
+            for subs in self._subscribers.values():
+                for subscriber in subs:
+                    if subscriber not in ret:
+                        ret.append(subscriber)
+        return ret
+
+    def subscribe(self, subscriber):
+        """
+        Add a subscriber and start its thread.
+
+        :param subscriber: The subscriber
+        :type subscriber: ZWaveSubscriber
+
+        """
+        with self._lock:
+            for signal in subscriber.signals:
+                if signal not in self._subscribers:
+                    self._subscribers[signal] = []
+                    dispatcher.connect(self._relay, signal)
+                self._subscribers[signal] = self._subscribers[signal] + [subscriber]
+        subscriber.start()
+
+    def unsubscribe(self, subscriber):
+        """
+        Remove a subscriber and stop its thread.
+
+        :param subscriber: The subscriber
+        :type subscriber: ZWaveSubscriber
+
+        """
+        with self._lock:
+            for signal in subscriber.signals:
+                if signal in self._subscribers:
+                    self._subscribers[signal] = [ sub for sub in self._subscribers[signal] if sub is not subscriber ]
+                    if len(self._subscribers[signal]) == 0:
+                        del(self._subscribers[signal])
+                        dispatcher.disconnect(self._relay, signal)
+        subscriber.stop()
+
+    def stop(self):
+        """
+        Remove all subscribers.
+
+        """
+        for subscriber in self.subscribers:
+            self.unsubscribe(subscriber)
+
+    def _relay(self, signal=None, sender=None, **named):
+        """
+        The receiver connected to the dispatcher.
+
+        """
+        if self._network is not None and named.get('network', self._network) is not self._network:
+            return
+        #Lists are replaced, never updated, so no lock is needed here
+        for subscriber in self._subscribers.get(signal, ()):
+            subscriber.put(signal, named)
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: openzwave.future
+
+This file is part of **python-openzwave** project https://github.com/bibi21000/python-openzwave.
+    :platform: Unix, Windows, MacOS X
+    :sinopsis: openzwave API
+
+.. moduleauthor: bibi21000 aka Sébastien GALLET <bibi21000@gmail.com>
+
+License : GPL(v3)
+
+**python-openzwave** is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+**python-openzwave** is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with python-openzwave. If not, see http://www.gnu.org/licenses.
+
+"""
+import logging
+import threading
+from openzwave.object import ZWaveException
+
+logging.getLogger('openzwave').addHandler(logging.NullHandler())
+
+class ZWaveFuture(object):
+    """
+    The result of a long running job of the network, set by another thread.
+
+    Wait for it with result(), register a callback with add_done_callback()
+    or await it in an asyncio coroutine (python 3).
+
+    """
+
+    def __init__(self):
+        """
+        Initialize the future
+
+        """
+        self._condition = threading.Condition()
+        self._done = False
+        self._result = None
+        self._exception = None
+        self._callbacks = []
+
+    def __str__(self):
+        """
+        The string representation of the future.
+
+        :rtype: str
+
+        """
+        if not self._done:
+            return 'state: [pending]'
+        if self._exception is not None:
+            return 'state: [failed] exception: [%s]' % self._exception
+        return 'state: [done]'
+
+    def done(self):
+        """
+        Is the result available.
+
+        :rtype: bool
+
+        """
+        return self._done
+
+    def wait(self, timeout=None):
+        """
+        Wait for the result.
+
+        :param timeout: The maximum time to wait in seconds. Wait forever if None
+        :type timeout: float
+        :return: True if the result is available
+        :rtype: bool
+
+        """
+        with self._condition:
+            if not self._done:
+                self._condition.wait(timeout)
+            return self._done
+
+    def result(self, timeout=None):
+        """
+        Wait for the result and return it.
+        The exception of the job is raised if it has failed.
+
+        :param timeout: The maximum time to wait in seconds. Wait forever if None
+        :type timeout: float
+        :rtype: variable
+
+        """
+        if not self.wait(timeout):
+            raise ZWaveException("Timeout while waiting for the result")
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def exception(self, timeout=None):
+        """
+        Wait for the result and return the exception of the job, None if it has not failed.
+
+        :param timeout: The maximum time to wait in seconds. Wait forever if None
+        :type timeout: float
+        :rtype: Exception
+
+        """
+        if not self.wait(timeout):
+            raise ZWaveException("Timeout while waiting for the result")
+        return self._exception
+
+    def add_done_callback(self, callback):
+        """
+        Call callback(future) when the result is available.
+        It is called at once if the result is already available.
+
+        :param callback: The function to call
+        :type callback: callable
+
+        """
+        with self._condition:
+            if not self._done:
+                self._callbacks.append(callback)
+                return
+        self._call(callback)
+
+    def __await__(self):
+        """
+        Wait for the result in an asyncio coroutine : result = await future.
+        Use asyncio.wait_for() for a timeout.
+
+        """
+        import asyncio
+        loop = asyncio.get_event_loop()
+        waiter = loop.create_future()
+
+        def _copy(future):
+            if waiter.cancelled():
+                return
+            if future._exception is not None:
+                waiter.set_exception(future._exception)
+            else:
+                waiter.set_result(future._result)
+
+        self.add_done_callback(lambda future: loop.call_soon_threadsafe(_copy, future))
+        return waiter.__await__()
+
+    def set_result(self, result):
+        """
+        Set the result and wake up the waiters. Used by the job.
+
+        :param result: The result
+        :type result: variable
+
+        """
+        self._set(result, None)
+
+    def set_exception(self, exception):
+        """
+        Set the exception of a failed job and wake up the waiters. Used by the job.
+
+        :param exception: The exception
+        :type exception: Exception
+
+        """
+        self._set(None, exception)
+
+    def _set(self, result, exception):
+        """
+        Set the result or the exception.
+
+        """
+        with self._condition:
+            if self._done:
+                raise ZWaveException("The result of the future is already set")
+            self._result = result
+            self._exception = exception
+            self._done = True
+            callbacks, self._callbacks = self._callbacks, []
+            self._condition.notify_all()
+        for callback in callbacks:
+            self._call(callback)
+
+    def _call(self, callback):
+        """
+        Call a callback, logging its exceptions.
+
+        """
+        try:
+            callback(self)
+        except:
+            import sys, traceback
+            logging.error('Future callback : %s' % (traceback.format_exception(*sys.exc_info())))
@@ -0,0 +1,833 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: openzwave.gateway
+
+This file is part of **python-openzwave** project https://github.com/bibi21000/python-openzwave.
+    :platform: Unix, Windows, MacOS X
+    :sinopsis: openzwave API
+
+.. moduleauthor: bibi21000 aka Sébastien GALLET <bibi21000@gmail.com>
+
+License : GPL(v3)
+
+**python-openzwave** is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+**python-openzwave** is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with python-openzwave. If not, see http://www.gnu.org/licenses.
+
+"""
+import os
+import sys
+import json
+import socket
+import struct
+import logging
+import threading
+import traceback
+from collections import deque
+from openzwave.object import ZWaveException
+from openzwave.network import ZWaveNetwork
+from openzwave.node import ZWaveNode
+from openzwave.value import ZWaveValue
+from openzwave.controller import ZWaveController
+
+logging.getLogger('openzwave').addHandler(logging.NullHandler())
+
+#A frame : the length of the json message, then the message
+FRAME = struct.Struct('>I')
+MAX_FRAME = 16 * 1024 * 1024
+DEFAULT_PATH = '/tmp/python-openzwave-gateway.sock'
+
+def _send_frame(sock, message):
+    """
+    Send a json message.
+
+    """
+    data = json.dumps(message, default=str).encode('utf-8')
+    sock.sendall(FRAME.pack(len(data)) + data)
+
+def _recv_exactly(sock, size):
+    """
+    Receive size bytes or None if the connection is closed.
+
+    """
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(min(size, 65536))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+def _recv_frame(sock):
+    """
+    Receive a json message or None if the connection is closed.
+
+    """
+    header = _recv_exactly(sock, FRAME.size)
+    if header is None:
+        return None
+    size = FRAME.unpack(header)[0]
+    if size > MAX_FRAME:
+        raise ZWaveException("Gateway frame too big : %s" % size)
+    data = _recv_exactly(sock, size)
+    if data is None:
+        return None
+    return json.loads(data.decode('utf-8'))
+
+def _encode(obj):
+    """
+    Convert the result of a call to json. Nodes, values and the controller
+    are sent as references, dicts with keys which are not strings as a list of items.
+
+    """
+    if isinstance(obj, ZWaveNode):
+        return {'__node__': obj.node_id}
+    if isinstance(obj, ZWaveValue):
+        return {'__value__': [obj.parent_id, obj.value_id]}
+    if isinstance(obj, ZWaveController):
+        return {'__controller__': obj.node_id}
+    if isinstance(obj, ZWaveNetwork):
+        return {'__network__': obj.home_id}
+    if isinstance(obj, dict):
+        if all([isinstance(key, str) for key in obj]):
+            return dict([(key, _encode(item)) for key, item in obj.items()])
+        return {'__items__': [[_encode(key), _encode(item)] for key, item in obj.items()]}
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return [_encode(item) for item in obj]
+    if isinstance(obj, bytes) and not isinstance(obj, str):
+        return obj.decode('utf-8', 'replace')
+    return obj
+
+class ZWaveGateway(object):
+    """
+    Serve a network to other processes on a local UNIX socket.
+
+    The process which owns the network runs the gateway. Clients send
+    batches of calls : every call of a batch is executed in order and the
+    results are sent back in one message. Each client can also subscribe
+    to signals : they are delivered through a ZWaveSubscriber of the network,
+    so a slow client only fills its own queue.
+
+    A call is a dict : {'target': target, 'op': 'get'|'set'|'call', 'name': name, 'args': [], 'kwargs': {}}
+    where target is ['network'], ['controller'], ['node', node_id] or ['value', node_id, value_id].
+    Only public attributes (not starting with _) can be used.
+
+    """
+
+    def __init__(self, network, path=None, maxsize=1024):
+        """
+        Initialize the gateway
+
+        :param network: The network to serve
+        :type network: ZWaveNetwork
+        :param path: The path of the socket. Use DEFAULT_PATH if None
+        :type path: str
+        :param maxsize: The size of the queue of signals of each client
+        :type maxsize: int
+
+        """
+        self._network = network
+        self._path = path if path is not None else DEFAULT_PATH
+        self._maxsize = maxsize
+        self._socket = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._connections = []
+        self._running = False
+
+    def __str__(self):
+        """
+        The string representation of the gateway.
+
+        :rtype: str
+
+        """
+        return 'path: [%s] clients: [%s]' % \
+          (self._path, len(self._connections))
+
+    @property
+    def path(self):
+        """
+        The path of the socket.
+
+        :rtype: str
+
+        """
+        return self._path
+
+    @property
+    def connections(self):
+        """
+        The number of connected clients.
+
+        :rtype: int
+
+        """
+        return len(self._connections)
+
+    def start(self):
+        """
+        Listen on the socket and start the accepting thread.
+
+        """
+        if self._running:
+            return
+        if os.path.exists(self._path):
+            os.remove(self._path)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.bind(self._path)
+        os.chmod(self._path, 0o660)
+        self._socket.listen(16)
+        self._running = True
+        self._thread = threading.Thread(target=self._accept, name='ZWaveGateway')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Close the socket and disconnect the clients.
+
+        """
+        if not self._running:
+            return
+        self._running = False
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+        self._socket.close()
+        for connection in list(self._connections):
+            connection.close()
+        if self._thread is not None:
+            self._thread.join(5.0)
+            self._thread = None
+        if os.path.exists(self._path):
+            os.remove(self._path)
+
+    def _accept(self):
+        """
+        The accepting loop.
+
+        """
+        while self._running:
+            try:
+                sock = self._socket.accept()[0]
+            except socket.error:
+                if self._running:
+                    logging.exception('Gateway : accept failed')
+                return
+            connection = _ZWaveGatewayConnection(self, sock)
+            with self._lock:
+                self._connections.append(connection)
+            connection.start()
+
+    def _remove(self, connection):
+        """
+        Forget a closed connection.
+
+        """
+        with self._lock:
+            if connection in self._connections:
+                self._connections.remove(connection)
+
+    def _target(self, target):
+        """
+        The object of a target.
+
+        """
+        kind = target[0]
+        if kind == 'network':
+            return self._network
+        if kind == 'controller':
+            return self._network.controller
+        if kind == 'node':
+            return self._network.nodes[target[1]]
+        if kind == 'value':
+            return self._network.nodes[target[1]].values[target[2]]
+        raise ZWaveException("Unknown gateway target %s" % target)
+
+    def execute(self, call):
+        """
+        Execute a call.
+
+        :param call: The call : {'target': target, 'op': 'get'|'set'|'call', 'name': name, 'args': [], 'kwargs': {}}
+        :type call: dict()
+        :return: {'result': result} or {'error': message}
+        :rtype: dict()
+
+        """
+        try:
+            name = call['name']
+            if name.startswith('_'):
+                raise ZWaveException("Attribute %s is private" % name)
+            obj = self._target(call['target'])
+            op = call.get('op', 'get')
+            if op == 'get':
+                result = getattr(obj, name)
+                if callable(result):
+                    result = {'__callable__': name}
+                else:
+                    result = _encode(result)
+            elif op == 'set':
+                setattr(obj, name, call['args'][0])
+                result = None
+            elif op == 'call':
+                result = _encode(getattr(obj, name)(*call.get('args', []), **call.get('kwargs', {})))
+            else:
+                raise ZWaveException("Unknown gateway operation %s" % op)
+            return {'result': result}
+        except Exception:
+            error = sys.exc_info()[1]
+            return {'error': '%s: %s' % (type(error).__name__, error)}
+
+class _ZWaveGatewayConnection(object):
+    """
+    A client of the gateway.
+
+    """
+
+    def __init__(self, gateway, sock):
+        """
+        Initialize the connection
+
+        """
+        self._gateway = gateway
+        self._socket = sock
+        self._send_lock = threading.Lock()
+        self._subscriber = None
+        self._thread = None
+        self._closed = False
+
+    def start(self):
+        """
+        Start the reading thread.
+
+        """
+        self._thread = threading.Thread(target=self._run, name='ZWaveGateway-client')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def close(self):
+        """
+        Unsubscribe and close the socket.
+
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._subscriber is not None:
+            self._gateway._network.unsubscribe(self._subscriber)
+            self._subscriber = None
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+        self._socket.close()
+        self._gateway._remove(self)
+
+    def _send(self, message):
+        """
+        Send a message. Replies and events are sent by different threads.
+
+        """
+        with self._send_lock:
+            _send_frame(self._socket, message)
+
+    def _send_event(self, signal, **named):
+        """
+        The receiver of the subscriber.
+
+        """
+        args = dict([(key, _encode(item)) for key, item in named.items() if key not in ('network', 'sender')])
+        try:
+            self._send({'event': signal, 'args': args})
+        except socket.error:
+            self.close()
+
+    def _subscribe(self, signals):
+        """
+        Replace the subscriber of the connection.
+
+        """
+        if self._subscriber is not None:
+            self._gateway._network.unsubscribe(self._subscriber)
+            self._subscriber = None
+        if len(signals) > 0:
+            self._subscriber = self._gateway._network.subscribe(self._send_event, signals, \
+                maxsize=self._gateway._maxsize, policy='drop_oldest', name='gateway')
+
+    def _run(self):
+        """
+        The reading loop.
+
+        """
+        try:
+            while not self._closed:
+                message = _recv_frame(self._socket)
+                if message is None:
+                    break
+                reply = {'id': message.get('id', None)}
+                if 'calls' in message:
+                    reply['results'] = [self._gateway.execute(call) for call in message['calls']]
+                elif 'subscribe' in message:
+                    self._subscribe(message['subscribe'])
+                    reply['results'] = [{'result': message['subscribe']}]
+                else:
+                    reply['results'] = [{'error': 'Unknown request'}]
+                self._send(reply)
+        except Exception:
+            if not self._closed:
+                logging.error('Gateway client : %s' % traceback.format_exception(*sys.exc_info()))
+        finally:
+            self.close()
+
+class ZWaveGatewayClient(object):
+    """
+    A client of a ZWaveGateway.
+
+    Calls are synchronous and thread safe. The signals subscribed to are
+    delivered to the receivers by a delivery thread : the reading thread
+    only reads the frames, so a receiver can call the gateway.
+
+    """
+
+    def __init__(self, path=None, timeout=10.0):
+        """
+        Initialize the client and connect to the gateway
+
+        :param path: The path of the socket. Use DEFAULT_PATH if None
+        :type path: str
+        :param timeout: The time to wait for a reply
+        :type timeout: float
+
+        """
+        self._path = path if path is not None else DEFAULT_PATH
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._counter = 0
+        self._pending = dict()
+        self._receivers = []
+        self._callables = dict()
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(self._path)
+        self._closed = False
+        self._events = deque()
+        self._events_condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='ZWaveGatewayClient')
+        self._thread.daemon = True
+        self._thread.start()
+        self._delivery = threading.Thread(target=self._run_delivery, name='ZWaveGatewayClient-events')
+        self._delivery.daemon = True
+        self._delivery.start()
+        self.network = ZWaveNetworkProxy(self)
+
+    def close(self):
+        """
+        Disconnect from the gateway.
+
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+        self._socket.close()
+        with self._lock:
+            for pending in self._pending.values():
+                pending[0].set()
+        with self._events_condition:
+            self._events_condition.notify_all()
+
+    def _request(self, message):
+        """
+        Send a request and wait for its reply.
+
+        """
+        if self._closed:
+            raise ZWaveException("Gateway client is closed")
+        event = threading.Event()
+        with self._lock:
+            self._counter += 1
+            message['id'] = self._counter
+            pending = [event, None]
+            self._pending[message['id']] = pending
+        try:
+            with self._send_lock:
+                _send_frame(self._socket, message)
+            if not event.wait(self._timeout) or pending[1] is None:
+                raise ZWaveException("No reply from gateway %s" % self._path)
+            return pending[1]['results']
+        finally:
+            with self._lock:
+                self._pending.pop(message['id'], None)
+
+    def execute(self, calls):
+        """
+        Execute a batch of calls in one round-trip.
+
+        :param calls: The calls. See ZWaveGateway
+        :type calls: list()
+        :return: The results : {'result': result} or {'error': message} for each call
+        :rtype: list()
+
+        """
+        results = self._request({'calls': calls})
+        return [self._decode_result(result) for result in results]
+
+    def call(self, target, op, name, args=None, kwargs=None):
+        """
+        Execute one call.
+
+        :param target: ['network'], ['controller'], ['node', node_id] or ['value', node_id, value_id]
+        :type target: list()
+        :param op: 'get', 'set' or 'call'
+        :type op: str
+        :param name: The name of the attribute or method
+        :type name: str
+        :param args: The arguments
+        :type args: list()
+        :param kwargs: The named arguments
+        :type kwargs: dict()
+        :return: The result
+        :rtype: variable
+
+        """
+        result = self.execute([{'target': target, 'op': op, 'name': name, \
+            'args': args or [], 'kwargs': kwargs or {}}])[0]
+        if 'error' in result:
+            raise ZWaveException(result['error'])
+        return result['result']
+
+    def batch(self):
+        """
+        Start a batch of calls.
+
+        :rtype: ZWaveGatewayBatch
+
+        """
+        return ZWaveGatewayBatch(self)
+
+    def subscribe(self, receiver, signals):
+        """
+        Receive signals from the gateway. The receiver is called with the
+        named arguments of the signal (signal, node, value, ...) : nodes
+        and values are proxies.
+
+        :param receiver: The function to call
+        :type receiver: callable
+        :param signals: The signals to receive
+        :type signals: list()
+
+        """
+        with self._lock:
+            self._receivers.append((receiver, tuple(signals)))
+        self._update_subscription()
+
+    def unsubscribe(self, receiver):
+        """
+        Stop receiving signals.
+
+        :param receiver: The function to remove
+        :type receiver: callable
+
+        """
+        with self._lock:
+            self._receivers = [rec for rec in self._receivers if rec[0] is not receiver]
+        self._update_subscription()
+
+    def _update_subscription(self):
+        """
+        Ask the gateway for the union of the signals of the receivers.
+
+        """
+        with self._lock:
+            signals = []
+            for receiver, sigs in self._receivers:
+                signals.extend([sig for sig in sigs if sig not in signals])
+        self._request({'subscribe': signals})
+
+    def _decode(self, obj):
+        """
+        Convert the references sent by the gateway to proxies.
+
+        """
+        if isinstance(obj, dict):
+            if '__node__' in obj:
+                return ZWaveNodeProxy(self, obj['__node__'])
+            if '__value__' in obj:
+                return ZWaveValueProxy(self, obj['__value__'][0], obj['__value__'][1])
+            if '__controller__' in obj:
+                return ZWaveProxy(self, ['controller'])
+            if '__network__' in obj:
+                return self.network
+            if '__items__' in obj:
+                return dict([(self._decode(key), self._decode(item)) for key, item in obj['__items__']])
+            return dict([(key, self._decode(item)) for key, item in obj.items()])
+        if isinstance(obj, list):
+            return [self._decode(item) for item in obj]
+        return obj
+
+    def _decode_result(self, result):
+        """
+        Decode the result of a call.
+
+        """
+        if 'result' in result:
+            return {'result': self._decode(result['result'])}
+        return result
+
+    def _run(self):
+        """
+        The reading loop : replies and events.
+
+        """
+        try:
+            while not self._closed:
+                message = _recv_frame(self._socket)
+                if message is None:
+                    break
+                if 'event' in message:
+                    with self._events_condition:
+                        self._events.append((message['event'], message['args']))
+                        self._events_condition.notify()
+                    continue
+                with self._lock:
+                    pending = self._pending.get(message['id'], None)
+                if pending is not None:
+                    pending[1] = message
+                    pending[0].set()
+        except Exception:
+            if not self._closed:
+                logging.error('Gateway client : %s' % traceback.format_exception(*sys.exc_info()))
+        finally:
+            self.close()
+
+    def _run_delivery(self):
+        """
+        The delivery loop of the events.
+
+        """
+        while True:
+            with self._events_condition:
+                while not self._closed and len(self._events) == 0:
+                    self._events_condition.wait()
+                if self._closed:
+                    return
+                signal, args = self._events.popleft()
+            self._deliver(signal, args)
+
+    def _deliver(self, signal, args):
+        """
+        Call the receivers of a signal.
+
+        """
+        named = self._decode(args)
+        for receiver, signals in list(self._receivers):
+            if signal not in signals:
+                continue
+            try:
+                receiver(signal=signal, **named)
+            except Exception:
+                logging.error('Gateway receiver : %s' % traceback.format_exception(*sys.exc_info()))
+
+class ZWaveGatewayBatch(object):
+    """
+    A batch of calls sent to the gateway in one round-trip.
+
+    """
+
+    def __init__(self, client):
+        """
+        Initialize the batch
+
+        :param client: The client
+        :type client: ZWaveGatewayClient
+
+        """
+        self._client = client
+        self._calls = []
+
+    def add(self, target, op, name, args=None, kwargs=None):
+        """
+        Add a call to the batch.
+
+        :return: The index of the result of the call
+        :rtype: int
+
+        """
+        self._calls.append({'target': target, 'op': op, 'name': name, \
+            'args': args or [], 'kwargs': kwargs or {}})
+        return len(self._calls) - 1
+
+    def get(self, proxy, name):
+        """
+        Add the read of an attribute of a proxy to the batch.
+
+        :rtype: int
+
+        """
+        return self.add(proxy._target, 'get', name)
+
+    def call(self, proxy, name, *args, **kwargs):
+        """
+        Add the call of a method of a proxy to the batch.
+
+        :rtype: int
+
+        """
+        return self.add(proxy._target, 'call', name, list(args), kwargs)
+
+    def execute(self):
+        """
+        Send the batch. Errors are raised as ZWaveException.
+
+        :return: The results, in the order of the calls
+        :rtype: list()
+
+        """
+        calls, self._calls = self._calls, []
+        if len(calls) == 0:
+            return []
+        ret = []
+        for result in self._client.execute(calls):
+            if 'error' in result:
+                raise ZWaveException(result['error'])
+            ret.append(result['result'])
+        return ret
+
+class ZWaveProxy(object):
+    """
+    Mirror an object of the network of the gateway.
+
+    Reading an attribute asks the gateway. Methods are called on the gateway
+    and the names of the methods are remembered, so calling a method takes
+    only one round-trip after the first time.
+
+    """
+
+    def __init__(self, client, target):
+        """
+        Initialize the proxy
+
+        :param client: The client
+        :type client: ZWaveGatewayClient
+        :param target: The target of the calls
+        :type target: list()
+
+        """
+        object.__setattr__(self, '_client', client)
+        object.__setattr__(self, '_target', target)
+
+    def __getattr__(self, name):
+        """
+        Read an attribute on the gateway.
+
+        """
+        if name.startswith('_'):
+            raise AttributeError(name)
+        callables = self._client._callables.setdefault(self._target[0], set())
+        if name not in callables:
+            result = self._client.execute([{'target': self._target, 'op': 'get', 'name': name}])[0]
+            if 'error' in result:
+                if result['error'].startswith('AttributeError'):
+                    raise AttributeError(result['error'])
+                raise ZWaveException(result['error'])
+            result = result['result']
+            if not isinstance(result, dict) or '__callable__' not in result:
+                return result
+            callables.add(name)
+        def method(*args, **kwargs):
+            return self._client.call(self._target, 'call', name, list(args), kwargs)
+        method.__name__ = str(name)
+        return method
+
+    def __setattr__(self, name, value):
+        """
+        Write an attribute on the gateway.
+
+        """
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        else:
+            self._client.call(self._target, 'set', name, [value])
+
+    def __eq__(self, other):
+        return isinstance(other, ZWaveProxy) and self._target == other._target
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(tuple(self._target))
+
+    def __repr__(self):
+        return '<%s %s>' % (self.__class__.__name__, self._target)
+
+class ZWaveNetworkProxy(ZWaveProxy):
+    """
+    Mirror the network of the gateway.
+
+    """
+
+    def __init__(self, client):
+        ZWaveProxy.__init__(self, client, ['network'])
+
+class ZWaveNodeProxy(ZWaveProxy):
+    """
+    Mirror a node of the network of the gateway.
+
+    """
+
+    def __init__(self, client, node_id):
+        ZWaveProxy.__init__(self, client, ['node', node_id])
+
+    @property
+    def node_id(self):
+        """
+        The id of the node (no round-trip).
+
+        :rtype: int
+
+        """
+        return self._target[1]
+
+class ZWaveValueProxy(ZWaveProxy):
+    """
+    Mirror a value of the network of the gateway.
+
+    """
+
+    def __init__(self, client, node_id, value_id):
+        ZWaveProxy.__init__(self, client, ['value', node_id, value_id])
+
+    @property
+    def parent_id(self):
+        """
+        The id of the node of the value (no round-trip).
+
+        :rtype: int
+
+        """
+        return self._target[1]
+
+    @property
+    def value_id(self):
+        """
+        The id of the value (no round-trip).
+
+        :rtype: int
+
+        """
+        return self._target[2]
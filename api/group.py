@@ -34,6 +34,7 @@ class ZWaveGroup(ZWaveObject):
     Hold options of the manager
     Also used to retrieve information about the library, ...
     """
+    __slots__ = ('_node_id', '_index', '_label', '_max_associations', '_associations')
 
     def __init__(self, group_index, network=None, node_id=None):
         """
@@ -52,6 +53,9 @@ class ZWaveGroup(ZWaveObject):
 
         self._node_id = node_id
         self._index = group_index
+        self._label = None
+        self._max_associations = None
+        self._associations = None
         #self._label = None
         #self.cache_property("self.label")
         #self._max_associations = set()
@@ -89,7 +93,9 @@ class ZWaveGroup(ZWaveObject):
         :rtype: int
 
         """
-        return self._network.manager.getGroupLabel(self.home_id, self._node_id, self.index).decode("UTF-8")
+        if self._label is None:
+            self._label = self._network.manager.getGroupLabel(self.home_id, self._node_id, self.index).decode("UTF-8")
+        return self._label
 
     @property
     def max_associations(self):
@@ -99,18 +105,33 @@ class ZWaveGroup(ZWaveObject):
         :rtype: int
 
         """
-        return self._network.manager.getMaxAssociations(self.home_id, self._node_id, self.index)
+        if self._max_associations is None:
+            self._max_associations = self._network.manager.getMaxAssociations(self.home_id, self._node_id, self.index)
+        return self._max_associations
 
 
     @property
     def associations(self):
         """
         The members of associations.
+        They are cached until the next Group notification of the node.
 
         :rtype: set()
 
         """
-        return self._network.manager.getAssociations(self.home_id, self._node_id, self.index)
+        if self._associations is None:
+            self._associations = frozenset(self._network.manager.getAssociations(self.home_id, self._node_id, self.index))
+        return set(self._associations)
+
+    def invalidate(self):
+        """
+        Forget the cached label and associations. Called by the network
+        on the Group notifications of the node.
+
+        """
+        self._label = None
+        self._max_associations = None
+        self._associations = None
 
     def add_association(self, target_node_id):
         """
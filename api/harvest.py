@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: openzwave.harvest
+
+This file is part of **python-openzwave** project https://github.com/bibi21000/python-openzwave.
+    :platform: Unix, Windows, MacOS X
+    :sinopsis: openzwave API
+
+.. moduleauthor: bibi21000 aka Sébastien GALLET <bibi21000@gmail.com>
+
+License : GPL(v3)
+
+**python-openzwave** is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+**python-openzwave** is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with python-openzwave. If not, see http://www.gnu.org/licenses.
+
+"""
+import logging
+import time
+import threading
+from collections import deque, OrderedDict
+from .util import dispatcher
+from openzwave.object import ZWaveException
+from openzwave.future import ZWaveFuture
+
+logging.getLogger('openzwave').addHandler(logging.NullHandler())
+
+#The notification code (PyNotificationCodes) of a node waking up
+CODE_AWAKE = 3
+
+COMMAND_CLASS_CONFIGURATION = 0x70
+
+class ZWaveConfigHarvester(object):
+    """
+    Fetch the configuration parameters of many nodes, a few nodes at a time.
+
+    The parameters of a node are requested when there is room for it
+    (max_in_flight). A sleeping node is put aside until its Awake notification.
+    A node is done when all the parameters expected have been reported
+    (the ones asked for or, by default, the configuration values known for the node),
+    or after settle_time without report when no parameter is known. It is given up
+    after node_timeout, keeping the parameters already reported.
+
+    The future of the harvester is resolved with the parameters reported :
+    {node_id: {param: data}}, when all the nodes are finished or after timeout.
+
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SLEEPING = 'sleeping'
+    STATUS_FETCHING = 'fetching'
+    STATUS_DONE = 'done'
+    STATUS_TIMEOUT = 'timeout'
+    STATUS_SKIPPED = 'skipped'
+
+    def __init__(self, network, node_ids=None, params=None, max_in_flight=2, \
+            settle_time=5.0, node_timeout=60.0, timeout=None, interval=0.5):
+        """
+        Initialize the harvester
+
+        :param network: The network
+        :type network: ZWaveNetwork
+        :param node_ids: The nodes to fetch. All the nodes but the controller if None
+        :type node_ids: list()
+        :param params: The parameters to fetch. All the parameters of the nodes if None
+        :type params: list()
+        :param max_in_flight: The maximum number of nodes fetched at the same time
+        :type max_in_flight: int
+        :param settle_time: The time without report after which a node with no known parameter is done
+        :type settle_time: float
+        :param node_timeout: The time after which an awake node is given up
+        :type node_timeout: float
+        :param timeout: The time after which the harvest is given up, sleeping nodes included. Never if None
+        :type timeout: float
+        :param interval: The time between two checks of the nodes
+        :type interval: float
+
+        """
+        if max_in_flight < 1:
+            raise ZWaveException("max_in_flight must be at least 1")
+        self._network = network
+        if node_ids is None:
+            node_ids = [node_id for node_id in sorted(network.nodes.keys()) \
+                if node_id != network.controller.node_id]
+        self._params = list(params) if params is not None else None
+        self._max_in_flight = max_in_flight
+        self._settle_time = settle_time
+        self._node_timeout = node_timeout
+        self._timeout = timeout
+        self._interval = interval
+        self._condition = threading.Condition()
+        self._nodes = OrderedDict([(node_id, {'status': self.STATUS_PENDING, \
+            'start': None, 'duration': None, 'expected': None}) for node_id in node_ids])
+        self._results = dict([(node_id, dict()) for node_id in node_ids])
+        self._pending = deque(node_ids)
+        self._asleep = set()
+        self._in_flight = dict()
+        self._running = False
+        self._thread = None
+        self._start = None
+        self._duration = None
+        self._future = ZWaveFuture()
+
+    def __str__(self):
+        """
+        The string representation of the harvester.
+
+        :rtype: str
+
+        """
+        progress = self.progress
+        return 'state: [%s] nodes: [%s/%s]' % \
+          (progress['state'], progress['done'], progress['total'])
+
+    @property
+    def future(self):
+        """
+        The future resolved with the parameters reported : {node_id: {param: data}}.
+
+        :rtype: ZWaveFuture
+
+        """
+        return self._future
+
+    def start(self):
+        """
+        Start fetching in a thread.
+
+        """
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._start = time.time()
+        dispatcher.connect(self._handle_value, self._network.SIGNAL_VALUE_CHANGED)
+        dispatcher.connect(self._handle_value, self._network.SIGNAL_VALUE_REFRESHED)
+        dispatcher.connect(self._handle_notification, self._network.SIGNAL_NOTIFICATION)
+        self._thread = threading.Thread(target=self._run, name='ZWaveConfigHarvester')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """
+        Stop fetching. The future is resolved with the parameters already reported.
+
+        :param timeout: The time to wait for the thread
+        :type timeout: float
+
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    @property
+    def is_running(self):
+        """
+        Is the harvester fetching.
+
+        :rtype: bool
+
+        """
+        return self._running
+
+    @property
+    def progress(self):
+        """
+        The progress of the harvest.
+
+            * state : 'running' or 'stopped'
+            * total : number of nodes to fetch
+            * done : number of nodes finished (whatever their status)
+            * in_flight : the nodes fetched now
+            * sleeping : the nodes waiting for their wake up
+            * elapsed : time since the start
+            * nodes : {node_id: {'status':..., 'start':..., 'duration':..., 'expected':..., 'received':...}}
+
+        :rtype: dict()
+
+        """
+        with self._condition:
+            nodes = dict()
+            for node_id, info in self._nodes.items():
+                nodes[node_id] = dict(info)
+                nodes[node_id]['received'] = len(self._results[node_id])
+            in_flight = sorted(self._in_flight.keys())
+            sleeping = sorted(self._asleep)
+            state = 'running' if self._running else 'stopped'
+        done = len([info for info in nodes.values() if info['status'] in \
+            (self.STATUS_DONE, self.STATUS_TIMEOUT, self.STATUS_SKIPPED)])
+        if self._duration is not None:
+            elapsed = self._duration
+        else:
+            elapsed = time.time() - self._start if self._start is not None else 0.0
+        return {'state': state,
+                'total': len(nodes),
+                'done': done,
+                'in_flight': in_flight,
+                'sleeping': sleeping,
+                'elapsed': elapsed,
+                'nodes': nodes,
+                }
+
+    def _is_config(self, value):
+        """
+        Is the value a configuration parameter.
+
+        """
+        command_class = value.get_cached('commandClass')
+        if command_class is None:
+            return value.command_class == COMMAND_CLASS_CONFIGURATION
+        return command_class == self._network.manager.COMMAND_CLASS_DESC[COMMAND_CLASS_CONFIGURATION]
+
+    def _handle_value(self, network, node, value):
+        """
+        The receiver of the ValueChanged and ValueRefreshed signals.
+
+        """
+        if network is not self._network or node.node_id not in self._results:
+            return
+        if not self._is_config(value):
+            return
+        index = value.get_cached('index')
+        if index is None:
+            index = value.index
+        with self._condition:
+            self._results[node.node_id][index] = value.get_cached('value')
+            if node.node_id in self._in_flight:
+                self._in_flight[node.node_id] = time.time()
+            self._condition.notify_all()
+
+    def _handle_notification(self, network, args):
+        """
+        The receiver of the notifications : wake up of the sleeping nodes.
+
+        """
+        if network is not self._network or args.get('notificationCode', None) != CODE_AWAKE:
+            return
+        node_id = args.get('nodeId', None)
+        with self._condition:
+            if node_id in self._asleep:
+                logging.debug('Harvest node %s : awake' % node_id)
+                self._asleep.discard(node_id)
+                self._nodes[node_id]['status'] = self.STATUS_PENDING
+                self._pending.appendleft(node_id)
+                self._condition.notify_all()
+
+    def _expected(self, node):
+        """
+        The parameters expected for a node.
+
+        """
+        if self._params is not None:
+            return set(self._params)
+        ret = set()
+        for value in list(node.values.values()):
+            if self._is_config(value):
+                index = value.get_cached('index')
+                ret.add(index if index is not None else value.index)
+        return ret
+
+    def _request(self, node):
+        """
+        Request the parameters of a node.
+
+        """
+        if self._params is None:
+            node.request_all_config_params()
+        else:
+            for param in self._params:
+                node.request_config_param(param)
+
+    def _finish(self, node_id, status, now):
+        """
+        A node is finished. Must be called with the condition held.
+
+        """
+        self._in_flight.pop(node_id, None)
+        info = self._nodes[node_id]
+        info['status'] = status
+        if info['start'] is not None:
+            info['duration'] = now - info['start']
+        logging.debug('Harvest node %s : %s' % (node_id, status))
+
+    def _run(self):
+        """
+        The scheduling loop.
+
+        """
+        while True:
+            with self._condition:
+                if not self._running:
+                    break
+                now = time.time()
+                if self._timeout is not None and now - self._start >= self._timeout:
+                    break
+                for node_id, last in list(self._in_flight.items()):
+                    info = self._nodes[node_id]
+                    expected = info['expected']
+                    if expected and expected <= set(self._results[node_id].keys()):
+                        self._finish(node_id, self.STATUS_DONE, now)
+                    elif not expected and now - last >= self._settle_time:
+                        self._finish(node_id, self.STATUS_DONE, now)
+                    elif now - info['start'] >= self._node_timeout:
+                        self._finish(node_id, self.STATUS_TIMEOUT, now)
+                while self._pending and len(self._in_flight) < self._max_in_flight:
+                    node_id = self._pending.popleft()
+                    if self._network.nodes is None or node_id not in self._network.nodes:
+                        self._finish(node_id, self.STATUS_SKIPPED, now)
+                        continue
+                    node = self._network.nodes[node_id]
+                    if node.is_sleeping:
+                        self._nodes[node_id]['status'] = self.STATUS_SLEEPING
+                        self._asleep.add(node_id)
+                        continue
+                    self._nodes[node_id]['status'] = self.STATUS_FETCHING
+                    self._nodes[node_id]['start'] = now
+                    self._nodes[node_id]['expected'] = self._expected(node)
+                    self._in_flight[node_id] = now
+                    self._request(node)
+                if not self._pending and not self._in_flight and not self._asleep:
+                    break
+                self._condition.wait(self._interval)
+        dispatcher.disconnect(self._handle_value, self._network.SIGNAL_VALUE_CHANGED)
+        dispatcher.disconnect(self._handle_value, self._network.SIGNAL_VALUE_REFRESHED)
+        dispatcher.disconnect(self._handle_notification, self._network.SIGNAL_NOTIFICATION)
+        with self._condition:
+            now = time.time()
+            for node_id in list(self._in_flight.keys()) + list(self._asleep) + list(self._pending):
+                self._finish(node_id, self.STATUS_TIMEOUT, now)
+            self._asleep.clear()
+            self._pending.clear()
+            self._running = False
+            self._duration = now - self._start
+            results = dict([(node_id, dict(params)) for node_id, params in self._results.items()])
+        self._future.set_result(results)
@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: openzwave.heal
+
+This file is part of **python-openzwave** project https://github.com/bibi21000/python-openzwave.
+    :platform: Unix, Windows, MacOS X
+    :sinopsis: openzwave API
+
+.. moduleauthor: bibi21000 aka Sébastien GALLET <bibi21000@gmail.com>
+
+License : GPL(v3)
+
+**python-openzwave** is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+**python-openzwave** is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with python-openzwave. If not, see http://www.gnu.org/licenses.
+
+"""
+import logging
+import time
+import threading
+from collections import deque, OrderedDict
+from .util import dispatcher
+from openzwave.object import ZWaveException
+
+logging.getLogger('openzwave').addHandler(logging.NullHandler())
+
+#The notification codes (PyNotificationCodes) used by the scheduler
+CODE_TIMEOUT = 1
+CODE_DEAD = 5
+
+class ZWaveHealScheduler(object):
+    """
+    Heal the nodes of a network a few at a time, instead of healing all of
+    them at once like healNetwork.
+
+    A node is healed when there is room for it (max_in_flight) and when
+    the send queue of the controller is short (queue_threshold) : user
+    commands waiting in the queue go first.
+    The node is healed with controller commands, one after the other :
+    RequestNodeNeighborUpdate then, with upNodeRoute, DeleteAllReturnRoutes
+    and AssignReturnRoute to the controller. A node is done when its last
+    command is Completed. It fails when one of its commands doesn't
+    complete, when a Timeout or Dead notification is received for it, or
+    after node_timeout.
+
+    Signals sent with louie :
+
+        * SIGNAL_HEAL_NODE_DONE = 'HealNodeDone' : network, node_id, status, duration
+        * SIGNAL_HEAL_DONE = 'HealDone' : network, progress
+
+    """
+    SIGNAL_HEAL_NODE_DONE = 'HealNodeDone'
+    SIGNAL_HEAL_DONE = 'HealDone'
+
+    STATUS_PENDING = 'pending'
+    STATUS_HEALING = 'healing'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_TIMEOUT = 'timeout'
+    STATUS_SKIPPED = 'skipped'
+
+    def __init__(self, network, node_ids=None, upNodeRoute=False, max_in_flight=1, \
+            queue_threshold=0, node_timeout=120.0, interval=0.5):
+        """
+        Initialize the scheduler
+
+        :param network: The network
+        :type network: ZWaveNetwork
+        :param node_ids: The nodes to heal. All the nodes but the controller if None
+        :type node_ids: list()
+        :param upNodeRoute: Whether to perform return routes initialization
+        :type upNodeRoute: bool
+        :param max_in_flight: The maximum number of nodes healed at the same time
+        :type max_in_flight: int
+        :param queue_threshold: A node is started only when the send queue is not longer than this
+        :type queue_threshold: int
+        :param node_timeout: The time after which a node is given up
+        :type node_timeout: float
+        :param interval: The time between two checks of the send queue
+        :type interval: float
+
+        """
+        if max_in_flight < 1:
+            raise ZWaveException("max_in_flight must be at least 1")
+        self._network = network
+        if node_ids is None:
+            node_ids = [node_id for node_id in sorted(network.nodes.keys()) \
+                if node_id != network.controller.node_id]
+        self._up_node_route = upNodeRoute
+        self._max_in_flight = max_in_flight
+        self._queue_threshold = queue_threshold
+        self._node_timeout = node_timeout
+        self._interval = interval
+        self._condition = threading.Condition()
+        self._nodes = OrderedDict([(node_id, {'status': self.STATUS_PENDING, \
+            'start': None, 'duration': None}) for node_id in node_ids])
+        self._pending = deque(node_ids)
+        self._in_flight = dict()
+        self._signals = []
+        self._paused = False
+        self._running = False
+        self._thread = None
+        self._start = None
+        self._duration = None
+
+    def __str__(self):
+        """
+        The string representation of the scheduler.
+
+        :rtype: str
+
+        """
+        progress = self.progress
+        return 'state: [%s] nodes: [%s/%s]' % \
+          (progress['state'], progress['done'], progress['total'])
+
+    def start(self):
+        """
+        Start healing in a thread.
+
+        """
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._start = time.time()
+        dispatcher.connect(self._handle_notification, self._network.SIGNAL_NOTIFICATION)
+        self._thread = threading.Thread(target=self._run, name='ZWaveHealScheduler')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """
+        Stop healing. The nodes already started are not stopped by the library.
+
+        :param timeout: The time to wait for the thread
+        :type timeout: float
+
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def pause(self):
+        """
+        Don't start new nodes until resume is called.
+
+        """
+        with self._condition:
+            self._paused = True
+
+    def resume(self):
+        """
+        Start new nodes again.
+
+        """
+        with self._condition:
+            self._paused = False
+            self._condition.notify_all()
+
+    @property
+    def is_running(self):
+        """
+        Is the scheduler healing.
+
+        :rtype: bool
+
+        """
+        return self._running
+
+    @property
+    def progress(self):
+        """
+        The progress of the heal.
+
+            * state : 'running', 'paused' or 'stopped'
+            * total : number of nodes to heal
+            * done : number of nodes finished (whatever their status)
+            * in_flight : the nodes healing now
+            * elapsed : time since the start
+            * nodes : {node_id: {'status':..., 'start':..., 'duration':...}}
+
+        :rtype: dict()
+
+        """
+        with self._condition:
+            nodes = dict([(node_id, dict(info)) for node_id, info in self._nodes.items()])
+            in_flight = sorted(self._in_flight.keys())
+            if not self._running:
+                state = 'stopped'
+            elif self._paused:
+                state = 'paused'
+            else:
+                state = 'running'
+        done = len([info for info in nodes.values() if info['status'] not in \
+            (self.STATUS_PENDING, self.STATUS_HEALING)])
+        if self._duration is not None:
+            elapsed = self._duration
+        else:
+            elapsed = time.time() - self._start if self._start is not None else 0.0
+        return {'state': state,
+                'total': len(nodes),
+                'done': done,
+                'in_flight': in_flight,
+                'elapsed': elapsed,
+                'nodes': nodes,
+                }
+
+    def _handle_notification(self, network, args):
+        """
+        The receiver of the notifications : Timeout, Dead.
+
+        """
+        if network is not self._network:
+            return
+        code = args.get('notificationCode', None)
+        with self._condition:
+            if code in (CODE_TIMEOUT, CODE_DEAD) and args.get('nodeId', None) in self._in_flight:
+                self._finish(args['nodeId'], self.STATUS_FAILED, time.time())
+            self._condition.notify_all()
+
+    def _handle_command_done(self, command):
+        """
+        The callback of the controller commands : wake up the scheduling loop.
+
+        """
+        with self._condition:
+            self._condition.notify_all()
+
+    def _steps(self, node_id):
+        """
+        The controller commands used to heal a node, as functions starting them.
+
+        :param node_id: The node to heal
+        :type node_id: int
+        :rtype: deque()
+
+        """
+        controller = self._network.controller
+        steps = deque([lambda : controller.begin_command_request_node_neigbhor_update(node_id)])
+        if self._up_node_route:
+            steps.append(lambda : controller.begin_command_delete_all_return_routes(node_id))
+            steps.append(lambda : controller.begin_command_assign_return_route(node_id, controller.node_id))
+        return steps
+
+    def _next_step(self, node_id):
+        """
+        Start the next command of a node. Must be called with the condition held.
+
+        """
+        flight = self._in_flight[node_id]
+        flight['command'] = flight['steps'].popleft()()
+        flight['command'].add_done_callback(self._handle_command_done)
+
+    def _queue_count(self):
+        """
+        The number of messages in the send queue.
+
+        """
+        try:
+            return self._network.controller.send_queue_count
+        except Exception:
+            return 0
+
+    def _finish(self, node_id, status, now):
+        """
+        A node is finished. Must be called with the condition held.
+        The signal is sent by the scheduling loop, without the condition.
+
+        """
+        flight = self._in_flight.pop(node_id)
+        start = flight['start']
+        command = flight['command']
+        if command is not None and not command.done():
+            command.cancel()
+        info = self._nodes[node_id]
+        info['status'] = status
+        info['duration'] = now - start
+        logging.debug('Heal node %s : %s in %.1fs' % (node_id, status, info['duration']))
+        self._signals.append((self.SIGNAL_HEAL_NODE_DONE, \
+            {'network': self._network, 'node_id': node_id, 'status': status, 'duration': info['duration']}))
+
+    def _run(self):
+        """
+        The scheduling loop.
+
+        """
+        while True:
+            with self._condition:
+                if not self._running:
+                    break
+                now = time.time()
+                queue = self._queue_count()
+                for node_id, flight in list(self._in_flight.items()):
+                    command = flight['command']
+                    if command.done():
+                        if command.exception() is not None or \
+                          command.result() != self._network.controller.SIGNAL_CTRL_COMPLETED:
+                            self._finish(node_id, self.STATUS_FAILED, now)
+                        elif flight['steps']:
+                            self._next_step(node_id)
+                        else:
+                            self._finish(node_id, self.STATUS_DONE, now)
+                    elif now - flight['start'] >= self._node_timeout:
+                        self._finish(node_id, self.STATUS_TIMEOUT, now)
+                while self._pending and len(self._in_flight) < self._max_in_flight \
+                  and not self._paused and queue <= self._queue_threshold:
+                    node_id = self._pending.popleft()
+                    if self._network.nodes is None or node_id not in self._network.nodes:
+                        self._nodes[node_id]['status'] = self.STATUS_SKIPPED
+                        continue
+                    self._nodes[node_id]['status'] = self.STATUS_HEALING
+                    self._nodes[node_id]['start'] = time.time()
+                    self._in_flight[node_id] = {'start': self._nodes[node_id]['start'], \
+                        'steps': self._steps(node_id), 'command': None}
+                    self._next_step(node_id)
+                    queue = self._queue_count()
+                finished = not self._pending and not self._in_flight
+                if not finished:
+                    self._condition.wait(self._interval)
+                signals, self._signals = self._signals, []
+            for signal, named in signals:
+                dispatcher.send(signal, **named)
+            if finished:
+                break
+        self._duration = time.time() - self._start
+        dispatcher.disconnect(self._handle_notification, self._network.SIGNAL_NOTIFICATION)
+        with self._condition:
+            self._running = False
+        dispatcher.send(self.SIGNAL_HEAL_DONE, **{'network': self._network, 'progress': self.progress})
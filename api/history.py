@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: openzwave.history
+
+This file is part of **python-openzwave** project https://github.com/bibi21000/python-openzwave.
+    :platform: Unix, Windows, MacOS X
+    :sinopsis: openzwave API
+
+.. moduleauthor: bibi21000 aka Sébastien GALLET <bibi21000@gmail.com>
+
+License : GPL(v3)
+
+**python-openzwave** is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+**python-openzwave** is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with python-openzwave. If not, see http://www.gnu.org/licenses.
+
+"""
+import logging
+from array import array
+from openzwave.object import ZWaveException
+
+logging.getLogger('openzwave').addHandler(logging.NullHandler())
+
+#The typecode of the array used to store the data of a type of value
+HISTORY_TYPECODES = {
+    'Bool': 'b',
+    'Button': 'b',
+    'Byte': 'l',
+    'Short': 'l',
+    'Int': 'l',
+    'Decimal': 'd',
+}
+
+class ZWaveValueHistory(object):
+    """
+    A fixed-capacity history of the data of a value.
+
+    The timestamps and the data are kept in two arrays used as ring buffers :
+    8 bytes by timestamp and 1 to 8 bytes by data instead of a tuple
+    and two python objects.
+
+    """
+
+    def __init__(self, capacity=256, typecode='d'):
+        """
+        Initialize the history
+
+        :param capacity: The maximum number of entries
+        :type capacity: int
+        :param typecode: The typecode of the array of data : 'b' (bool), 'l' (int) or 'd' (float)
+        :type typecode: str
+
+        """
+        if capacity <= 0:
+            raise ZWaveException("Bad capacity for history : %s" % capacity)
+        self._capacity = capacity
+        self._typecode = typecode
+        self._times = array('d', [0.0]) * capacity
+        self._data = array(typecode, [0]) * capacity
+        self._head = 0
+        self._count = 0
+
+    @classmethod
+    def for_type(cls, value_type, capacity=256):
+        """
+        Create a history for a type of value.
+
+        :param value_type: The type of the value (Bool, Byte, Decimal, Int, Short, Button)
+        :type value_type: str
+        :param capacity: The maximum number of entries
+        :type capacity: int
+        :rtype: ZWaveValueHistory
+
+        """
+        if value_type not in HISTORY_TYPECODES:
+            raise ZWaveException("No history for values of type %s" % value_type)
+        return cls(capacity, HISTORY_TYPECODES[value_type])
+
+    @property
+    def capacity(self):
+        """
+        The maximum number of entries.
+
+        :rtype: int
+
+        """
+        return self._capacity
+
+    @property
+    def typecode(self):
+        """
+        The typecode of the array of data.
+
+        :rtype: str
+
+        """
+        return self._typecode
+
+    def __len__(self):
+        """
+        The number of entries.
+
+        :rtype: int
+
+        """
+        return self._count
+
+    def append(self, timestamp, data):
+        """
+        Add an entry. The oldest one is overwritten when the history is full.
+
+        :param timestamp: The time of the data
+        :type timestamp: float
+        :param data: The data
+        :type data: bool, int or float
+
+        """
+        if self._typecode == 'd':
+            data = float(data)
+        else:
+            data = int(data)
+        self._times[self._head] = timestamp
+        self._data[self._head] = data
+        self._head = (self._head + 1) % self._capacity
+        if self._count < self._capacity:
+            self._count += 1
+
+    def clear(self):
+        """
+        Remove all the entries.
+
+        """
+        self._head = 0
+        self._count = 0
+
+    def to_arrays(self, start=None, stop=None):
+        """
+        Retrieve the entries, oldest first, as two arrays : the timestamps and the data.
+
+        :param start: The index of the first entry (like a slice)
+        :type start: int
+        :param stop: The index after the last entry (like a slice)
+        :type stop: int
+        :return: (array of timestamps, array of data)
+        :rtype: tuple()
+
+        """
+        start, stop, step = slice(start, stop).indices(self._count)
+        if stop <= start:
+            return (array('d'), array(self._typecode))
+        first = (self._head - self._count + start) % self._capacity
+        last = first + stop - start
+        if last <= self._capacity:
+            return (self._times[first:last], self._data[first:last])
+        last = last - self._capacity
+        return (self._times[first:] + self._times[:last], self._data[first:] + self._data[:last])
+
+    def __getitem__(self, index):
+        """
+        Retrieve an entry (timestamp, data) or a slice of entries as a list.
+
+        :param index: The index or the slice
+        :type index: int or slice
+        :rtype: tuple() or list()
+
+        """
+        if isinstance(index, slice):
+            if index.step not in (None, 1):
+                return self[:][index]
+            times, data = self.to_arrays(index.start, index.stop)
+            return list(zip(times, data))
+        if index < 0:
+            index += self._count
+        if index < 0 or index >= self._count:
+            raise IndexError("history index out of range")
+        pos = (self._head - self._count + index) % self._capacity
+        return (self._times[pos], self._data[pos])
+
+    def since(self, timestamp):
+        """
+        Retrieve the entries newer than a timestamp, as two arrays.
+        The timestamps are supposed to increase.
+
+        :param timestamp: The timestamp
+        :type timestamp: float
+        :return: (array of timestamps, array of data)
+        :rtype: tuple()
+
+        """
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            if self._times[(self._head - self._count + mid) % self._capacity] <= timestamp:
+                low = mid + 1
+            else:
+                high = mid
+        return self.to_arrays(low, None)
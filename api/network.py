@@ -24,7 +24,9 @@ along with python-openzwave. If not, see http://www.gnu.org/licenses.
 
 """
 import time
-from .util import dispatcher
+import json
+from timeit import default_timer
+from .util import dispatcher, robust_apply, live_receivers
 import logging
 import threading
 import libopenzwave
@@ -32,6 +34,18 @@ from openzwave.object import ZWaveException, ZWaveObject
 from openzwave.controller import ZWaveController
 from openzwave.node import ZWaveNode
 from openzwave.scene import ZWaveScene
+from openzwave.changes import ZWaveChangeLog
+from openzwave.fanout import ZWaveFanout, ZWaveSubscriber
+from openzwave.timing import ZWaveTimings, receiver_name
+from openzwave.topology import ZWaveTopology
+from openzwave.heal import ZWaveHealScheduler
+from openzwave.harvest import ZWaveConfigHarvester
+from openzwave.pending import ZWavePendingWrites
+from openzwave.association import ZWaveAssociations
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 logging.getLogger('openzwave').addHandler(logging.NullHandler())
 
@@ -258,9 +272,15 @@ class ZWaveNetwork(ZWaveObject):
     STATE_AWAKED = 7
     STATE_READY = 10
 
+    EXPORT_NODE_FIELDS = ('node_id', 'name', 'location', 'product_name', \
+        'manufacturer_name', 'type', 'isReady')
+    EXPORT_VALUE_FIELDS = ('value_id', 'node_id', 'command_class', 'instance', \
+        'index', 'genre', 'type', 'label', 'units', 'is_read_only', 'data', \
+        'last_update')
+
     ignoreSubsequent = True
 
-    def __init__(self, options, log=None, autostart=True):
+    def __init__(self, options, log=None, autostart=True, changes_size=2048, router=None):
         """
         Initialize zwave network
 
@@ -270,6 +290,10 @@ class ZWaveNetwork(ZWaveObject):
         :type log:
         :param autostart: should we start the network.
         :type autostart: bool
+        :param changes_size: The number of changes kept for changes_since.
+        :type changes_size: int
+        :param router: A router to share the manager with other networks (several controllers in one process).
+        :type router: ZWaveManagerRouter
 
         """
         logging.debug("Create network object.")
@@ -277,12 +301,26 @@ class ZWaveNetwork(ZWaveObject):
         self._options = options
         ZWaveObject.__init__(self, None, self)
         self._controller = ZWaveController(1, self, options)
-        self._manager = libopenzwave.PyManager()
-        self._manager.create()
+        self._router = router
+        if router is not None:
+            self._manager = router.manager
+        else:
+            self._manager = libopenzwave.PyManager()
+            self._manager.create()
         self._state = self.STATE_STOPPED
         self._semaphore_nodes = threading.Semaphore()
         self.nodes = None
         self._id_separator = '.'
+        self._command_classes_rev = None
+        self._changes = ZWaveChangeLog(changes_size)
+        self._fanout = None
+        self._topology = None
+        self._pending_writes = None
+        self._associations = None
+        self._heal = None
+        self._harvester = None
+        self._write_filter_age = None
+        self._timings = ZWaveTimings()
         if autostart:
             self.start()
 
@@ -304,7 +342,10 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug("Start network.")
-        self._manager.addWatcher(self.zwcallback)
+        if self._router is not None:
+            self._router.add_network(self)
+        else:
+            self._manager.addWatcher(self.zwcallback)
         self._manager.addDriver(self._options.device.encode("UTF-8"))
 
     def stop(self, fire=True):
@@ -328,7 +369,10 @@ class ZWaveNetwork(ZWaveObject):
         logging.debug("Wait for empty send_queue during %s second(s)." % i)
         try :
             self._semaphore_nodes.acquire()
-            self._manager.removeWatcher(self.zwcallback)
+            if self._router is not None:
+                self._router.remove_network(self)
+            else:
+                self._manager.removeWatcher(self.zwcallback)
             time.sleep(1.0)
             self._manager.removeDriver(self._options.device.encode("UTF-8"))
             self.nodes = None
@@ -581,6 +625,420 @@ class ZWaveNetwork(ZWaveObject):
                     return val
         return None
 
+    def iter_records(self, node_fields=None, value_fields=None):
+        """
+        Iterate over the network as a stream of records.
+
+        A first record describes the network. Each node is followed by the
+        records of its values. Values fields are read from the data cached by
+        the notifications : the manager is only called for fields not
+        available in the cache (help, min, max, ...).
+        Nodes and values are generated one at a time, so memory use doesn't
+        depend on the size of the network.
+
+        :param node_fields: The properties of the nodes to export. Use EXPORT_NODE_FIELDS if None
+        :type node_fields: list() or None
+        :param value_fields: The properties of the values to export. Use EXPORT_VALUE_FIELDS if None. An empty list don't export values
+        :type value_fields: list() or None
+        :return: A generator of dict(). Every record holds a 'record' key : 'network', 'node' or 'value'
+        :rtype: generator
+
+        """
+        if node_fields is None:
+            node_fields = self.EXPORT_NODE_FIELDS
+        if value_fields is None:
+            value_fields = self.EXPORT_VALUE_FIELDS
+        yield {'record': 'network', 'home_id': self.home_id, 'state': self._state}
+        for node_id in list(self.nodes.keys()):
+            node = self.nodes.get(node_id, None)
+            if node is None:
+                continue
+            record = {'record': 'node'}
+            for field in node_fields:
+                record[field] = getattr(node, field)
+            yield record
+            if not value_fields:
+                continue
+            for value_id in list(node.values.keys()):
+                value = node.values.get(value_id, None)
+                if value is None:
+                    continue
+                yield self._value_record(value, value_fields)
+
+    def _value_record(self, value, fields):
+        """
+        Build the record of a value using the data cached by the notifications.
+
+        :param value: The value to export
+        :type value: ZWaveValue
+        :param fields: The properties of the value to export
+        :type fields: list()
+        :rtype: dict()
+
+        """
+        record = {'record': 'value'}
+        for field in fields:
+            if field == 'value_id':
+                record[field] = value.value_id
+            elif field == 'node_id':
+                record[field] = value.parent_id
+            elif field == 'command_class':
+                desc = value.get_cached('commandClass')
+                if desc in self._command_classes_ids:
+                    record[field] = self._command_classes_ids[desc]
+                else:
+                    record[field] = value.command_class
+            elif field in ('instance', 'index', 'genre', 'type', 'label', 'units'):
+                ret = value.get_cached(field)
+                record[field] = ret if ret is not None else getattr(value, field)
+            elif field == 'is_read_only':
+                ret = value.get_cached('readOnly')
+                record[field] = ret if ret is not None else value.is_read_only
+            elif field == 'data':
+                ret = value.get_cached('value')
+                record[field] = ret if ret is not None else value.data
+            else:
+                record[field] = getattr(value, field)
+        return record
+
+    @property
+    def _command_classes_ids(self):
+        """
+        The reverse mapping of COMMAND_CLASS_DESC, built on first use.
+
+        :rtype: dict()
+
+        """
+        if self._command_classes_rev is None:
+            self._command_classes_rev = dict((desc, cls) \
+                for cls, desc in self.manager.COMMAND_CLASS_DESC.items())
+        return self._command_classes_rev
+
+    def export(self, stream, format='jsonl', node_fields=None, value_fields=None):
+        """
+        Write the network to a stream, one record at a time.
+
+        Formats are :
+
+            * jsonl : one JSON document per line. Stream must be opened in text mode.
+            * msgpack : a sequence of msgpack maps. Stream must be opened in binary mode. Needs the msgpack module.
+
+        :param stream: A file like object
+        :type stream: file
+        :param format: The format of the records : 'jsonl' or 'msgpack'
+        :type format: str
+        :param node_fields: The properties of the nodes to export. Look at iter_records
+        :type node_fields: list() or None
+        :param value_fields: The properties of the values to export. Look at iter_records
+        :type value_fields: list() or None
+        :return: The number of records written
+        :rtype: int
+
+        """
+        if format == 'jsonl':
+            encode = lambda record: json.dumps(record, default=_export_default) + '\n'
+        elif format == 'msgpack':
+            if msgpack is None:
+                raise ZWaveException("Export to msgpack needs the msgpack module")
+            packer = msgpack.Packer(default=_export_default)
+            encode = packer.pack
+        else:
+            raise ZWaveException("Unknown export format %s" % format)
+        count = 0
+        for record in self.iter_records(node_fields=node_fields, value_fields=value_fields):
+            stream.write(encode(record))
+            count += 1
+        return count
+
+    @property
+    def change_seq(self):
+        """
+        The sequence number of the last change of a node or a value.
+        Store it with a snapshot of the network and use it with changes_since.
+
+        :rtype: int
+
+        """
+        return self._changes.seq
+
+    def changes_since(self, seq, coalesce=True):
+        """
+        Retrieve the changes of nodes and values since a sequence number.
+
+        Changes are recorded when nodes are added, removed, renamed, queried
+        and when values are added, changed, refreshed or removed.
+        Only the last changes are kept (look at changes_size). If the changes
+        asked for are not available anymore or if the network has been reset,
+        the reset flag is set and the client must take a new snapshot.
+
+        :param seq: The last sequence number seen by the client.
+        :type seq: int
+        :param coalesce: Only keep the last change of each kind for a node or a value
+        :type coalesce: bool
+        :return: A dict : {'seq': last sequence number, 'reset': bool, 'changes': [{'seq', 'kind', 'node_id', 'value_id', 'time'}, ...]}
+        :rtype: dict()
+
+        """
+        return self._changes.since(seq, coalesce=coalesce)
+
+    def get_aggregates(self, node_id=None, label=None, now=None):
+        """
+        Retrieve the aggregates of the sensors of the network.
+        Look at ZWaveNodeSensor.get_sensors_aggregates.
+
+        :param node_id: Only the sensors of this node
+        :type node_id: int
+        :param label: Only the sensors with this label (ie Power, Temperature)
+        :type label: str
+        :param now: The current time. Default to now
+        :type now: float
+        :return: A dict : {node_id: {value_id: {'label', 'units', 'windows'}}}
+        :rtype: dict()
+
+        """
+        ret = dict()
+        if node_id is not None:
+            nodes = [(node_id, self.nodes[node_id])] if node_id in self.nodes else []
+        else:
+            nodes = list(self.nodes.items())
+        for nid, node in nodes:
+            aggregates = node.get_sensors_aggregates(label=label, now=now)
+            if len(aggregates) > 0:
+                ret[nid] = aggregates
+        return ret
+
+    def export_histories(self, since=None):
+        """
+        Retrieve the histories of all the values with history enabled.
+
+        :param since: Only retrieve the entries newer than this timestamp
+        :type since: float
+        :return: A dict : {value_id: (array of timestamps, array of data), ...}
+        :rtype: dict()
+
+        """
+        ret = dict()
+        for node in list(self.nodes.values()):
+            for value_id, value in list(node.values.items()):
+                history = value.history
+                if history is None:
+                    continue
+                if since is None:
+                    ret[value_id] = history.to_arrays()
+                else:
+                    ret[value_id] = history.since(since)
+        return ret
+
+    def subscribe(self, receiver, signals, maxsize=256, policy='drop_oldest', name=None):
+        """
+        Subscribe to louie signals through a dedicated queue and thread.
+
+        Unlike dispatcher.connect, the receiver is called from its own thread :
+        a slow receiver doesn't block the notifications nor the other receivers.
+        When its queue is full, signals are dropped or coalesced according to
+        the policy. Look at ZWaveSubscriber for the policies and the statistics.
+
+        :param receiver: The function to call. It gets the same named arguments as a louie receiver
+        :type receiver: callable
+        :param signals: The signals to subscribe to (ie [ZWaveNetwork.SIGNAL_VALUE_CHANGED])
+        :type signals: list()
+        :param maxsize: The size of the queue of the subscriber
+        :type maxsize: int
+        :param policy: What to do when the queue is full : 'drop_oldest', 'drop_newest' or 'coalesce'
+        :type policy: str
+        :param name: The name of the subscriber
+        :type name: str
+        :return: The subscriber
+        :rtype: ZWaveSubscriber
+
+        """
+        if self._fanout is None:
+            self._fanout = ZWaveFanout(self)
+        subscriber = ZWaveSubscriber(receiver, signals, maxsize=maxsize, policy=policy, name=name)
+        self._fanout.subscribe(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """
+        Remove a subscriber and stop its thread.
+
+        :param subscriber: The subscriber returned by subscribe
+        :type subscriber: ZWaveSubscriber
+
+        """
+        if self._fanout is not None:
+            self._fanout.unsubscribe(subscriber)
+
+    @property
+    def write_filter_age(self):
+        """
+        The maximum age in seconds of the last data reported by a device
+        for a write of the same data to be dropped. None when the filter is disabled.
+        Values can override it with their own write_filter_age.
+
+        :rtype: float
+
+        """
+        return self._write_filter_age
+
+    @write_filter_age.setter
+    def write_filter_age(self, value):
+        """
+        Enable the write filter for all the values (None to disable it).
+
+        :param value: The age in seconds
+        :type value: float
+
+        """
+        self._write_filter_age = value
+
+    def get_writes_saved(self):
+        """
+        The number of writes dropped by the write filter, by value.
+
+        :return: A dict {value_id: count} of the values with writes dropped
+        :rtype: dict()
+
+        """
+        ret = dict()
+        if self.nodes is None:
+            return ret
+        for node in list(self.nodes.values()):
+            for value_id, value in list(node.values.items()):
+                if value.writes_saved > 0:
+                    ret[value_id] = value.writes_saved
+        return ret
+
+    def heal(self, node_ids=None, upNodeRoute=False, max_in_flight=1, \
+            queue_threshold=0, node_timeout=120.0):
+        """
+        Heal the nodes a few at a time, letting the user commands go first.
+        See ZWaveHealScheduler for the parameters.
+
+        :param node_ids: The nodes to heal. All the nodes but the controller if None
+        :type node_ids: list()
+        :param upNodeRoute: Whether to perform return routes initialization
+        :type upNodeRoute: bool
+        :param max_in_flight: The maximum number of nodes healed at the same time
+        :type max_in_flight: int
+        :param queue_threshold: A node is started only when the send queue is not longer than this
+        :type queue_threshold: int
+        :param node_timeout: The time after which a node is given up
+        :type node_timeout: float
+        :return: The scheduler, started
+        :rtype: ZWaveHealScheduler
+
+        """
+        if self._heal is not None and self._heal.is_running:
+            raise ZWaveException("A heal is already running")
+        self._heal = ZWaveHealScheduler(self, node_ids=node_ids, upNodeRoute=upNodeRoute, \
+            max_in_flight=max_in_flight, queue_threshold=queue_threshold, \
+            node_timeout=node_timeout)
+        self._heal.start()
+        return self._heal
+
+    @property
+    def heal_scheduler(self):
+        """
+        The last heal scheduler started or None.
+
+        :rtype: ZWaveHealScheduler
+
+        """
+        return self._heal
+
+    def fetch_config_params(self, node_ids=None, params=None, max_in_flight=2, \
+            settle_time=5.0, node_timeout=60.0, timeout=None):
+        """
+        Fetch the configuration parameters of the nodes, a few nodes at a time.
+        Sleeping nodes are fetched when they wake up.
+        See ZWaveConfigHarvester for the parameters.
+
+        :param node_ids: The nodes to fetch. All the nodes but the controller if None
+        :type node_ids: list()
+        :param params: The parameters to fetch. All the parameters of the nodes if None
+        :type params: list()
+        :param max_in_flight: The maximum number of nodes fetched at the same time
+        :type max_in_flight: int
+        :param settle_time: The time without report after which a node with no known parameter is done
+        :type settle_time: float
+        :param node_timeout: The time after which an awake node is given up
+        :type node_timeout: float
+        :param timeout: The time after which the harvest is given up, sleeping nodes included. Never if None
+        :type timeout: float
+        :return: The future resolved with the parameters reported : {node_id: {param: data}}
+        :rtype: ZWaveFuture
+
+        """
+        if self._harvester is not None and self._harvester.is_running:
+            raise ZWaveException("A fetch of the configuration parameters is already running")
+        self._harvester = ZWaveConfigHarvester(self, node_ids=node_ids, params=params, \
+            max_in_flight=max_in_flight, settle_time=settle_time, \
+            node_timeout=node_timeout, timeout=timeout)
+        self._harvester.start()
+        return self._harvester.future
+
+    @property
+    def config_harvester(self):
+        """
+        The last configuration harvester started or None.
+
+        :rtype: ZWaveConfigHarvester
+
+        """
+        return self._harvester
+
+    @property
+    def topology(self):
+        """
+        The cached adjacency matrix of the network and the analytics on it
+        (hops from the controller, articulation and isolated nodes, ...).
+
+        :rtype: ZWaveTopology
+
+        """
+        if self._topology is None:
+            self._topology = ZWaveTopology(self)
+        return self._topology
+
+    @property
+    def associations(self):
+        """
+        The cached associations of the nodes, with the reverse lookups
+        (the nodes controlling a node, ...).
+
+        :rtype: ZWaveAssociations
+
+        """
+        if self._associations is None:
+            self._associations = ZWaveAssociations(self)
+        return self._associations
+
+    @property
+    def pending_writes(self):
+        """
+        The writes waiting for the sleeping nodes to wake up.
+        Use pending_writes.write(value, data) to write to a node which may be sleeping.
+
+        :rtype: ZWavePendingWrites
+
+        """
+        if self._pending_writes is None:
+            self._pending_writes = ZWavePendingWrites(self)
+        return self._pending_writes
+
+    @property
+    def subscribers(self):
+        """
+        The subscribers of the network.
+
+        :rtype: list() of ZWaveSubscriber
+
+        """
+        if self._fanout is None:
+            return []
+        return self._fanout.subscribers
+
     def get_scenes(self):
         """
         The scenes of the network.
@@ -749,6 +1207,12 @@ class ZWaveNetwork(ZWaveObject):
         """
         logging.debug('zwcallback args=[%s]', args)
         notify_type = args['notificationType']
+        timing = self._timings.enabled
+        if timing:
+            start = default_timer()
+            if 'timing' in args:
+                self._timings.record(ZWaveTimings.STAGE_BUILD, notify_type, args['timing'][1] - args['timing'][0])
+                self._timings.record(ZWaveTimings.STAGE_CALLBACK, notify_type, start - args['timing'][0])
         if notify_type == self.SIGNAL_DRIVER_FAILED:
             self._handle_driver_failed(args)
         elif notify_type == self.SIGNAL_DRIVER_READY:
@@ -811,6 +1275,62 @@ class ZWaveNetwork(ZWaveObject):
             self._handle_driver_removed(args)
         else:
             logging.warning('Skipping unhandled notification [%s]', args)
+        if timing:
+            self._timings.record(ZWaveTimings.STAGE_HANDLER, notify_type, default_timer() - start)
+
+    def _dispatch(self, signal, **named):
+        """
+        Send a signal to the receivers of the dispatcher.
+        When the timings are enabled, the receivers are called one by one to time them.
+
+        :param signal: The signal to send
+        :type signal: str
+
+        """
+        if not self._timings.enabled:
+            dispatcher.send(signal, **named)
+            return
+        for receiver in live_receivers(signal):
+            start = default_timer()
+            try:
+                robust_apply(receiver, signal=signal, sender=dispatcher.Anonymous, **named)
+            finally:
+                self._timings.record(ZWaveTimings.STAGE_RECEIVER, \
+                    '%s:%s' % (signal, receiver_name(receiver)), default_timer() - start)
+
+    @property
+    def timings(self):
+        """
+        The timings of the notification path.
+
+        :rtype: ZWaveTimings
+
+        """
+        return self._timings
+
+    def enable_timings(self, enabled=True):
+        """
+        Enable or disable the timings of the notification path.
+        The library adds timestamps to the notifications and the receivers
+        of the dispatcher are timed one by one.
+
+        :param enabled: True to enable the timings
+        :type enabled: bool
+
+        """
+        self._timings.enabled = enabled
+        if self._manager is not None:
+            self._manager.setNotificationTiming(enabled)
+
+    def dump_timings(self, stream):
+        """
+        Write the timings of the notification path as text.
+
+        :param stream: The stream to write to
+        :type stream: file
+
+        """
+        self._timings.dump(stream)
 
     def _handle_driver_failed(self, args):
         """
@@ -827,8 +1347,8 @@ class ZWaveNetwork(ZWaveObject):
         self._controller = None
         self.nodes = None
         self._state = self.STATE_FAILED
-        dispatcher.send(self.SIGNAL_DRIVER_FAILED, **{'network': self})
-        dispatcher.send(self.SIGNAL_NETWORK_FAILED, **{'network': self})
+        self._dispatch(self.SIGNAL_DRIVER_FAILED, **{'network': self})
+        self._dispatch(self.SIGNAL_NETWORK_FAILED, **{'network': self})
 
     def _handle_driver_ready(self, args):
         """
@@ -849,18 +1369,19 @@ class ZWaveNetwork(ZWaveObject):
             self._semaphore_nodes.acquire()
             self.nodes = None
             self.nodes[args['nodeId']] = controller_node
+            self._changes.reset()
             self._controller.node = self.nodes[args['nodeId']]
             logging.info('Driver ready using library %s' % self._controller.library_description )
             logging.info('home_id 0x%0.8x, controller node id is %d' % (self.home_id, self._controller.node_id))
             logging.debug('Network %s' % self )
-            dispatcher.send(self.SIGNAL_DRIVER_READY, \
+            self._dispatch(self.SIGNAL_DRIVER_READY, \
                 **{'network': self, 'controller': self._controller})
             self._state = self.STATE_STARTED
-            dispatcher.send(self.SIGNAL_NETWORK_STARTED, \
+            self._dispatch(self.SIGNAL_NETWORK_STARTED, \
                 **{'network': self})
             ctrl_state = libopenzwave.PyControllerState[0]
             ctrl_message = libopenzwave.PyControllerState[0].doc
-            dispatcher.send(self.controller.SIGNAL_CONTROLLER, \
+            self._dispatch(self.controller.SIGNAL_CONTROLLER, \
                 **{'state': ctrl_state, 'message': ctrl_message, 'network': self, 'controller': self.controller})
         except:
             import sys, traceback
@@ -888,9 +1409,10 @@ class ZWaveNetwork(ZWaveObject):
             self._semaphore_nodes.acquire()
             self.nodes = None
             self._state = self.STATE_RESETTED
-            dispatcher.send(self.SIGNAL_DRIVER_RESET, \
+            self._changes.reset()
+            self._dispatch(self.SIGNAL_DRIVER_RESET, \
                 **{'network': self})
-            dispatcher.send(self.SIGNAL_NETWORK_RESETTED, \
+            self._dispatch(self.SIGNAL_NETWORK_RESETTED, \
                 **{'network': self})
         finally :
             self._semaphore_nodes.release()
@@ -910,7 +1432,7 @@ class ZWaveNetwork(ZWaveObject):
         try :
             self._semaphore_nodes.acquire()
             self._state = self.STATE_STOPPED
-            dispatcher.send(self.SIGNAL_DRIVER_REMOVED, \
+            self._dispatch(self.SIGNAL_DRIVER_REMOVED, \
                 **{'network': self})
         finally :
             self._semaphore_nodes.release()
@@ -928,7 +1450,9 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug('************ Z-Wave Notification Group : %s' % (args))
-        dispatcher.send(self.SIGNAL_GROUP, \
+        self.nodes[args['nodeId']].invalidate_groups(args.get('groupIdx', None))
+        self._changes.record(self.SIGNAL_GROUP, args['nodeId'])
+        self._dispatch(self.SIGNAL_GROUP, \
                 **{'network': self, 'node': self.nodes[args['nodeId']]})
 
     def _handle_node(self, node):
@@ -944,7 +1468,7 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug('Z-Wave Notification Node : %s' % (node))
-        dispatcher.send(self.SIGNAL_NODE, \
+        self._dispatch(self.SIGNAL_NODE, \
                 **{'network': self, 'node':node})
 
     def _handle_node_added(self, args):
@@ -965,7 +1489,8 @@ class ZWaveNetwork(ZWaveObject):
             node = ZWaveNode(args['nodeId'], network=self)
             self._semaphore_nodes.acquire()
             self.nodes[args['nodeId']] = node
-            dispatcher.send(self.SIGNAL_NODE_ADDED, \
+            self._changes.record(self.SIGNAL_NODE_ADDED, args['nodeId'])
+            self._dispatch(self.SIGNAL_NODE_ADDED, \
                 **{'network': self, 'node': self.nodes[args['nodeId']]})
             self._handle_node(self.nodes[args['nodeId']])
         finally :
@@ -982,7 +1507,7 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug('************ Z-Wave Notification SceneEvent : %s' % (args))
-        dispatcher.send(self.SIGNAL_SCENE_EVENT, \
+        self._dispatch(self.SIGNAL_SCENE_EVENT, \
             **{'network': self, 'node': self.nodes[args['nodeId']],
                'scene_id': args['sceneId']})
 
@@ -999,7 +1524,7 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug('************ Z-Wave Notification NodeEvent : %s' % (args))
-        dispatcher.send(self.SIGNAL_NODE_EVENT,
+        self._dispatch(self.SIGNAL_NODE_EVENT,
                         **{'network': self, 'node': self.nodes[args['nodeId']], 'value': args['event']})
 
     def _handle_node_naming(self, args):
@@ -1014,7 +1539,8 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug('************ Z-Wave Notification NodeNaming : %s' % (args))
-        dispatcher.send(self.SIGNAL_NODE_NAMING, \
+        self._changes.record(self.SIGNAL_NODE_NAMING, args['nodeId'])
+        self._dispatch(self.SIGNAL_NODE_NAMING, \
             **{'network': self, 'node': self.nodes[args['nodeId']]})
         self._handle_node(self.nodes[args['nodeId']])
 
@@ -1027,7 +1553,7 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug('************ Z-Wave Notification NodeNew : %s' % (args))
-        dispatcher.send(self.SIGNAL_NODE_NEW, \
+        self._dispatch(self.SIGNAL_NODE_NEW, \
             **{'network': self, 'node_id': args['nodeId']})
 
     def _handle_node_protocol_info(self, args):
@@ -1043,7 +1569,8 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug('************ Z-Wave Notification NodeProtocolInfo : %s' % (args))
-        dispatcher.send(self.SIGNAL_NODE_PROTOCOL_INFO, \
+        self._changes.record(self.SIGNAL_NODE_PROTOCOL_INFO, args['nodeId'])
+        self._dispatch(self.SIGNAL_NODE_PROTOCOL_INFO, \
             **{'network': self, 'node': self.nodes[args['nodeId']]})
         self._handle_node(self.nodes[args['nodeId']])
 
@@ -1066,7 +1593,8 @@ class ZWaveNetwork(ZWaveObject):
             if args['nodeId'] in self.nodes:
                 node = self.nodes[args['nodeId']]
                 del(self.nodes[args['nodeId']])
-                dispatcher.send(self.SIGNAL_NODE_REMOVED, \
+                self._changes.record(self.SIGNAL_NODE_REMOVED, args['nodeId'])
+                self._dispatch(self.SIGNAL_NODE_REMOVED, \
                     **{'network': self, 'node': node})
                 self._handle_node(node)
         finally :
@@ -1084,7 +1612,7 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug('************ Z-Wave Notification EssentialNodeQueriesComplete : %s' % (args))
-        dispatcher.send(self.SIGNAL_ESSENTIAL_NODE_QUERIES_COMPLETE, \
+        self._dispatch(self.SIGNAL_ESSENTIAL_NODE_QUERIES_COMPLETE, \
             **{'network': self, 'node': self.nodes[args['nodeId']]})
 
     def _handle_node_queries_complete(self, args):
@@ -1103,7 +1631,8 @@ class ZWaveNetwork(ZWaveObject):
         logging.debug('************ Z-Wave Notification NodeQueriesComplete : %s' % (args))
         #the query stage are now completed, set the flag is ready to operate
         self.nodes[args['nodeId']].isReady = True
-        dispatcher.send(self.SIGNAL_NODE_QUERIES_COMPLETE, \
+        self._changes.record(self.SIGNAL_NODE_QUERIES_COMPLETE, args['nodeId'])
+        self._dispatch(self.SIGNAL_NODE_QUERIES_COMPLETE, \
             **{'network': self, 'node': self.nodes[args['nodeId']]})
         self._handle_node(self.nodes[args['nodeId']])
 
@@ -1121,8 +1650,8 @@ class ZWaveNetwork(ZWaveObject):
         """
         logging.debug('************ Z-Wave Notification AllNodesQueried : %s' % (args))
         self._state = self.STATE_READY
-        dispatcher.send(self.SIGNAL_NETWORK_READY, **{'network': self})
-        dispatcher.send(self.SIGNAL_ALL_NODES_QUERIED, \
+        self._dispatch(self.SIGNAL_NETWORK_READY, **{'network': self})
+        self._dispatch(self.SIGNAL_ALL_NODES_QUERIED, \
             **{'network': self, 'controller': self._controller})
     def _handle_all_nodes_queried_some_dead(self, args):
         """
@@ -1138,8 +1667,8 @@ class ZWaveNetwork(ZWaveObject):
         """
         logging.debug('************ Z-Wave Notification AllNodesQueriedSomeDead : %s' % (args,))
         self._state = self.STATE_READY
-        dispatcher.send(self.SIGNAL_NETWORK_READY, **{'network': self})
-        dispatcher.send(self.SIGNAL_ALL_NODES_QUERIED_SOME_DEAD, \
+        self._dispatch(self.SIGNAL_NETWORK_READY, **{'network': self})
+        self._dispatch(self.SIGNAL_ALL_NODES_QUERIED_SOME_DEAD, \
             **{'network': self, 'controller': self._controller})
 
     def _handle_awake_nodes_queried(self, args):
@@ -1161,8 +1690,8 @@ class ZWaveNetwork(ZWaveObject):
         try :
             if self._state < self.STATE_AWAKED :
                 self._state = self.STATE_AWAKED
-            dispatcher.send(self.SIGNAL_NETWORK_AWAKED, **{'network': self})
-            dispatcher.send(self.SIGNAL_AWAKE_NODES_QUERIED, \
+            self._dispatch(self.SIGNAL_NETWORK_AWAKED, **{'network': self})
+            self._dispatch(self.SIGNAL_AWAKE_NODES_QUERIED, \
                 **{'network': self, 'controller': self._controller})
         except:
             import sys, traceback
@@ -1182,7 +1711,7 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug('************ Z-Wave Notification PollingDisabled : %s' % (args))
-        dispatcher.send(self.SIGNAL_POLLING_DISABLED, \
+        self._dispatch(self.SIGNAL_POLLING_DISABLED, \
             **{'network': self, 'node' : self.nodes[args['nodeId']]})
 
     def _handle_polling_enabled(self, args):
@@ -1197,7 +1726,7 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug('************ Z-Wave Notification PollingEnabled : %s' % (args))
-        dispatcher.send(self.SIGNAL_POLLING_ENABLED, \
+        self._dispatch(self.SIGNAL_POLLING_ENABLED, \
             **{'network': self, 'node' : self.nodes[args['nodeId']]})
 
     def _handle_create_button(self, args):
@@ -1211,7 +1740,7 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug('************ Z-Wave Notification CreateButton : %s' % (args))
-        dispatcher.send(self.SIGNAL_CREATE_BUTTON, \
+        self._dispatch(self.SIGNAL_CREATE_BUTTON, \
             **{'network': self, 'node' : self.nodes[args['nodeId']]})
 
     def _handle_delete_button(self, args):
@@ -1225,7 +1754,7 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug('************ Z-Wave Notification DeleteButton : %s' % (args))
-        dispatcher.send(self.SIGNAL_DELETE_BUTTON, \
+        self._dispatch(self.SIGNAL_DELETE_BUTTON, \
             **{'network': self, 'node' : self.nodes[args['nodeId']]})
 
     def _handle_button_on(self, args):
@@ -1239,7 +1768,7 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug('************ Z-Wave Notification ButtonOn : %s' % (args))
-        dispatcher.send(self.SIGNAL_BUTTON_ON, \
+        self._dispatch(self.SIGNAL_BUTTON_ON, \
             **{'network': self, 'node' : self.nodes[args['nodeId']]})
 
     def _handle_button_off(self, args):
@@ -1253,7 +1782,7 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug('************ Z-Wave Notification ButtonOff : %s' % (args))
-        dispatcher.send(self.SIGNAL_BUTTON_OFF, \
+        self._dispatch(self.SIGNAL_BUTTON_OFF, \
             **{'network': self, 'node' : self.nodes[args['nodeId']]})
 
     def _handle_value(self, node, value):
@@ -1271,7 +1800,7 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug('Z-Wave Notification Value')
-        dispatcher.send(self.SIGNAL_VALUE, \
+        self._dispatch(self.SIGNAL_VALUE, \
             **{'network': self, 'node' : node, \
                 'value' : value})
 
@@ -1293,8 +1822,9 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug('************ Z-Wave Notification ValueAdded : %s' % (args))
-        self.nodes[args['nodeId']].add_value(args['valueId']['id'])
-        dispatcher.send(self.SIGNAL_VALUE_ADDED, \
+        self.nodes[args['nodeId']].add_value(args['valueId']['id'], args['valueId'])
+        self._changes.record(self.SIGNAL_VALUE_ADDED, args['nodeId'], args['valueId']['id'])
+        self._dispatch(self.SIGNAL_VALUE_ADDED, \
             **{'network': self, 'node' : self.nodes[args['nodeId']], \
                 'value' : self.nodes[args['nodeId']].values[args['valueId']['id']]})
         self._handle_value(self.nodes[args['nodeId']], self.nodes[args['nodeId']].values[args['valueId']['id']])
@@ -1314,8 +1844,9 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug('************ Z-Wave Notification ValueChanged : %s' % (args))
-        self.nodes[args['nodeId']].change_value(args['valueId']['id'])
-        dispatcher.send(self.SIGNAL_VALUE_CHANGED, \
+        self.nodes[args['nodeId']].change_value(args['valueId']['id'], args['valueId'])
+        self._changes.record(self.SIGNAL_VALUE_CHANGED, args['nodeId'], args['valueId']['id'])
+        self._dispatch(self.SIGNAL_VALUE_CHANGED, \
             **{'network': self, 'node' : self.nodes[args['nodeId']], \
                 'value' : self.nodes[args['nodeId']].values[args['valueId']['id']]})
         self._handle_value(self.nodes[args['nodeId']], self.nodes[args['nodeId']].values[args['valueId']['id']])
@@ -1334,8 +1865,10 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug('************ Z-Wave Notification ValueRefreshed : %s' % (args))
+        self.nodes[args['nodeId']].change_value(args['valueId']['id'], args['valueId'])
+        self._changes.record(self.SIGNAL_VALUE_REFRESHED, args['nodeId'], args['valueId']['id'])
         self.nodes[args['nodeId']].refresh_value(args['valueId']['id'])
-        dispatcher.send(self.SIGNAL_VALUE_REFRESHED, \
+        self._dispatch(self.SIGNAL_VALUE_REFRESHED, \
             **{'network': self, 'node' : self.nodes[args['nodeId']], \
                 'value' : self.nodes[args['nodeId']].values[args['valueId']['id']]})
         self._handle_value(self.nodes[args['nodeId']], self.nodes[args['nodeId']].values[args['valueId']['id']])
@@ -1357,7 +1890,8 @@ class ZWaveNetwork(ZWaveObject):
         logging.debug('************ Z-Wave Notification ValueRemoved : %s' % (args))
         val=self.nodes[args['nodeId']].values[args['valueId']['id']]
         if self.nodes[args['nodeId']].remove_value(args['valueId']['id']) :
-            dispatcher.send(self.SIGNAL_VALUE_REMOVED, \
+            self._changes.record(self.SIGNAL_VALUE_REMOVED, args['nodeId'], args['valueId']['id'])
+            self._dispatch(self.SIGNAL_VALUE_REMOVED, \
                 **{'network': self, 'node' : self.nodes[args['nodeId']], \
                     'value' : val})
             self._handle_value(self.nodes[args['nodeId']], val)
@@ -1373,7 +1907,7 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug('************ Z-Wave Notification : %s' % (args))
-        dispatcher.send(self.SIGNAL_NOTIFICATION, \
+        self._dispatch(self.SIGNAL_NOTIFICATION, \
             **{'network': self, 'args': args})
 
     def _handle_msg_complete(self, args):
@@ -1387,7 +1921,7 @@ class ZWaveNetwork(ZWaveObject):
 
         """
         logging.debug('************ Z-Wave Notification MsgComplete : %s' % (args))
-        dispatcher.send(self.SIGNAL_MSG_COMPLETE, \
+        self._dispatch(self.SIGNAL_MSG_COMPLETE, \
             **{'network': self})
 
     def write_config(self):
@@ -1399,6 +1933,21 @@ class ZWaveNetwork(ZWaveObject):
         self._manager.writeConfig(self.home_id)
         logging.info('ZWave configuration wrote to user directory.')
 
+def _export_default(obj):
+    """
+    Convert the objects that can't be serialized by json or msgpack.
+
+    :param obj: The object to convert
+    :type obj: variable
+    :rtype: variable
+
+    """
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    if isinstance(obj, bytes):
+        return obj.decode("UTF-8", "replace")
+    return str(obj)
+
 """
     initialization callback sequence:
 
@@ -40,8 +40,7 @@ class ZWaveNode( ZWaveObject,
     Represents a single Node within the Z-Wave Network.
 
     """
-
-    _isReady = False
+    __slots__ = ('values', '_is_locked', '_isReady', '_groups', '_aggregates')
 
     def __init__(self, node_id, network ):
         """
@@ -59,6 +58,8 @@ class ZWaveNode( ZWaveObject,
         self.values = dict()
         self._is_locked = False
         self._isReady = False
+        self._groups = None
+        self._aggregates = None
 
     def __str__(self):
         """
@@ -191,11 +192,12 @@ class ZWaveNode( ZWaveObject,
     def neighbors(self):
         """
         The neighbors of the node.
+        Read from the adjacency matrix cached by the topology of the network.
 
         :rtype: set()
 
         """
-        return self._network.manager.getNodeNeighbors(self.home_id, self.object_id)
+        return self._network.topology.neighbors(self.object_id)
 
     @property
     def num_groups(self):
@@ -216,15 +218,38 @@ class ZWaveNode( ZWaveObject,
         GetNumGroups returns 4, the _groupIdx value to use in calls to GetAssociations
         AddAssociation and RemoveAssociation will be a number between 1 and 4.
 
+        The groups are cached until the next Group notification of the node.
+
         :rtype: dict()
 
         """
-        groups = dict()
-        number_groups = self.num_groups
-        for i in range(1, number_groups+1):
-            groups[i] = ZWaveGroup(i, network=self._network, node_id=self.node_id)
+        groups = self._groups
+        if groups is None:
+            groups = dict()
+            number_groups = self.num_groups
+            for i in range(1, number_groups+1):
+                groups[i] = ZWaveGroup(i, network=self._network, node_id=self.node_id)
+            #The groups are not known before the node is queried
+            if number_groups > 0:
+                self._groups = groups
         return groups
 
+    def invalidate_groups(self, group_index=None):
+        """
+        Forget the cached groups. Called by the network on the Group notifications.
+
+        :param group_index: The group changed or None for all the groups
+        :type group_index: int
+
+        """
+        groups = self._groups
+        if groups is None:
+            return
+        if group_index is not None and group_index in groups:
+            groups[group_index].invalidate()
+        else:
+            self._groups = None
+
     def test(self, count=1):
         """
         Send a number of test messages to every node and record results.
@@ -363,30 +388,58 @@ class ZWaveNode( ZWaveObject,
                 ret[value] = self.values[value]
         return ret
 
-    def add_value(self, value_id):
+    def get_values_data(self, value_ids=None):
+        """
+        Read the data of the values from the library in one call.
+        Faster than reading the data property of each value.
+
+        :param value_ids: The ids of the values to read. All the values of the node if None
+        :type value_ids: list()
+        :return: A dict {value_id: data}
+        :rtype: dict()
+
+        """
+        if value_ids is None:
+            ret = self._network.manager.getNodeValues(self.home_id, self.node_id)
+        else:
+            ret = self._network.manager.getValues(value_ids, homeid=self.home_id)
+        for value_id in ret:
+            if ret[value_id] is not None and value_id in self.values \
+              and self.values[value_id].get_cached('type') in ("String", "List"):
+                ret[value_id] = ret[value_id].decode("UTF-8")
+        return ret
+
+    def add_value(self, value_id, value_data=None):
         """
         Add a value to the node
 
         :param value_id: The id of the value to add
         :type value_id: int
-        :param command_class: The command_class of the value
-        :type command_class: str
+        :param value_data: The valueId dict sent by the notification
+        :type value_data: dict()
         :rtype: bool
 
         """
-        value = ZWaveValue(value_id, network=self.network, parent=self)
+        value = ZWaveValue(value_id, network=self.network, parent=self, value_data=value_data)
         self.values[value_id] = value
 
-    def change_value(self, value_id):
+    def change_value(self, value_id, value_data=None):
         """
-        Change a value of the node.
-        Not implemented
+        Change a value of the node with the data reported by the device.
+        Update the cached data, the history and the aggregates of the value.
 
         :param value_id: The id of the value to change
         :type value_id: int
+        :param value_data: The valueId dict sent by the notification
+        :type value_data: dict()
 
         """
-        pass
+        if value_data is not None and value_id in self.values:
+            value = self.values[value_id]
+            value.value_data = value_data
+            value.last_confirmed = value.last_update
+            value.add_history(value_data.get('value', None), value.last_update)
+            value.add_aggregate(value_data.get('value', None), value.last_update)
 
     def refresh_value(self, value_id):
         """
@@ -397,7 +450,7 @@ class ZWaveNode( ZWaveObject,
         :type value_id: int
 
         """
-        return self._network.manager.refreshValue(value_id)
+        return self._network.manager.refreshValue(value_id, homeid=self.home_id)
 
     def remove_value(self, value_id):
         """
@@ -411,10 +464,56 @@ class ZWaveNode( ZWaveObject,
         """
         if value_id in self.values :
             logging.debug("Remove value : %s" % self.values[value_id])
+            self._unregister_aggregate(self.values[value_id])
             del(self.values[value_id])
             return True
         return False
 
+    def _register_aggregate(self, value, label):
+        """
+        Register a value with aggregates, so they can be queried without scanning the values.
+
+        :param value: The value
+        :type value: ZWaveValue
+        :param label: The label of the value
+        :type label: str
+
+        """
+        self._unregister_aggregate(value)
+        if self._aggregates is None:
+            self._aggregates = dict()
+        self._aggregates.setdefault(label, dict())[value.value_id] = value
+
+    def _unregister_aggregate(self, value):
+        """
+        Forget a value with aggregates.
+
+        :param value: The value
+        :type value: ZWaveValue
+
+        """
+        if not self._aggregates:
+            return
+        for label in list(self._aggregates.keys()):
+            values = self._aggregates[label]
+            if values.pop(value.value_id, None) is not None and len(values) == 0:
+                del self._aggregates[label]
+
+    def _get_aggregated_values(self, label=None):
+        """
+        The values with aggregates, by label.
+
+        :param label: Only the values with this label
+        :type label: str
+        :rtype: list()
+
+        """
+        if not self._aggregates:
+            return []
+        if label is not None:
+            return list(self._aggregates.get(label, dict()).values())
+        return [value for values in list(self._aggregates.values()) for value in list(values.values())]
+
     def set_field(self, field, value):
         """
         A helper to set a writable field : name, location, product_name, ...
@@ -600,7 +699,7 @@ class ZWaveNode( ZWaveObject,
         :rtype: bool
 
         """
-        return not self.isNodeAwake
+        return not self.isNodeAwake()
 
 
 #    @property
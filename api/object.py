@@ -86,7 +86,14 @@ class ZWaveObject(object):
     """
     Represents a Zwave object. Values, nodes, ... can be changer by
     other managers on the network.
+
+    Slots are used to keep values, nodes and groups small : they are
+    created by thousands. The dict of cached properties is only allocated
+    when a property is cached.
+    Subclasses which don't define __slots__ (network, controller, ...) get a __dict__.
     """
+    __slots__ = ('_network', '_last_update', '_outdated', '_use_cache', \
+        '_object_id', '_cached_properties', '__weakref__')
 
     def __init__(self, object_id, network = None, use_cache = True):
         """
@@ -103,10 +110,7 @@ class ZWaveObject(object):
         self._outdated = True
         self._use_cache = use_cache
         self._object_id = object_id
-        if self._use_cache:
-            self._cached_properties = dict()
-        else :
-            self._cached_properties = None
+        self._cached_properties = None
 
     @property
     def home_id(self):
@@ -187,8 +191,9 @@ class ZWaveObject(object):
         """
         if self._use_cache :
             if value :
-                for prop in self._cached_properties:
-                    self._cached_properties[prop] = True
+                if self._cached_properties is not None:
+                    for prop in self._cached_properties:
+                        self._cached_properties[prop] = True
                 self._outdated = value
             else:
                 raise ZWaveCacheException("Can't set outdated to False manually. It is done automatically.")
@@ -205,7 +210,7 @@ class ZWaveObject(object):
 
         """
         if self._use_cache :
-            if str(prop) in self._cached_properties:
+            if self._cached_properties is not None and str(prop) in self._cached_properties:
                 #print "property in cache %s" % self._cached_properties[str(prop)]
                 return self._cached_properties[str(prop)]
             else:
@@ -223,7 +228,7 @@ class ZWaveObject(object):
 
         """
         if self._use_cache :
-            if str(prop) in self._cached_properties:
+            if self._cached_properties is not None and str(prop) in self._cached_properties:
                 self._cached_properties[str(prop)] = True
                 self._outdated = True
         else:
@@ -238,7 +243,7 @@ class ZWaveObject(object):
 
         """
         if self._use_cache:
-            if str(prop) in self._cached_properties :
+            if self._cached_properties is not None and str(prop) in self._cached_properties :
                 self._cached_properties[str(prop)] = False
                 out_dated = False
                 for prop in self._cached_properties:
@@ -258,6 +263,8 @@ class ZWaveObject(object):
 
         """
         if self._use_cache :
+            if self._cached_properties is None:
+                self._cached_properties = dict()
             self._cached_properties[str(prop)] = True
         else:
             raise ZWaveCacheException("Cache not enabled")
@@ -278,7 +285,12 @@ class ZWaveNodeInterface(object):
     Represents an interface of a node. An interface can manage
     specific commandClasses (ie a switch, a dimmer, a thermostat, ...).
     Don't know what to do with it now but sure it must exist
+
+    Interfaces are mixed into ZWaveNode : they must not add attributes to
+    keep the slots of the node.
     """
+    __slots__ = ()
+    _class = "unknown"
 
     def __init__(self):
         """
@@ -290,4 +302,4 @@ class ZWaveNodeInterface(object):
         :type network: ZWaveNetwork
 
         """
-        self._class = "unknown"
+        pass
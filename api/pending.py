@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: openzwave.pending
+
+This file is part of **python-openzwave** project https://github.com/bibi21000/python-openzwave.
+    :platform: Unix, Windows, MacOS X
+    :sinopsis: openzwave API
+
+.. moduleauthor: bibi21000 aka Sébastien GALLET <bibi21000@gmail.com>
+
+License : GPL(v3)
+
+**python-openzwave** is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+**python-openzwave** is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with python-openzwave. If not, see http://www.gnu.org/licenses.
+
+"""
+import logging
+import time
+import threading
+from collections import OrderedDict
+from .util import dispatcher
+
+logging.getLogger('openzwave').addHandler(logging.NullHandler())
+
+#The notification code (PyNotificationCodes) of a node waking up
+CODE_AWAKE = 3
+
+class ZWavePendingWrites(object):
+    """
+    The writes waiting for sleeping nodes to wake up.
+
+    A write to a sleeping node is kept here instead of being sent to the
+    wake up queue of the library. Only the last data of a value is kept :
+    the writes to the same value are coalesced. The writes of a node are
+    sent in one batch when its Awake notification is received.
+
+    Signals sent with louie :
+
+        * SIGNAL_PENDING_WRITES_FLUSHED = 'PendingWritesFlushed' : network, node_id, value_ids
+
+    """
+    SIGNAL_PENDING_WRITES_FLUSHED = 'PendingWritesFlushed'
+
+    def __init__(self, network):
+        """
+        Initialize the pending writes
+
+        :param network: The network
+        :type network: ZWaveNetwork
+
+        """
+        self._network = network
+        self._lock = threading.Lock()
+        self._nodes = dict()
+        self._queued = 0
+        self._coalesced = 0
+        self._flushed = 0
+        dispatcher.connect(self._handle_notification, network.SIGNAL_NOTIFICATION)
+        dispatcher.connect(self._handle_node_removed, network.SIGNAL_NODE_REMOVED)
+        dispatcher.connect(self._handle_value_removed, network.SIGNAL_VALUE_REMOVED)
+
+    def __str__(self):
+        """
+        The string representation of the pending writes.
+
+        :rtype: str
+
+        """
+        return 'nodes: [%s] writes: [%s]' % (len(self._nodes), self.count)
+
+    def close(self):
+        """
+        Disconnect from the network. The pending writes are lost.
+
+        """
+        dispatcher.disconnect(self._handle_notification, self._network.SIGNAL_NOTIFICATION)
+        dispatcher.disconnect(self._handle_node_removed, self._network.SIGNAL_NODE_REMOVED)
+        dispatcher.disconnect(self._handle_value_removed, self._network.SIGNAL_VALUE_REMOVED)
+        with self._lock:
+            self._nodes = dict()
+
+    def write(self, value, data):
+        """
+        Write the data of a value : at once when the node is awake, at its wake up otherwise.
+        A write replaces the one waiting for the same value.
+
+        :param value: The value
+        :type value: ZWaveValue
+        :param data: The data to write
+        :type data: variable
+        :return: True if the write is waiting for the node to wake up
+        :rtype: bool
+
+        """
+        node_id = value.parent_id
+        node = self._network.nodes[node_id]
+        if not node.is_sleeping:
+            self.discard(node_id, value.value_id)
+            value.data = data
+            return False
+        with self._lock:
+            writes = self._nodes.setdefault(node_id, OrderedDict())
+            if value.value_id in writes:
+                queued, count = writes.pop(value.value_id)[1:]
+                self._coalesced += 1
+            else:
+                queued, count = time.time(), 0
+                self._queued += 1
+            writes[value.value_id] = (data, queued, count + 1)
+        logging.debug('Write of %s to value %s pending : node %s is sleeping' % (data, value.value_id, node_id))
+        return True
+
+    def discard(self, node_id=None, value_id=None):
+        """
+        Forget pending writes : all of them, the ones of a node or the one of a value.
+
+        :param node_id: The node or None for all the nodes
+        :type node_id: int
+        :param value_id: The value or None for all the values of the node
+        :type value_id: int
+        :return: The number of writes forgotten
+        :rtype: int
+
+        """
+        with self._lock:
+            if node_id is None:
+                ret = sum([len(writes) for writes in self._nodes.values()])
+                self._nodes = dict()
+                return ret
+            if node_id not in self._nodes:
+                return 0
+            if value_id is None:
+                return len(self._nodes.pop(node_id))
+            if self._nodes[node_id].pop(value_id, None) is None:
+                return 0
+            if len(self._nodes[node_id]) == 0:
+                del(self._nodes[node_id])
+            return 1
+
+    def flush(self, node_id):
+        """
+        Send the pending writes of a node, in the order of their last update.
+
+        :param node_id: The node
+        :type node_id: int
+        :return: The values written
+        :rtype: list()
+
+        """
+        with self._lock:
+            writes = self._nodes.pop(node_id, None)
+        if not writes:
+            return []
+        node = self._network.nodes.get(node_id, None) if self._network.nodes is not None else None
+        if node is None:
+            return []
+        ret = []
+        for value_id, (data, queued, count) in writes.items():
+            if value_id not in node.values:
+                continue
+            try:
+                node.values[value_id].data = data
+                ret.append(value_id)
+            except:
+                import sys, traceback
+                logging.error('Pending write to value %s : %s' % (value_id, traceback.format_exception(*sys.exc_info())))
+        with self._lock:
+            self._flushed += len(ret)
+        logging.debug('Pending writes of node %s flushed : %s' % (node_id, ret))
+        dispatcher.send(self.SIGNAL_PENDING_WRITES_FLUSHED, \
+            **{'network': self._network, 'node_id': node_id, 'value_ids': ret})
+        return ret
+
+    def is_pending(self, value_id, node_id=None):
+        """
+        Is a write waiting for a value.
+
+        :param value_id: The value
+        :type value_id: int
+        :param node_id: The node of the value, to avoid looking for it in all the nodes
+        :type node_id: int
+        :rtype: bool
+
+        """
+        with self._lock:
+            if node_id is not None:
+                return value_id in self._nodes.get(node_id, ())
+            for writes in self._nodes.values():
+                if value_id in writes:
+                    return True
+        return False
+
+    def pending(self, node_id=None):
+        """
+        The writes waiting for the nodes to wake up.
+
+        :param node_id: The node or None for all the nodes
+        :type node_id: int
+        :return: A dict {node_id: {value_id: {'data':..., 'queued':..., 'age':..., 'writes':...}}}.
+            queued is the time of the first write, writes the number of writes coalesced in this one
+        :rtype: dict()
+
+        """
+        now = time.time()
+        ret = dict()
+        with self._lock:
+            for nid, writes in self._nodes.items():
+                if node_id is not None and nid != node_id:
+                    continue
+                ret[nid] = dict([(value_id, {'data': data, 'queued': queued, \
+                    'age': now - queued, 'writes': count}) \
+                    for value_id, (data, queued, count) in writes.items()])
+        return ret
+
+    def age(self, node_id=None):
+        """
+        The age in seconds of the oldest pending write.
+
+        :param node_id: The node or None for all the nodes
+        :type node_id: int
+        :return: The age or None if there is no write waiting
+        :rtype: float
+
+        """
+        with self._lock:
+            queued = [queued for nid, writes in self._nodes.items() \
+                if node_id is None or nid == node_id \
+                for data, queued, count in writes.values()]
+        if len(queued) == 0:
+            return None
+        return time.time() - min(queued)
+
+    @property
+    def count(self):
+        """
+        The number of writes waiting.
+
+        :rtype: int
+
+        """
+        with self._lock:
+            return sum([len(writes) for writes in self._nodes.values()])
+
+    @property
+    def stats(self):
+        """
+        The statistics of the pending writes.
+
+            * nodes : number of nodes with pending writes
+            * pending : number of writes waiting
+            * queued : number of writes kept for a sleeping node
+            * coalesced : number of writes replacing a pending one
+            * flushed : number of writes sent at wake up
+
+        :rtype: dict()
+
+        """
+        with self._lock:
+            return {'nodes': len(self._nodes),
+                    'pending': sum([len(writes) for writes in self._nodes.values()]),
+                    'queued': self._queued,
+                    'coalesced': self._coalesced,
+                    'flushed': self._flushed,
+                    }
+
+    def _handle_notification(self, network, args):
+        """
+        The receiver of the notifications : wake up of the sleeping nodes.
+
+        """
+        if network is not self._network or args.get('notificationCode', None) != CODE_AWAKE:
+            return
+        if args.get('nodeId', None) in self._nodes:
+            self.flush(args['nodeId'])
+
+    def _handle_node_removed(self, network, node):
+        """
+        The receiver of the NodeRemoved signal.
+
+        """
+        if network is self._network:
+            self.discard(node.node_id)
+
+    def _handle_value_removed(self, network, node, value):
+        """
+        The receiver of the ValueRemoved signal.
+
+        """
+        if network is self._network:
+            self.discard(node.node_id, value.value_id)
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: openzwave.router
+
+This file is part of **python-openzwave** project https://github.com/bibi21000/python-openzwave.
+    :platform: Unix, Windows, MacOS X
+    :sinopsis: openzwave API
+
+.. moduleauthor: bibi21000 aka Sébastien GALLET <bibi21000@gmail.com>
+
+License : GPL(v3)
+
+**python-openzwave** is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+**python-openzwave** is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with python-openzwave. If not, see http://www.gnu.org/licenses.
+
+"""
+import logging
+import threading
+import libopenzwave
+from openzwave.object import ZWaveException
+from .util import tostr
+
+logging.getLogger('openzwave').addHandler(logging.NullHandler())
+
+class ZWaveManagerRouter(object):
+    """
+    Share one manager and one watcher between several networks
+    (ie several controllers in one process).
+
+    The notifications are routed to the network by their home id with
+    a dict lookup. A network has no home id until its driver is ready :
+    a DriverReady (or DriverFailed) with an unknown home id is given to
+    the waiting network whose device is the path of the controller
+    (getControllerPath). When no device matches (ie a DriverFailed without
+    home id), it is given to the oldest waiting network and a warning is logged.
+
+    """
+
+    def __init__(self, manager=None):
+        """
+        Initialize the router
+
+        :param manager: The manager to share. A new one is created if None
+        :type manager: libopenzwave.PyManager
+
+        """
+        if manager is None:
+            manager = libopenzwave.PyManager()
+            manager.create()
+        self._manager = manager
+        self._lock = threading.Lock()
+        self._networks = dict()
+        self._pending = []
+        self._watching = False
+        self._unrouted = 0
+
+    def __str__(self):
+        """
+        The string representation of the router.
+
+        :rtype: str
+
+        """
+        return 'networks: [%s] pending: [%s]' % \
+          (len(self._networks), len(self._pending))
+
+    @property
+    def manager(self):
+        """
+        The shared manager.
+
+        :rtype: libopenzwave.PyManager
+
+        """
+        return self._manager
+
+    @property
+    def networks(self):
+        """
+        The networks with a home id.
+
+        :rtype: dict()
+
+        """
+        return dict(self._networks)
+
+    @property
+    def pending(self):
+        """
+        The networks waiting for their driver.
+
+        :rtype: list()
+
+        """
+        return list(self._pending)
+
+    @property
+    def unrouted(self):
+        """
+        The number of notifications dropped because no network was found for their home id.
+
+        :rtype: int
+
+        """
+        return self._unrouted
+
+    def add_network(self, network):
+        """
+        Add a network. It will receive the notifications of the next driver ready.
+        The watcher is added with the first network.
+
+        :param network: The network
+        :type network: ZWaveNetwork
+
+        """
+        with self._lock:
+            if network in self._pending or network in self._networks.values():
+                raise ZWaveException("Network %s already added to the router" % network)
+            self._pending.append(network)
+            if not self._watching:
+                self._manager.addWatcher(self._route)
+                self._watching = True
+
+    def remove_network(self, network):
+        """
+        Remove a network. The watcher is removed with the last network.
+
+        :param network: The network
+        :type network: ZWaveNetwork
+
+        """
+        with self._lock:
+            self._pending = [net for net in self._pending if net is not network]
+            for home_id in [home_id for home_id in self._networks if self._networks[home_id] is network]:
+                del(self._networks[home_id])
+            if self._watching and len(self._pending) == 0 and len(self._networks) == 0:
+                self._manager.removeWatcher(self._route)
+                self._watching = False
+
+    def _match(self, home_id):
+        """
+        The waiting network whose device is the path of the controller of home_id.
+        Must be called with the lock held.
+
+        :param home_id: The home id of the controller
+        :type home_id: int
+        :return: The network or None
+        :rtype: ZWaveNetwork
+
+        """
+        try:
+            path = tostr(self._manager.getControllerPath(home_id))
+        except Exception:
+            return None
+        if not path:
+            return None
+        for network in self._pending:
+            if tostr(getattr(getattr(network, '_options', None), 'device', None)) == path:
+                return network
+        return None
+
+    def _route(self, args):
+        """
+        The watcher of the shared manager.
+
+        :param args: A dict containing information about the state of the controller
+        :type args: dict()
+
+        """
+        network = self._networks.get(args['homeId'], None)
+        if network is None:
+            with self._lock:
+                network = self._networks.get(args['homeId'], None)
+                if network is None and len(self._pending) > 0 \
+                  and args['notificationType'] in ('DriverReady', 'DriverFailed'):
+                    network = self._match(args['homeId'])
+                    if network is None:
+                        network = self._pending[0]
+                        logging.warning("Router : no network with the device of home id %08x, %s given to the oldest one" % \
+                            (args['homeId'], args['notificationType']))
+                    self._pending.remove(network)
+                    if args['notificationType'] == 'DriverReady':
+                        self._networks[args['homeId']] = network
+        if network is None:
+            self._unrouted += 1
+            logging.warning("Router : no network for home id %08x (%s)" % (args['homeId'], args['notificationType']))
+            return
+        network.zwcallback(args)
@@ -25,7 +25,7 @@ along with python-openzwave. If not, see http://www.gnu.org/licenses.
 """
 import logging
 from openzwave.object import ZWaveObject
-from .util import isstr
+from .util import isstr, tostr
 
 logging.getLogger('openzwave').addHandler(logging.NullHandler())
 
@@ -120,7 +120,7 @@ class ZWaveScene(ZWaveObject):
         if isstr(value_data):
             value_data = value_data.encode("UTF-8")
 
-        ret = self._network.manager.addSceneValue(self.scene_id, value_id, value_data)
+        ret = self._network.manager.addSceneValue(self.scene_id, value_id, value_data, homeid=self.home_id)
         if ret == 1:
             return True
         return False
@@ -138,7 +138,7 @@ class ZWaveScene(ZWaveObject):
         if isstr(value_data):
             value_data = value_data.encode("UTF-8")
 
-        ret = self._network.manager.setSceneValue(self.scene_id, value_id, value_data)
+        ret = self._network.manager.setSceneValue(self.scene_id, value_id, value_data, homeid=self.home_id)
         if ret == 1:
             return True
         return False
@@ -190,7 +190,7 @@ class ZWaveScene(ZWaveObject):
         :rtype: bool
 
         """
-        return self._network.manager.removeSceneValue(self.scene_id, value_id)
+        return self._network.manager.removeSceneValue(self.scene_id, value_id, homeid=self.home_id)
 
     def activate(self):
         """
@@ -201,3 +201,42 @@ class ZWaveScene(ZWaveObject):
 
         """
         return self._network.manager.activateScene(self.object_id)
+
+    def activate_changes(self, dry_run=False):
+        """
+        Activate the zwave scene from python : only the values whose cached
+        data differs from the data of the scene are sent. The values are
+        sent node by node, so each node is handled in one go.
+
+        Values without cached data are sent.
+
+        :param dry_run: Only compute what would be sent
+        :type dry_run: bool
+        :returns: A dict : {'sent': [value_id, ...], 'skipped': [value_id, ...], 'failed': [value_id, ...]}.
+            skipped holds the values already in the state of the scene, failed the values which can't be set.
+        :rtype: dict()
+
+        """
+        ret = {'sent': [], 'skipped': [], 'failed': []}
+        values = self.get_values_by_node()
+        for node_id in sorted(values):
+            for value_id in sorted(values[node_id]):
+                value = values[node_id][value_id]['value']
+                data = values[node_id][value_id]['data']
+                if value.get_cached('type') in ("String", "List"):
+                    data = tostr(data)
+                current = value.get_cached('value')
+                if current is not None and current == data:
+                    ret['skipped'].append(value_id)
+                    continue
+                new_data = value.check_data(data)
+                if new_data is None:
+                    ret['failed'].append(value_id)
+                    continue
+                if not dry_run:
+                    #check_data encodes the strings, the data setter does it too
+                    value.data = data if value.get_cached('type') == "String" else new_data
+                ret['sent'].append(value_id)
+        logging.debug('Scene %s activated : %s sent, %s skipped, %s failed' % \
+            (self.object_id, len(ret['sent']), len(ret['skipped']), len(ret['failed'])))
+        return ret
@@ -0,0 +1,531 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: openzwave.shared
+
+This file is part of **python-openzwave** project https://github.com/bibi21000/python-openzwave.
+    :platform: Unix, Windows, MacOS X
+    :sinopsis: openzwave API
+
+.. moduleauthor: bibi21000 aka Sébastien GALLET <bibi21000@gmail.com>
+
+License : GPL(v3)
+
+**python-openzwave** is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+**python-openzwave** is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with python-openzwave. If not, see http://www.gnu.org/licenses.
+
+"""
+import os
+import logging
+import mmap
+import struct
+import tempfile
+import threading
+import time
+from .util import dispatcher, tostr
+from openzwave.object import ZWaveException
+
+logging.getLogger('openzwave').addHandler(logging.NullHandler())
+
+#The header of the table : magic, capacity, number of slots used, generation
+HEADER = struct.Struct('<8sIII44x')
+MAGIC = b'PYOZWSM1'
+#The sequence number of a slot. Odd while the slot is written.
+SEQ = struct.Struct('<I')
+#The body of a slot : metadata version, value_id, timestamp, node_id, kind, flags,
+#integer data, float data, string data, label, units
+BODY = struct.Struct('<IQdBBB5xqd64s32s16s')
+SLOT_SIZE = SEQ.size + BODY.size
+KIND_NONE = 0
+KIND_BOOL = 1
+KIND_INT = 2
+KIND_FLOAT = 3
+KIND_STRING = 4
+KIND_RAW = 5
+FLAG_USED = 0x01
+FLAG_READONLY = 0x02
+FLAG_REMOVED = 0x04
+#How many times a reader retries a slot which is written
+READ_RETRIES = 1000
+
+def default_path(name='python-openzwave-values'):
+    """
+    The default path of a table : in /dev/shm if available, in the temporary directory otherwise.
+
+    :param name: The name of the file
+    :type name: str
+    :rtype: str
+
+    """
+    if os.path.isdir('/dev/shm'):
+        return os.path.join('/dev/shm', name)
+    return os.path.join(tempfile.gettempdir(), name)
+
+def _encode(text, size):
+    """
+    Encode a string to utf-8, truncated to size bytes.
+
+    """
+    if text is None:
+        return b''
+    if not isinstance(text, bytes):
+        text = text.encode('utf-8')
+    return text[:size]
+
+def _decode(raw):
+    """
+    Decode a string padded with null bytes.
+
+    """
+    return raw.rstrip(b'\x00').decode('utf-8', 'replace')
+
+class ZWaveSharedTable(object):
+    """
+    Publish the last data and the metadata of the values of a network in a
+    memory-mapped file, so that other processes can read them without
+    asking the process which owns the network.
+
+    Every value gets a slot, allocated when the value is first published.
+    Slots are protected by a seqlock : the sequence number of a slot is odd
+    while the slot is written, so a reader retries when the number is odd
+    or has changed during its read. The writer never waits for the readers.
+
+    The metadata version of a slot is increased when the label, the units
+    or the read only flag of the value change.
+
+    """
+
+    def __init__(self, path=None, capacity=1024):
+        """
+        Initialize the table
+
+        :param path: The file of the table. Use default_path() if None
+        :type path: str
+        :param capacity: The maximum number of values
+        :type capacity: int
+
+        """
+        self._path = path if path is not None else default_path()
+        self._capacity = capacity
+        self._lock = threading.Lock()
+        self._file = None
+        self._buf = None
+        self._slots = dict()
+        self._seqs = []
+        self._metas = []
+        self._generation = 0
+        self._network = None
+        self._published = 0
+        self._dropped = 0
+
+    def __str__(self):
+        """
+        The string representation of the table.
+
+        :rtype: str
+
+        """
+        return 'path: [%s] slots: [%s/%s]' % \
+          (self._path, len(self._slots), self._capacity)
+
+    @property
+    def path(self):
+        """
+        The file of the table.
+
+        :rtype: str
+
+        """
+        return self._path
+
+    def open(self):
+        """
+        Create the table or reset an existing one.
+        An existing file with the right size is reset in place, so readers
+        which have already mapped it see the new values.
+
+        """
+        with self._lock:
+            if self._buf is not None:
+                return
+            size = HEADER.size + self._capacity * SLOT_SIZE
+            generation = 1
+            if os.path.exists(self._path) and os.path.getsize(self._path) == size:
+                self._file = open(self._path, 'r+b')
+                self._buf = mmap.mmap(self._file.fileno(), size)
+                magic, capacity, count, generation = HEADER.unpack_from(self._buf, 0)
+                generation = (generation + 1) & 0xffffffff if magic == MAGIC else 1
+                seqs = [0] * self._capacity
+                #Clear the old slots : readers will not find their value anymore
+                for i in range(min(count, capacity, self._capacity) if magic == MAGIC else 0):
+                    offset = HEADER.size + i * SLOT_SIZE
+                    seq = SEQ.unpack_from(self._buf, offset)[0] & 0xfffffffe
+                    SEQ.pack_into(self._buf, offset, (seq + 1) & 0xffffffff)
+                    self._buf[offset + SEQ.size:offset + SLOT_SIZE] = b'\x00' * BODY.size
+                    seqs[i] = (seq + 2) & 0xffffffff
+                    SEQ.pack_into(self._buf, offset, seqs[i])
+            else:
+                self._file = open(self._path, 'w+b')
+                self._file.truncate(size)
+                self._buf = mmap.mmap(self._file.fileno(), size)
+                seqs = [0] * self._capacity
+            self._generation = generation
+            self._slots = dict()
+            self._seqs = seqs
+            self._metas = [None] * self._capacity
+            HEADER.pack_into(self._buf, 0, MAGIC, self._capacity, 0, self._generation)
+
+    def close(self):
+        """
+        Close the table. The file is kept, so readers can still use it.
+
+        """
+        self.detach()
+        with self._lock:
+            if self._buf is None:
+                return
+            self._buf.flush()
+            self._buf.close()
+            self._file.close()
+            self._buf = None
+            self._file = None
+
+    def attach(self, network):
+        """
+        Publish the values of a network when they are added, changed, refreshed or removed.
+        Open the table if needed and publish the values already known.
+
+        :param network: The network
+        :type network: ZWaveNetwork
+
+        """
+        self.open()
+        self._network = network
+        if network.nodes is not None:
+            for node in list(network.nodes.values()):
+                for value in list(node.values.values()):
+                    self.publish(value)
+        dispatcher.connect(self._handle_value, network.SIGNAL_VALUE_ADDED)
+        dispatcher.connect(self._handle_value, network.SIGNAL_VALUE_CHANGED)
+        dispatcher.connect(self._handle_value, network.SIGNAL_VALUE_REFRESHED)
+        dispatcher.connect(self._handle_value_removed, network.SIGNAL_VALUE_REMOVED)
+
+    def detach(self):
+        """
+        Stop publishing the values of the network.
+
+        """
+        if self._network is None:
+            return
+        dispatcher.disconnect(self._handle_value, self._network.SIGNAL_VALUE_ADDED)
+        dispatcher.disconnect(self._handle_value, self._network.SIGNAL_VALUE_CHANGED)
+        dispatcher.disconnect(self._handle_value, self._network.SIGNAL_VALUE_REFRESHED)
+        dispatcher.disconnect(self._handle_value_removed, self._network.SIGNAL_VALUE_REMOVED)
+        self._network = None
+
+    def _handle_value(self, network, value):
+        """
+        The receiver of the value signals.
+
+        """
+        if network is not self._network:
+            return
+        self.publish(value)
+
+    def _handle_value_removed(self, network, value):
+        """
+        The receiver of the value removed signal.
+
+        """
+        if network is not self._network:
+            return
+        self.publish(value, removed=True)
+
+    def publish(self, value, removed=False):
+        """
+        Write the cached data and metadata of a value in its slot.
+
+        :param value: The value
+        :type value: ZWaveValue
+        :param removed: The value has been removed
+        :type removed: bool
+        :return: False if the table is closed or full
+        :rtype: bool
+
+        """
+        return self.put(value.value_id, value.parent_id, value.get_cached('value'), \
+            label=value.get_cached('label', ''), units=value.get_cached('units', ''), \
+            read_only=value.get_cached('readOnly', False), \
+            timestamp=value.last_update, removed=removed, \
+            raw=value.get_cached('type') == 'Raw')
+
+    def put(self, value_id, node_id, data, label='', units='', read_only=False, timestamp=None, removed=False, raw=None):
+        """
+        Write the data and the metadata of a value in its slot.
+
+        :param value_id: The id of the value
+        :type value_id: int
+        :param node_id: The id of the node of the value
+        :type node_id: int
+        :param data: The data
+        :type data: bool, int, float, str or bytes
+        :param label: The label of the value
+        :type label: str
+        :param units: The units of the value
+        :type units: str
+        :param read_only: The value is read only
+        :type read_only: bool
+        :param timestamp: The time of the data. Now if None
+        :type timestamp: float
+        :param removed: The value has been removed
+        :type removed: bool
+        :param raw: The data are bytes, stored without decoding (the first 64 bytes).
+            Guessed from the type of data if None : bytes (python 3), bytearray and memoryview are raw
+        :type raw: bool
+        :return: False if the table is closed or full
+        :rtype: bool
+
+        """
+        int_data, float_data, text = 0, 0.0, b''
+        if raw is None:
+            raw = isinstance(data, (bytearray, memoryview)) or \
+                (isinstance(data, bytes) and not isinstance(data, str))
+        if data is None:
+            kind = KIND_NONE
+        elif raw:
+            text = bytes(bytearray(data))
+            kind, int_data, text = KIND_RAW, len(text), text[:64]
+        elif isinstance(data, bool):
+            kind, int_data = KIND_BOOL, int(data)
+        elif isinstance(data, float):
+            kind, float_data = KIND_FLOAT, data
+        elif isinstance(data, int) or type(data).__name__ == 'long':
+            kind, int_data = KIND_INT, data
+        else:
+            try:
+                kind, text = KIND_STRING, _encode(tostr(data), 64)
+            except UnicodeDecodeError:
+                #A python 2 string which is not utf-8
+                kind, int_data, text = KIND_RAW, len(data), data[:64]
+        flags = FLAG_USED
+        if read_only:
+            flags |= FLAG_READONLY
+        if removed:
+            flags |= FLAG_REMOVED
+        if timestamp is None:
+            timestamp = time.time()
+        label = _encode(label, 32)
+        units = _encode(units, 16)
+        with self._lock:
+            if self._buf is None:
+                return False
+            slot = self._slots.get(value_id, None)
+            added = slot is None
+            if added:
+                slot = len(self._slots)
+                if slot >= self._capacity:
+                    self._dropped += 1
+                    logging.warning("Shared table %s is full : value %s not published" % (self._path, value_id))
+                    return False
+                self._slots[value_id] = slot
+            meta = (label, units, flags)
+            meta_version = self._metas[slot][0] if self._metas[slot] is not None else 0
+            if self._metas[slot] is None or self._metas[slot][1] != meta:
+                meta_version += 1
+                self._metas[slot] = (meta_version, meta)
+            offset = HEADER.size + slot * SLOT_SIZE
+            seq = self._seqs[slot]
+            SEQ.pack_into(self._buf, offset, (seq + 1) & 0xffffffff)
+            BODY.pack_into(self._buf, offset + SEQ.size, meta_version, value_id, timestamp, node_id, kind, flags, \
+                int_data, float_data, text, label, units)
+            seq = (seq + 2) & 0xffffffff
+            SEQ.pack_into(self._buf, offset, seq)
+            self._seqs[slot] = seq
+            if added:
+                HEADER.pack_into(self._buf, 0, MAGIC, self._capacity, len(self._slots), self._generation)
+            self._published += 1
+            return True
+
+    @property
+    def stats(self):
+        """
+        The statistics of the table.
+
+            * slots : number of slots used
+            * capacity : number of slots
+            * published : number of writes
+            * dropped : number of writes lost because the table was full
+
+        :rtype: dict()
+
+        """
+        return {'slots': len(self._slots),
+                'capacity': self._capacity,
+                'published': self._published,
+                'dropped': self._dropped,
+                }
+
+class ZWaveSharedReader(object):
+    """
+    Read the values published by a ZWaveSharedTable, from any process.
+
+    The table is memory-mapped read only and the slots are decoded in place.
+    The map value_id -> slot is updated when an unknown value is asked for
+    or when the table has been reset.
+
+    """
+
+    def __init__(self, path=None):
+        """
+        Initialize the reader
+
+        :param path: The file of the table. Use default_path() if None
+        :type path: str
+
+        """
+        self._path = path if path is not None else default_path()
+        self._file = open(self._path, 'rb')
+        self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._slots = dict()
+        self._count = 0
+        self._generation = None
+
+    def close(self):
+        """
+        Unmap the table.
+
+        """
+        if self._buf is not None:
+            self._buf.close()
+            self._file.close()
+            self._buf = None
+            self._file = None
+
+    def _update_slots(self):
+        """
+        Map the new slots (all of them if the table has been reset).
+
+        """
+        magic, capacity, count, generation = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC:
+            raise ZWaveException("Bad shared table %s" % self._path)
+        if generation != self._generation:
+            self._slots = dict()
+            self._count = 0
+            self._generation = generation
+        for slot in range(self._count, count):
+            value_id = struct.unpack_from('<Q', self._buf, HEADER.size + slot * SLOT_SIZE + SEQ.size + 4)[0]
+            self._slots[value_id] = slot
+        self._count = count
+
+    def slot(self, value_id):
+        """
+        The slot of a value.
+
+        :param value_id: The id of the value
+        :type value_id: int
+        :return: The slot or None if the value is not published
+        :rtype: int
+
+        """
+        slot = self._slots.get(value_id, None)
+        if slot is None:
+            self._update_slots()
+            slot = self._slots.get(value_id, None)
+        return slot
+
+    def _read_slot(self, slot):
+        """
+        Read a slot with the seqlock protocol.
+
+        """
+        offset = HEADER.size + slot * SLOT_SIZE
+        for i in range(READ_RETRIES):
+            seq = SEQ.unpack_from(self._buf, offset)[0]
+            if seq & 1:
+                time.sleep(0)
+                continue
+            body = BODY.unpack_from(self._buf, offset + SEQ.size)
+            if SEQ.unpack_from(self._buf, offset)[0] == seq:
+                return seq, body
+        raise ZWaveException("Slot %s of shared table %s is always written" % (slot, self._path))
+
+    def version(self, value_id):
+        """
+        The versions of the data and the metadata of a value. Cheap enough to be polled.
+
+        :param value_id: The id of the value
+        :type value_id: int
+        :return: (data version, metadata version) or None if the value is not published
+        :rtype: tuple()
+
+        """
+        slot = self.slot(value_id)
+        if slot is None:
+            return None
+        seq, body = self._read_slot(slot)
+        if body[1] != value_id:
+            self._generation = None
+            return None
+        return (seq // 2, body[0])
+
+    def get(self, value_id):
+        """
+        The last published data and metadata of a value.
+
+        :param value_id: The id of the value
+        :type value_id: int
+        :return: A dict : {'value_id', 'node_id', 'data', 'label', 'units', 'read_only', 'removed', 'timestamp', 'version', 'meta_version'} or None
+        :rtype: dict()
+
+        """
+        slot = self.slot(value_id)
+        if slot is None:
+            return None
+        seq, body = self._read_slot(slot)
+        meta_version, vid, timestamp, node_id, kind, flags, int_data, float_data, text, label, units = body
+        if vid != value_id:
+            #The table has been reset : map the slots again next time
+            self._generation = None
+            return None
+        if kind == KIND_BOOL:
+            data = bool(int_data)
+        elif kind == KIND_INT:
+            data = int_data
+        elif kind == KIND_FLOAT:
+            data = float_data
+        elif kind == KIND_STRING:
+            data = _decode(text)
+        elif kind == KIND_RAW:
+            data = text[:min(int_data, len(text))]
+        else:
+            data = None
+        return {'value_id': vid,
+                'node_id': node_id,
+                'data': data,
+                'label': _decode(label),
+                'units': _decode(units),
+                'read_only': bool(flags & FLAG_READONLY),
+                'removed': bool(flags & FLAG_REMOVED),
+                'timestamp': timestamp,
+                'version': seq // 2,
+                'meta_version': meta_version,
+                }
+
+    def value_ids(self):
+        """
+        The ids of the published values.
+
+        :rtype: list()
+
+        """
+        self._update_slots()
+        return list(self._slots.keys())
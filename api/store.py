@@ -0,0 +1,420 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: openzwave.store
+
+This file is part of **python-openzwave** project https://github.com/bibi21000/python-openzwave.
+    :platform: Unix, Windows, MacOS X
+    :sinopsis: openzwave API
+
+.. moduleauthor: bibi21000 aka Sébastien GALLET <bibi21000@gmail.com>
+
+License : GPL(v3)
+
+**python-openzwave** is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+**python-openzwave** is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with python-openzwave. If not, see http://www.gnu.org/licenses.
+
+"""
+import os
+import logging
+import mmap
+import struct
+import threading
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+from .util import dispatcher
+from openzwave.object import ZWaveException
+
+logging.getLogger('openzwave').addHandler(logging.NullHandler())
+
+#The header of a segment : magic, number of records, capacity
+HEADER = struct.Struct('<8sQQ')
+MAGIC = b'PYOZWTS1'
+#A record : timestamp, value_id, data, kind of data
+RECORD = struct.Struct('<dQdB7x')
+KIND_FLOAT = 0
+KIND_INT = 1
+KIND_BOOL = 2
+SEGMENT_PREFIX = 'values-'
+SEGMENT_SUFFIX = '.seg'
+
+def _segment_name(number, timestamp):
+    """
+    The file name of a segment : its number and the timestamp of its first record.
+
+    """
+    return '%s%08d-%015d%s' % (SEGMENT_PREFIX, number, int(timestamp * 1000), SEGMENT_SUFFIX)
+
+def _segment_start(name):
+    """
+    The timestamp of the first record of a segment.
+
+    """
+    return int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)].split('-')[1]) / 1000.0
+
+def _list_segments(path):
+    """
+    The segments of a store, oldest first.
+
+    """
+    if not os.path.isdir(path):
+        return []
+    return sorted([f for f in os.listdir(path) \
+        if f.startswith(SEGMENT_PREFIX) and f.endswith(SEGMENT_SUFFIX)])
+
+class ZWaveValueStore(object):
+    """
+    An append-only store of the data of the values, in memory-mapped segments.
+
+    Each record has a fixed width (32 bytes) : timestamp, value_id, data and
+    the kind of data (float, int or bool). A segment is a preallocated file
+    of segment_records records, named after its number and the timestamp
+    of its first record.
+
+    The records are queued by the notification thread and written by the
+    thread of the store : the notification thread never waits for the disk.
+    When the queue is full, the records are dropped and counted.
+
+    """
+
+    def __init__(self, path, segment_records=65536, queue_size=10000):
+        """
+        Initialize the store
+
+        :param path: The directory of the segments
+        :type path: str
+        :param segment_records: The number of records in a segment
+        :type segment_records: int
+        :param queue_size: The maximum number of records waiting to be written
+        :type queue_size: int
+
+        """
+        self._path = path
+        self._segment_records = segment_records
+        self._queue = queue.Queue(queue_size)
+        self._thread = None
+        self._network = None
+        self._file = None
+        self._mmap = None
+        self._count = 0
+        self._capacity = 0
+        self._written = 0
+        self._dropped = 0
+
+    @property
+    def path(self):
+        """
+        The directory of the segments.
+
+        :rtype: str
+
+        """
+        return self._path
+
+    @property
+    def stats(self):
+        """
+        The statistics of the store : {'written', 'dropped', 'pending'}.
+
+        :rtype: dict()
+
+        """
+        return {'written': self._written,
+                'dropped': self._dropped,
+                'pending': self._queue.qsize(),
+                }
+
+    def start(self):
+        """
+        Start the writer thread.
+
+        """
+        if self._thread is not None:
+            return
+        if not os.path.isdir(self._path):
+            os.makedirs(self._path)
+        self._thread = threading.Thread(target=self._run, name='ZWaveValueStore')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=10.0):
+        """
+        Write the pending records and stop the writer thread.
+
+        :param timeout: The time to wait for the thread
+        :type timeout: float
+
+        """
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def attach(self, network):
+        """
+        Store the data of the values of a network when they are changed or refreshed.
+        Start the writer thread if needed.
+
+        :param network: The network
+        :type network: ZWaveNetwork
+
+        """
+        self.start()
+        self._network = network
+        dispatcher.connect(self._handle_value, network.SIGNAL_VALUE_CHANGED)
+        dispatcher.connect(self._handle_value, network.SIGNAL_VALUE_REFRESHED)
+
+    def detach(self):
+        """
+        Stop storing the data of the values of the network.
+
+        """
+        if self._network is None:
+            return
+        dispatcher.disconnect(self._handle_value, self._network.SIGNAL_VALUE_CHANGED)
+        dispatcher.disconnect(self._handle_value, self._network.SIGNAL_VALUE_REFRESHED)
+        self._network = None
+
+    def _handle_value(self, network, value):
+        """
+        The receiver of the value signals.
+
+        """
+        if network is not self._network:
+            return
+        self.put(value.last_update, value.value_id, value.get_cached('value'))
+
+    def put(self, timestamp, value_id, data):
+        """
+        Queue a record. Never blocks. Data which are not numbers are ignored.
+
+        :param timestamp: The time of the data
+        :type timestamp: float
+        :param value_id: The id of the value
+        :type value_id: int
+        :param data: The data
+        :type data: bool, int or float
+        :return: False if the record was not queued
+        :rtype: bool
+
+        """
+        if isinstance(data, bool):
+            kind = KIND_BOOL
+        elif isinstance(data, float):
+            kind = KIND_FLOAT
+        elif isinstance(data, int) or type(data).__name__ == 'long':
+            kind = KIND_INT
+        else:
+            return False
+        try:
+            self._queue.put_nowait((timestamp, value_id, float(data), kind))
+            return True
+        except queue.Full:
+            self._dropped += 1
+            return False
+
+    def _run(self):
+        """
+        The writer loop. Records are written in batches : the count of the
+        segment is updated once by batch.
+
+        """
+        try:
+            while True:
+                record = self._queue.get()
+                stop = record is None
+                batch = [] if stop else [record]
+                while not stop:
+                    try:
+                        record = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if record is None:
+                        stop = True
+                    else:
+                        batch.append(record)
+                self._write(batch)
+                if stop:
+                    break
+        except:
+            import sys, traceback
+            logging.error('Value store : %s' % (traceback.format_exception(*sys.exc_info())))
+        finally:
+            self._close_segment()
+
+    def _write(self, batch):
+        """
+        Write records in the segments.
+
+        """
+        for timestamp, value_id, data, kind in batch:
+            if self._mmap is None or self._count >= self._capacity:
+                self._open_segment(timestamp)
+            RECORD.pack_into(self._mmap, HEADER.size + self._count * RECORD.size, \
+                timestamp, value_id, data, kind)
+            self._count += 1
+            self._written += 1
+        if self._mmap is not None:
+            HEADER.pack_into(self._mmap, 0, MAGIC, self._count, self._capacity)
+
+    def _open_segment(self, timestamp):
+        """
+        Open the last segment if it is not full or create a new one.
+
+        """
+        self._close_segment()
+        segments = _list_segments(self._path)
+        if len(segments) > 0:
+            self._map_segment(os.path.join(self._path, segments[-1]))
+            if self._count < self._capacity:
+                return
+            self._close_segment()
+        number = int(segments[-1][len(SEGMENT_PREFIX):].split('-')[0]) + 1 if len(segments) > 0 else 0
+        filename = os.path.join(self._path, _segment_name(number, timestamp))
+        with open(filename, 'wb') as segment:
+            segment.write(HEADER.pack(MAGIC, 0, self._segment_records))
+            segment.truncate(HEADER.size + self._segment_records * RECORD.size)
+        self._map_segment(filename)
+
+    def _map_segment(self, filename):
+        """
+        Map a segment in memory.
+
+        """
+        self._file = open(filename, 'r+b')
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        magic, self._count, self._capacity = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self._close_segment()
+            raise ZWaveException("Bad segment %s" % filename)
+
+    def _close_segment(self):
+        """
+        Flush and unmap the current segment.
+
+        """
+        if self._mmap is not None:
+            HEADER.pack_into(self._mmap, 0, MAGIC, self._count, self._capacity)
+            self._mmap.flush()
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class ZWaveStoreReader(object):
+    """
+    Read the records of a ZWaveValueStore, while it is written or not.
+
+    The segments are memory-mapped and the records are decoded in place :
+    nothing is copied but the records returned.
+
+    """
+
+    def __init__(self, path):
+        """
+        Initialize the reader
+
+        :param path: The directory of the segments
+        :type path: str
+
+        """
+        self._path = path
+
+    def _segments(self, start=None, stop=None):
+        """
+        The segments which may contain records between start and stop.
+
+        """
+        segments = _list_segments(self._path)
+        firsts = [_segment_start(name) for name in segments]
+        ret = []
+        for i in range(len(segments)):
+            if stop is not None and firsts[i] > stop:
+                break
+            #The timestamps of the names are rounded down to the millisecond
+            if start is not None and i + 1 < len(segments) and firsts[i + 1] + 0.001 <= start:
+                continue
+            ret.append(os.path.join(self._path, segments[i]))
+        return ret
+
+    def _first_index(self, buf, count, start):
+        """
+        The index of the first record newer than or at start (binary search on timestamps).
+
+        """
+        low, high = 0, count
+        while low < high:
+            mid = (low + high) // 2
+            if struct.unpack_from('<d', buf, HEADER.size + mid * RECORD.size)[0] < start:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def range(self, value_id=None, start=None, stop=None):
+        """
+        Iterate over the records of a value between two timestamps.
+
+        :param value_id: The id of the value or None for all the values
+        :type value_id: int
+        :param start: The first timestamp (included)
+        :type start: float
+        :param stop: The last timestamp (excluded)
+        :type stop: float
+        :return: A generator of (timestamp, value_id, data)
+        :rtype: generator
+
+        """
+        for filename in self._segments(start, stop):
+            with open(filename, 'rb') as segment:
+                size = os.fstat(segment.fileno()).st_size
+                if size < HEADER.size:
+                    continue
+                buf = mmap.mmap(segment.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    magic, count, capacity = HEADER.unpack_from(buf, 0)
+                    if magic != MAGIC:
+                        continue
+                    first = 0 if start is None else self._first_index(buf, count, start)
+                    for i in range(first, count):
+                        timestamp, vid, data, kind = RECORD.unpack_from(buf, HEADER.size + i * RECORD.size)
+                        if stop is not None and timestamp >= stop:
+                            return
+                        if value_id is not None and vid != value_id:
+                            continue
+                        if kind == KIND_BOOL:
+                            data = bool(data)
+                        elif kind == KIND_INT:
+                            data = int(data)
+                        yield (timestamp, vid, data)
+                finally:
+                    buf.close()
+
+    def count(self):
+        """
+        The number of records in the store.
+
+        :rtype: int
+
+        """
+        ret = 0
+        for filename in self._segments():
+            with open(filename, 'rb') as segment:
+                header = segment.read(HEADER.size)
+                if len(header) == HEADER.size:
+                    magic, count, capacity = HEADER.unpack(header)
+                    if magic == MAGIC:
+                        ret += count
+        return ret
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: openzwave.timing
+
+This file is part of **python-openzwave** project https://github.com/bibi21000/python-openzwave.
+    :platform: Unix, Windows, MacOS X
+    :sinopsis: openzwave API
+
+.. moduleauthor: bibi21000 aka Sébastien GALLET <bibi21000@gmail.com>
+
+License : GPL(v3)
+
+**python-openzwave** is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+**python-openzwave** is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with python-openzwave. If not, see http://www.gnu.org/licenses.
+
+"""
+import logging
+import threading
+from timeit import default_timer
+
+logging.getLogger('openzwave').addHandler(logging.NullHandler())
+
+class ZWaveHistogram(object):
+    """
+    A histogram of durations with log2 buckets.
+
+    The bucket i counts the durations between 2^i and 2^(i+1) microseconds
+    (the bucket 0 counts the durations lower than 2 microseconds).
+    Recording a duration costs a few integer operations : it can be used in
+    the notification path.
+
+    """
+    BUCKETS = 32
+
+    def __init__(self):
+        """
+        Initialize the histogram
+
+        """
+        self.reset()
+
+    def reset(self):
+        """
+        Clear the histogram.
+
+        """
+        self._buckets = [0] * self.BUCKETS
+        self._count = 0
+        self._total = 0.0
+        self._min = None
+        self._max = None
+
+    def record(self, seconds):
+        """
+        Add a duration to the histogram.
+
+        :param seconds: The duration in seconds
+        :type seconds: float
+
+        """
+        micros = int(seconds * 1000000)
+        i = micros.bit_length() - 1 if micros > 1 else 0
+        if i >= self.BUCKETS:
+            i = self.BUCKETS - 1
+        self._buckets[i] += 1
+        self._count += 1
+        self._total += seconds
+        if self._min is None or seconds < self._min:
+            self._min = seconds
+        if self._max is None or seconds > self._max:
+            self._max = seconds
+
+    @property
+    def count(self):
+        """
+        The number of durations recorded.
+
+        :rtype: int
+
+        """
+        return self._count
+
+    @property
+    def total(self):
+        """
+        The sum of the durations in seconds.
+
+        :rtype: float
+
+        """
+        return self._total
+
+    @property
+    def mean(self):
+        """
+        The mean duration in seconds.
+
+        :rtype: float
+
+        """
+        return self._total / self._count if self._count else 0.0
+
+    @property
+    def buckets(self):
+        """
+        The buckets of the histogram : a list of (upper bound in seconds, count).
+        Empty buckets at the end are not returned.
+
+        :rtype: list()
+
+        """
+        last = max([i for i in range(self.BUCKETS) if self._buckets[i] > 0] or [-1])
+        return [((2 ** (i + 1)) / 1000000.0, self._buckets[i]) for i in range(last + 1)]
+
+    def percentile(self, percent):
+        """
+        Estimate a percentile of the durations. The upper bound of
+        the bucket is returned, so the estimation is at most twice the real value.
+
+        :param percent: The percentile (ie 50, 99)
+        :type percent: float
+        :return: The duration in seconds
+        :rtype: float
+
+        """
+        if self._count == 0:
+            return 0.0
+        wanted = self._count * percent / 100.0
+        seen = 0
+        for i in range(self.BUCKETS):
+            seen += self._buckets[i]
+            if seen >= wanted and seen > 0:
+                return min((2 ** (i + 1)) / 1000000.0, self._max)
+        return self._max
+
+    def to_dict(self):
+        """
+        The histogram as a dict.
+
+        :rtype: dict()
+
+        """
+        return {'count': self._count,
+                'total': self._total,
+                'mean': self.mean,
+                'min': self._min,
+                'max': self._max,
+                'p50': self.percentile(50),
+                'p90': self.percentile(90),
+                'p99': self.percentile(99),
+                'buckets': self.buckets,
+                }
+
+class ZWaveTimings(object):
+    """
+    The timings of the notification path.
+
+    The durations are kept in histograms by stage and by kind.
+
+    Stages :
+
+        * STAGE_BUILD = 'build' : from the entry in the callback of the library to the end of the construction of the dict of the notification.
+        * STAGE_CALLBACK = 'callback' : from the entry in the callback of the library to the entry in ZWaveNetwork.zwcallback.
+        * STAGE_HANDLER = 'handler' : the handler of ZWaveNetwork, receivers included.
+        * STAGE_RECEIVER = 'receiver' : a receiver of the dispatcher.
+
+    The kind is the type of notification (ie ValueChanged) for the first stages
+    and 'signal:receiver' for the receivers.
+
+    """
+    STAGE_BUILD = 'build'
+    STAGE_CALLBACK = 'callback'
+    STAGE_HANDLER = 'handler'
+    STAGE_RECEIVER = 'receiver'
+
+    def __init__(self):
+        """
+        Initialize the timings
+
+        """
+        self._lock = threading.Lock()
+        self._histograms = dict()
+        self.enabled = False
+
+    def histogram(self, stage, kind):
+        """
+        Retrieve the histogram of a stage and a kind. It is created if needed.
+
+        :param stage: The stage
+        :type stage: str
+        :param kind: The kind
+        :type kind: str
+        :rtype: ZWaveHistogram
+
+        """
+        try:
+            return self._histograms[(stage, kind)]
+        except KeyError:
+            with self._lock:
+                if (stage, kind) not in self._histograms:
+                    self._histograms[(stage, kind)] = ZWaveHistogram()
+                return self._histograms[(stage, kind)]
+
+    def record(self, stage, kind, seconds):
+        """
+        Add a duration.
+
+        :param stage: The stage
+        :type stage: str
+        :param kind: The kind
+        :type kind: str
+        :param seconds: The duration in seconds
+        :type seconds: float
+
+        """
+        self.histogram(stage, kind).record(seconds)
+
+    def reset(self):
+        """
+        Remove all the histograms.
+
+        """
+        with self._lock:
+            self._histograms = dict()
+
+    def stats(self, stage=None):
+        """
+        The histograms as dicts : {stage: {kind: histogram}}.
+
+        :param stage: Only return this stage
+        :type stage: str
+        :rtype: dict()
+
+        """
+        ret = dict()
+        for (hstage, kind), histogram in list(self._histograms.items()):
+            if stage is not None and hstage != stage:
+                continue
+            if hstage not in ret:
+                ret[hstage] = dict()
+            ret[hstage][kind] = histogram.to_dict()
+        return ret
+
+    def dump(self, stream):
+        """
+        Write the histograms as text.
+
+        :param stream: The stream to write to
+        :type stream: file
+
+        """
+        stream.write('%-10s %-50s %8s %10s %10s %10s %10s\n' % \
+            ('stage', 'kind', 'count', 'mean(us)', 'p50(us)', 'p99(us)', 'max(us)'))
+        for (stage, kind), histogram in sorted(self._histograms.items()):
+            if histogram.count == 0:
+                continue
+            data = histogram.to_dict()
+            stream.write('%-10s %-50s %8d %10.1f %10.1f %10.1f %10.1f\n' % \
+                (stage, kind, data['count'], data['mean'] * 1000000, \
+                data['p50'] * 1000000, data['p99'] * 1000000, data['max'] * 1000000))
+
+def receiver_name(receiver):
+    """
+    The name of a receiver of the dispatcher, used as kind of the receiver stage.
+
+    :param receiver: The receiver
+    :type receiver: callable
+    :rtype: str
+
+    """
+    name = getattr(receiver, '__name__', None) or repr(receiver)
+    owner = getattr(receiver, '__self__', None)
+    if owner is not None:
+        name = '%s.%s' % (owner.__class__.__name__, name)
+    return name
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: openzwave.topology
+
+This file is part of **python-openzwave** project https://github.com/bibi21000/python-openzwave.
+    :platform: Unix, Windows, MacOS X
+    :sinopsis: openzwave API
+
+.. moduleauthor: bibi21000 aka Sébastien GALLET <bibi21000@gmail.com>
+
+License : GPL(v3)
+
+**python-openzwave** is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+**python-openzwave** is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with python-openzwave. If not, see http://www.gnu.org/licenses.
+
+"""
+import logging
+import threading
+from collections import deque
+from .util import dispatcher
+
+logging.getLogger('openzwave').addHandler(logging.NullHandler())
+
+#The size of the adjacency matrix : 232 nodes, a row of 29 bytes by node
+NODES = 232
+ROW = 29
+
+class ZWaveTopology(object):
+    """
+    The neighbors of all the nodes of a network, kept in a cached adjacency
+    matrix, with graph analytics on it.
+
+    The matrix is read from the library in one call (getNodesNeighbors) when
+    it's needed. It is invalidated when nodes are added, removed or queried,
+    and when a controller command (ie a neighbor update) completes.
+
+    Neighbors lists of Z-Wave nodes are nearly symmetric : the analytics use
+    a link between two nodes when one of them lists the other.
+
+    """
+
+    def __init__(self, network):
+        """
+        Initialize the topology
+
+        :param network: The network
+        :type network: ZWaveNetwork
+
+        """
+        self._network = network
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._generation = 0
+        self._refreshes = 0
+        for signal in (network.SIGNAL_NODE_ADDED, network.SIGNAL_NODE_REMOVED, \
+          network.SIGNAL_NODE_QUERIES_COMPLETE, network.SIGNAL_AWAKE_NODES_QUERIED, \
+          network.SIGNAL_ALL_NODES_QUERIED, network.SIGNAL_ALL_NODES_QUERIED_SOME_DEAD):
+            dispatcher.connect(self._handle_nodes, signal)
+        dispatcher.connect(self._handle_controller, network.controller.SIGNAL_CONTROLLER)
+
+    def __str__(self):
+        """
+        The string representation of the topology.
+
+        :rtype: str
+
+        """
+        return 'cached: [%s] refreshes: [%s]' % \
+          (self._matrix is not None, self._refreshes)
+
+    def close(self):
+        """
+        Stop following the changes of the network.
+
+        """
+        for signal in (self._network.SIGNAL_NODE_ADDED, self._network.SIGNAL_NODE_REMOVED, \
+          self._network.SIGNAL_NODE_QUERIES_COMPLETE, self._network.SIGNAL_AWAKE_NODES_QUERIED, \
+          self._network.SIGNAL_ALL_NODES_QUERIED, self._network.SIGNAL_ALL_NODES_QUERIED_SOME_DEAD):
+            dispatcher.disconnect(self._handle_nodes, signal)
+        dispatcher.disconnect(self._handle_controller, self._network.controller.SIGNAL_CONTROLLER)
+        self.invalidate()
+
+    def _handle_nodes(self, network):
+        """
+        The receiver of the signals which may change the neighbors.
+
+        """
+        if network is self._network:
+            self.invalidate()
+
+    def _handle_controller(self, network, state):
+        """
+        The receiver of the controller commands.
+
+        """
+        if network is self._network and state == network.controller.SIGNAL_CTRL_COMPLETED:
+            self.invalidate()
+
+    def invalidate(self):
+        """
+        Forget the matrix. It will be read again when needed.
+
+        """
+        with self._lock:
+            self._generation += 1
+            self._matrix = None
+
+    @property
+    def refreshes(self):
+        """
+        The number of times the matrix was read from the library.
+
+        :rtype: int
+
+        """
+        return self._refreshes
+
+    def _node_ids(self):
+        """
+        The ids of the nodes of the network.
+
+        """
+        nodes = self._network.nodes
+        return sorted(nodes.keys()) if nodes is not None else []
+
+    def _load(self):
+        """
+        The matrix, read from the library if needed.
+
+        """
+        with self._lock:
+            if self._matrix is not None:
+                return self._matrix
+            generation = self._generation
+        matrix = bytearray(self._network.manager.getNodesNeighbors(self._network.home_id, self._node_ids()))
+        with self._lock:
+            self._refreshes += 1
+            #Don't keep a matrix read while it was invalidated
+            if generation == self._generation:
+                self._matrix = matrix
+        return matrix
+
+    @property
+    def matrix(self):
+        """
+        The adjacency matrix : 232 rows of 29 bytes. The bit (m-1) of the row (n-1)
+        is set if m is a neighbor of n.
+
+        :rtype: bytes
+
+        """
+        return bytes(self._load())
+
+    def is_neighbor(self, node_id, other_id):
+        """
+        Is a node in the neighbors of another one.
+
+        :param node_id: The node
+        :type node_id: int
+        :param other_id: The other node
+        :type other_id: int
+        :rtype: bool
+
+        """
+        if not 1 <= node_id <= NODES or not 1 <= other_id <= NODES:
+            return False
+        byte = self._load()[(node_id - 1) * ROW + (other_id - 1) // 8]
+        return bool(byte & (1 << ((other_id - 1) % 8)))
+
+    def neighbors(self, node_id):
+        """
+        The neighbors of a node.
+
+        :param node_id: The node
+        :type node_id: int
+        :rtype: set()
+
+        """
+        ret = set()
+        if not 1 <= node_id <= NODES:
+            return ret
+        row = self._load()[(node_id - 1) * ROW:node_id * ROW]
+        for i in range(ROW):
+            if row[i] == 0:
+                continue
+            for bit in range(8):
+                if row[i] & (1 << bit):
+                    ret.add(i * 8 + bit + 1)
+        return ret
+
+    def adjacency(self):
+        """
+        The links between the nodes of the network : a link exists when
+        one of the nodes lists the other one.
+
+        :return: A dict {node_id: set(node_ids)}
+        :rtype: dict()
+
+        """
+        node_ids = self._node_ids()
+        ret = dict([(node_id, set()) for node_id in node_ids])
+        for node_id in node_ids:
+            for other_id in self.neighbors(node_id):
+                if other_id in ret and other_id != node_id:
+                    ret[node_id].add(other_id)
+                    ret[other_id].add(node_id)
+        return ret
+
+    def hops(self, source=None):
+        """
+        The number of hops from a node to every node it can reach.
+
+        :param source: The node to start from. The controller if None
+        :type source: int
+        :return: A dict {node_id: hops}
+        :rtype: dict()
+
+        """
+        if source is None:
+            source = self._network.controller.node_id
+        adjacency = self.adjacency()
+        if source not in adjacency:
+            return dict()
+        ret = {source: 0}
+        queue = deque([source])
+        while queue:
+            node_id = queue.popleft()
+            for other_id in adjacency[node_id]:
+                if other_id not in ret:
+                    ret[other_id] = ret[node_id] + 1
+                    queue.append(other_id)
+        return ret
+
+    def unreachable_nodes(self, source=None):
+        """
+        The nodes which can't be reached from a node.
+
+        :param source: The node to start from. The controller if None
+        :type source: int
+        :rtype: set()
+
+        """
+        return set(self._node_ids()) - set(self.hops(source).keys())
+
+    def isolated_nodes(self):
+        """
+        The nodes without any neighbor.
+
+        :rtype: set()
+
+        """
+        adjacency = self.adjacency()
+        return set([node_id for node_id in adjacency if len(adjacency[node_id]) == 0])
+
+    def articulation_nodes(self):
+        """
+        The nodes whose failure would split the mesh : every route between
+        some other nodes goes through them.
+
+        :rtype: set()
+
+        """
+        adjacency = self.adjacency()
+        discovery = dict()
+        low = dict()
+        ret = set()
+        counter = 0
+        for root in adjacency:
+            if root in discovery:
+                continue
+            discovery[root] = low[root] = counter
+            counter += 1
+            children = 0
+            stack = [(root, None, iter(adjacency[root]))]
+            while stack:
+                node_id, parent, others = stack[-1]
+                descended = False
+                for other_id in others:
+                    if other_id == parent:
+                        continue
+                    if other_id in discovery:
+                        low[node_id] = min(low[node_id], discovery[other_id])
+                    else:
+                        discovery[other_id] = low[other_id] = counter
+                        counter += 1
+                        stack.append((other_id, node_id, iter(adjacency[other_id])))
+                        descended = True
+                        break
+                if descended:
+                    continue
+                stack.pop()
+                if parent is None:
+                    continue
+                low[parent] = min(low[parent], low[node_id])
+                if parent == root:
+                    children += 1
+                elif low[node_id] >= discovery[parent]:
+                    ret.add(parent)
+            if children > 1:
+                ret.add(root)
+        return ret
+
+    def to_dict(self, source=None):
+        """
+        The topology in a dict : neighbors, hops from the source, articulation,
+        isolated and unreachable nodes.
+
+        :param source: The node to start from. The controller if None
+        :type source: int
+        :rtype: dict()
+
+        """
+        return {'neighbors': dict([(node_id, sorted(self.neighbors(node_id))) for node_id in self._node_ids()]),
+                'hops': self.hops(source),
+                'articulation': sorted(self.articulation_nodes()),
+                'isolated': sorted(self.isolated_nodes()),
+                'unreachable': sorted(self.unreachable_nodes(source)),
+                }
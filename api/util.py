@@ -5,9 +5,51 @@ if sys.hexversion >= 0x3000000:
     def isstr(s):
         return isinstance(s, str)
 
+    def tostr(s):
+        return s.decode("UTF-8") if isinstance(s, bytes) else s
+
     from pydispatch import dispatcher
+    from pydispatch import robustapply
+
+    def robust_apply(receiver, *arguments, **named):
+        return robustapply.robustApply(receiver, *arguments, **named)
+
+    def live_receivers(signal, sender=dispatcher.Anonymous):
+        return dispatcher.liveReceivers(dispatcher.getAllReceivers(sender, signal))
 else:
     def isstr(s):
         return isinstance(s, basestring)
 
+    def tostr(s):
+        return s.decode("UTF-8") if isinstance(s, str) else s
+
     from louie import dispatcher
+    from louie import robustapply
+
+    def robust_apply(receiver, *arguments, **named):
+        return robustapply.robust_apply(receiver, receiver, *arguments, **named)
+
+    def live_receivers(signal, sender=dispatcher.Anonymous):
+        return dispatcher.live_receivers(dispatcher.get_all_receivers(sender, signal))
+
+#The decoded labels, units, ... shared by the values
+_shared_strings = dict()
+
+def shared_str(s):
+    """
+    The shared decoded copy of a string : equal strings are the same object,
+    so comparing them is cheap. Use it only for the few hundred strings
+    repeated by thousands of values (labels, units, ...).
+
+    :param s: The string, decoded or not
+    :type s: str
+    :rtype: str
+
+    """
+    try:
+        return _shared_strings[s]
+    except KeyError:
+        ret = tostr(s)
+        ret = _shared_strings.setdefault(ret, ret)
+        _shared_strings[s] = ret
+        return ret
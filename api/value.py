@@ -24,18 +24,30 @@ along with python-openzwave. If not, see http://www.gnu.org/licenses.
 
 """
 import logging
-from openzwave.object import ZWaveObject
-from .util import isstr
+import time
+from openzwave.object import ZWaveObject, ZWaveException
+from openzwave.history import ZWaveValueHistory
+from openzwave.aggregate import ZWaveAggregate
+from .util import isstr, tostr, shared_str
 
 logging.getLogger('openzwave').addHandler(logging.NullHandler())
 
+#The metadata tuples shared by the values
+_shared_metas = dict()
+
 # TODO: don't report controller node as sleeping
 # TODO: allow value identification by device/index/instance
 class ZWaveValue(ZWaveObject):
     """
     Represents a single value.
     """
-    def __init__(self, value_id, network=None, parent=None):
+    #The fields of the valueId dict kept by the value, the data excepted
+    CACHED_FIELDS = ('label', 'units', 'type', 'genre', 'index', 'instance', 'commandClass', 'readOnly')
+
+    __slots__ = ('_parent', '_cached_data', '_cached_meta', '_history', '_aggregate', \
+        '_write_filter_age', '_writes_saved', '_last_confirmed')
+
+    def __init__(self, value_id, network=None, parent=None, value_data=None):
         """
         Initialize value
 
@@ -61,14 +73,31 @@ class ZWaveValue(ZWaveObject):
 
         Cache management in nodes : no cache for values.
 
+        The data and the metadata (CACHED_FIELDS) of the valueId dict sent with
+        the notifications are kept, the ids are not : the value already holds them.
+        They are refreshed by ValueChanged and ValueRefreshed notifications and
+        allow to read metadata and data without calling the manager.
+        The metadata tuple is shared by the values with the same metadata.
+
         :param value_id: ID of the value
         :type value_id: int
         :param network: The network object to access the manager
         :type network: ZWaveNetwork
+        :param value_data: The valueId dict sent by the notification
+        :type value_data: dict()
         """
         ZWaveObject.__init__(self, value_id, network=network)
         logging.debug("Create object value (valueId:%s)" % (value_id))
         self._parent = parent
+        self._cached_data = None
+        self._cached_meta = None
+        self._history = None
+        self._aggregate = None
+        self._write_filter_age = None
+        self._writes_saved = 0
+        self._last_confirmed = None
+        if value_data is not None:
+            self.value_data = value_data
 
     def __str__(self):
         """
@@ -120,6 +149,237 @@ class ZWaveValue(ZWaveObject):
         """
         return self._parent
 
+    @property
+    def value_data(self):
+        """
+        The fields of the valueId dict kept from the last notification for this value :
+        the data ('value') and CACHED_FIELDS.
+
+        :rtype: dict() or None
+
+        """
+        if self._cached_meta is None:
+            return None
+        ret = dict(zip(self.CACHED_FIELDS, self._cached_meta))
+        ret['value'] = self._cached_data
+        return ret
+
+    @value_data.setter
+    def value_data(self, value):
+        """
+        Update the cache from the valueId dict sent by a notification.
+
+        :param value: The valueId dict of the notification
+        :type value: dict()
+
+        """
+        meta = tuple([shared_str(value[field]) if field in ('label', 'units') and value.get(field) is not None \
+            else value.get(field, None) for field in self.CACHED_FIELDS])
+        self._cached_meta = _shared_metas.setdefault(meta, meta)
+        self._cached_data = value.get('value', None)
+        self._last_update = time.time()
+
+    @property
+    def last_confirmed(self):
+        """
+        The time of the last data reported by the device (ValueChanged or ValueRefreshed).
+        None until the device has reported : the data of a ValueAdded comes from
+        the cache of the library or is a default.
+
+        :rtype: float
+
+        """
+        return self._last_confirmed
+
+    @last_confirmed.setter
+    def last_confirmed(self, value):
+        """
+        Set the time of the last data reported by the device.
+
+        :param value: The time
+        :type value: float
+
+        """
+        self._last_confirmed = value
+
+    def get_cached(self, field, default=None):
+        """
+        Get a field of value_data without calling the manager.
+        Strings are returned decoded.
+
+        :param field: The key in value_data : label, units, genre, type, value, ...
+        :type field: str
+        :param default: Returned when the field is not cached
+        :type default: variable
+        :rtype: variable
+
+        """
+        if self._cached_meta is None:
+            return default
+        if field == 'value':
+            ret = self._cached_data
+            if ret is not None and self.get_cached('type') in ("String", "List"):
+                ret = tostr(ret)
+        elif field in self.CACHED_FIELDS:
+            ret = self._cached_meta[self.CACHED_FIELDS.index(field)]
+        else:
+            ret = None
+        if ret is None:
+            return default
+        return ret
+
+    @property
+    def history(self):
+        """
+        The history of the data of the value or None if it's not enabled.
+
+        :rtype: ZWaveValueHistory
+
+        """
+        return self._history
+
+    def enable_history(self, capacity=256):
+        """
+        Keep the last data of the value.
+        The history is filled with the ValueChanged and ValueRefreshed notifications.
+        Only available for values of type Bool, Button, Byte, Short, Int and Decimal.
+        Changing the capacity clears the history.
+
+        :param capacity: The maximum number of entries
+        :type capacity: int
+        :rtype: ZWaveValueHistory
+
+        """
+        if self._history is None or self._history.capacity != capacity:
+            self._history = ZWaveValueHistory.for_type(self.get_cached('type') or self.type, capacity)
+        return self._history
+
+    def disable_history(self):
+        """
+        Forget the history of the value.
+
+        """
+        self._history = None
+
+    def add_history(self, data, timestamp=None):
+        """
+        Add data to the history. Does nothing when the history is not enabled.
+
+        :param data: The data of the value
+        :type data: bool, int or float
+        :param timestamp: The time of the data. Default to now
+        :type timestamp: float
+
+        """
+        if self._history is None or data is None:
+            return
+        self._history.append(timestamp if timestamp is not None else time.time(), data)
+
+    @property
+    def aggregate(self):
+        """
+        The windowed aggregates of the value or None if they're not enabled.
+
+        :rtype: ZWaveAggregate
+
+        """
+        return self._aggregate
+
+    def enable_aggregate(self, periods=(60, 3600)):
+        """
+        Aggregate the data of the value over windows of time (min, max, mean, energy).
+        The aggregates are updated with the ValueChanged and ValueRefreshed notifications.
+        Only available for values of type Byte, Short, Int and Decimal.
+        Changing the periods clears the aggregates.
+
+        :param periods: The length of the windows in seconds
+        :type periods: tuple()
+        :rtype: ZWaveAggregate
+
+        """
+        if self._aggregate is None or self._aggregate.periods != list(periods):
+            value_type = self.get_cached('type') or self.type
+            if value_type not in ('Byte', 'Short', 'Int', 'Decimal'):
+                raise ZWaveException("No aggregate for values of type %s" % value_type)
+            self._aggregate = ZWaveAggregate(periods, self.get_cached('units'))
+            if self._parent is not None:
+                self._parent._register_aggregate(self, self.get_cached('label') or self.label)
+        return self._aggregate
+
+    def disable_aggregate(self):
+        """
+        Forget the aggregates of the value.
+
+        """
+        if self._aggregate is not None and self._parent is not None:
+            self._parent._unregister_aggregate(self)
+        self._aggregate = None
+
+    def add_aggregate(self, data, timestamp=None):
+        """
+        Add data to the aggregates. Does nothing when the aggregates are not enabled.
+
+        :param data: The data of the value
+        :type data: int or float
+        :param timestamp: The time of the data. Default to now
+        :type timestamp: float
+
+        """
+        if self._aggregate is None or data is None:
+            return
+        self._aggregate.update(timestamp if timestamp is not None else time.time(), data)
+
+    @property
+    def write_filter_age(self):
+        """
+        The maximum age in seconds of the last data reported by the device
+        for a write of the same data to be dropped. The one of the network
+        is used when not set for the value. None when the filter is disabled.
+
+        :rtype: float
+
+        """
+        if self._write_filter_age is not None:
+            return self._write_filter_age
+        if self._network is not None:
+            return self._network.write_filter_age
+        return None
+
+    @write_filter_age.setter
+    def write_filter_age(self, value):
+        """
+        Set the maximum age of the last data reported for this value.
+        Use None to follow the network, 0 to never drop the writes of this value.
+
+        :param value: The age in seconds
+        :type value: float
+
+        """
+        self._write_filter_age = value
+
+    @property
+    def writes_saved(self):
+        """
+        The number of writes dropped by the write filter.
+
+        :rtype: int
+
+        """
+        return self._writes_saved
+
+    def _is_write_useless(self, data):
+        """
+        Is the data the last one reported by the device, and recent enough.
+
+        """
+        max_age = self.write_filter_age
+        if not max_age or self._last_confirmed is None:
+            return False
+        if time.time() - self._last_confirmed > max_age:
+            return False
+        current = self.get_cached('value')
+        return current is not None and current == data
+
     @property
     def label(self):
         """
@@ -127,7 +387,7 @@ class ZWaveValue(ZWaveObject):
 
         :rtype: str
         """
-        return self._network.manager.getValueLabel(self.value_id).decode("UTF-8")
+        return shared_str(self._network.manager.getValueLabel(self.value_id, homeid=self.home_id))
 
     @label.setter
     def label(self, value):
@@ -137,7 +397,7 @@ class ZWaveValue(ZWaveObject):
         :param value: The new label value
         :type value: str
         """
-        self._network.manager.setValueLabel(self.value_id, value.encode("UTF-8"))
+        self._network.manager.setValueLabel(self.value_id, value.encode("UTF-8"), homeid=self.home_id)
 
     @property
     def help(self):
@@ -146,7 +406,7 @@ class ZWaveValue(ZWaveObject):
 
         :rtype: str
         """
-        return self._network.manager.getValueHelp(self.value_id).decode("UTF-8")
+        return self._network.manager.getValueHelp(self.value_id, homeid=self.home_id).decode("UTF-8")
 
     @help.setter
     def help(self, value):
@@ -157,7 +417,7 @@ class ZWaveValue(ZWaveObject):
         :type value: str
 
         """
-        self._network.manager.setValueHelp(self.value_id, value.encode("UTF-8"))
+        self._network.manager.setValueHelp(self.value_id, value.encode("UTF-8"), homeid=self.home_id)
 
     @property
     def units(self):
@@ -167,7 +427,7 @@ class ZWaveValue(ZWaveObject):
         :rtype: str
 
         """
-        return self._network.manager.getValueUnits(self.value_id).decode("UTF-8")
+        return shared_str(self._network.manager.getValueUnits(self.value_id, homeid=self.home_id))
 
     @units.setter
     def units(self, value):
@@ -178,7 +438,7 @@ class ZWaveValue(ZWaveObject):
         :type value: str
 
         """
-        self._network.manager.setValueUnits(self.value_id, value.encode("UTF-8"))
+        self._network.manager.setValueUnits(self.value_id, value.encode("UTF-8"), homeid=self.home_id)
 
     @property
     def max(self):
@@ -188,7 +448,7 @@ class ZWaveValue(ZWaveObject):
         :rtype: int
 
         """
-        return self._network.manager.getValueMax(self.value_id)
+        return self._network.manager.getValueMax(self.value_id, homeid=self.home_id)
 
     @property
     def min(self):
@@ -198,7 +458,7 @@ class ZWaveValue(ZWaveObject):
         :rtype: int
 
         """
-        return self._network.manager.getValueMin(self.value_id)
+        return self._network.manager.getValueMin(self.value_id, homeid=self.home_id)
 
     @property
     def type(self):
@@ -211,7 +471,7 @@ class ZWaveValue(ZWaveObject):
         :rtype: str
 
         """
-        return self._network.manager.getValueType(self.value_id)
+        return self._network.manager.getValueType(self.value_id, homeid=self.home_id)
 
     @property
     def genre(self):
@@ -224,7 +484,7 @@ class ZWaveValue(ZWaveObject):
         :rtype: str
 
         """
-        return self._network.manager.getValueGenre(self.value_id)
+        return self._network.manager.getValueGenre(self.value_id, homeid=self.home_id)
 
     @property
     def index(self):
@@ -238,7 +498,7 @@ class ZWaveValue(ZWaveObject):
         :rtype: int
 
         """
-        return self._network.manager.getValueIndex(self.value_id)
+        return self._network.manager.getValueIndex(self.value_id, homeid=self.home_id)
 
     @property
     def instance(self):
@@ -251,7 +511,7 @@ class ZWaveValue(ZWaveObject):
         :rtype: int
 
         """
-        return self._network.manager.getValueInstance(self.value_id)
+        return self._network.manager.getValueInstance(self.value_id, homeid=self.home_id)
 
     @property
     def data(self):
@@ -262,7 +522,7 @@ class ZWaveValue(ZWaveObject):
         :rtype: depending of the type of the value
 
         """
-        data = self._network.manager.getValue(self.value_id)
+        data = self._network.manager.getValue(self.value_id, homeid=self.home_id)
 
         if self.type in ("String", "List"):
             data = data.decode("UTF-8")
@@ -284,10 +544,16 @@ class ZWaveValue(ZWaveObject):
         :type value: str
 
         """
+        if self._is_write_useless(value):
+            self._writes_saved += 1
+            logging.debug("Write of %s to value %s dropped : already reported" % (value, self.value_id))
+            return
         if self.type == "String":
             value = value.encode("UTF-8")
 
-        self._network.manager.setValue(self.value_id, value)
+        self._network.manager.setValue(self.value_id, value, homeid=self.home_id)
+        #The write is in flight : the data reported before can't filter the next ones
+        self._last_confirmed = None
 
     @property
     def data_as_string(self):
@@ -297,7 +563,7 @@ class ZWaveValue(ZWaveObject):
         :rtype: str
 
         """
-        return self._network.manager.getValueAsString(self.value_id)
+        return self._network.manager.getValueAsString(self.value_id, homeid=self.home_id)
 
     @property
     def data_items(self):
@@ -325,7 +591,7 @@ class ZWaveValue(ZWaveObject):
         elif self.type == "Button":
             return "True or False"
         elif self.type == "List":
-            return self._network.manager.getValueListItems(self.value_id)
+            return self._network.manager.getValueListItems(self.value_id, homeid=self.home_id)
         else :
             return "Unknown"
 
@@ -388,6 +654,16 @@ class ZWaveValue(ZWaveObject):
                     new_data = 32767
         elif self.type == "String":
                 new_data = data.encode("UTF-8")
+        elif self.type == "Raw":
+            #bytes, bytearray, memoryview, ... : any object with the buffer protocol
+            if isstr(data):
+                new_data = data
+            else:
+                try :
+                    view = memoryview(data)
+                    new_data = data if view.itemsize * len(view) <= 255 else None
+                except TypeError:
+                    new_data = None
         elif self.type == "Button":
             new_data = data
             if isstr(data) :
@@ -413,7 +689,7 @@ class ZWaveValue(ZWaveObject):
         :rtype: bool
 
         """
-        return self._network.manager.isValueSet(self.value_id)
+        return self._network.manager.isValueSet(self.value_id, homeid=self.home_id)
 
     @property
     def is_read_only(self):
@@ -424,7 +700,7 @@ class ZWaveValue(ZWaveObject):
         :rtype: bool
 
         """
-        return self._network.manager.isValueReadOnly(self.value_id)
+        return self._network.manager.isValueReadOnly(self.value_id, homeid=self.home_id)
 
     @property
     def is_write_only(self):
@@ -435,7 +711,7 @@ class ZWaveValue(ZWaveObject):
         :rtype: bool
 
         """
-        return self._network.manager.isValueWriteOnly(self.value_id)
+        return self._network.manager.isValueWriteOnly(self.value_id, homeid=self.home_id)
 
     def enable_poll(self, intensity=1):
         """
@@ -447,7 +723,7 @@ class ZWaveValue(ZWaveObject):
         :rtype: bool
 
         """
-        return self._network.manager.enablePoll(self.value_id, intensity)
+        return self._network.manager.enablePoll(self.value_id, intensity, homeid=self.home_id)
 
     def disable_poll(self):
         """
@@ -457,7 +733,7 @@ class ZWaveValue(ZWaveObject):
         :rtype: bool
 
         """
-        return self._network.manager.disablePoll(self.value_id)
+        return self._network.manager.disablePoll(self.value_id, homeid=self.home_id)
 
     @property
     def poll_intensity(self):
@@ -469,7 +745,7 @@ class ZWaveValue(ZWaveObject):
 
         """
         #always ask to manager to get poll intensity
-        return self._network.manager.getPollIntensity(self.value_id)
+        return self._network.manager.getPollIntensity(self.value_id, homeid=self.home_id)
 
     @property
     def is_polled(self):
@@ -479,7 +755,7 @@ class ZWaveValue(ZWaveObject):
         :rtype: bool
 
         """
-        return self._network.manager.isPolled(self.value_id)
+        return self._network.manager.isPolled(self.value_id, homeid=self.home_id)
 
     @property
     def command_class(self):
@@ -490,7 +766,7 @@ class ZWaveValue(ZWaveObject):
         :rtype: int
 
         """
-        return self._network.manager.getValueCommandClass(self.value_id)
+        return self._network.manager.getValueCommandClass(self.value_id, homeid=self.home_id)
 
     def refresh(self):
         """
@@ -500,7 +776,7 @@ class ZWaveValue(ZWaveObject):
         :rtype: bool
 
         """
-        return self._network.manager.refreshValue(self.value_id)
+        return self._network.manager.refreshValue(self.value_id, homeid=self.home_id)
 
     @property
     def precision(self):
@@ -511,7 +787,7 @@ class ZWaveValue(ZWaveObject):
         :rtype: int
 
         """
-        return self._network.manager.getValueFloatPrecision(self.value_id)
+        return self._network.manager.getValueFloatPrecision(self.value_id, homeid=self.home_id)
 
     def is_change_verified(self):
         """
@@ -519,7 +795,7 @@ class ZWaveValue(ZWaveObject):
         If so, the library will immediately refresh the value a second time whenever a change is observed.
         This helps to filter out spurious data reported occasionally by some devices.
         """
-        return self._network.manager.getChangeVerified(self.value_id)
+        return self._network.manager.getChangeVerified(self.value_id, homeid=self.home_id)
 
 
     def set_change_verified(self, verify): 
@@ -533,5 +809,5 @@ class ZWaveValue(ZWaveObject):
         :type verify: bool     
         """
         logging.debug('Set change verified %s for valueId [%s]' % (verify, self.value_id,)) 
-        self._network.manager.setChangeVerified(self.value_id, verify)
+        self._network.manager.setChangeVerified(self.value_id, verify, homeid=self.home_id)
 
@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+
+This file is part of **python-openzwave** project https://github.com/bibi21000/python-openzwave.
+    :platform: Unix, Windows, MacOS X
+    :sinopsis: openzwave wrapper
+
+.. moduleauthor:: bibi21000 aka Sébastien GALLET <bibi21000@gmail.com>
+
+License : GPL(v3)
+
+**python-openzwave** is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+**python-openzwave** is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with python-openzwave. If not, see http://www.gnu.org/licenses.
+
+
+Benchmarks of the python API layers, run against a simulated manager :
+no controller is needed.
+
+    * notifications : ValueChanged notifications through zwcallback
+    * value_lookup : network.get_value() and node.values
+    * get_values : the filters of ZWaveNode.get_values()
+    * command_helpers : get_switches(), get_dimmers(), get_sensors(), ...
+    * scene_resolution : ZWaveScene.get_values_by_node()
+    * memory : bytes allocated by node and by value (needs tracemalloc)
+
+The results are saved as json. Give the results of a previous version
+to compare with : the benchmarks slower by more than 20% are reported.
+
+    python bench_api.py --nodes=50 --values=20 --loops=20 --output=bench_api.json --compare=bench_api-old.json
+
+"""
+
+import logging
+import sys, os
+import gc
+import json
+import platform
+import time
+
+logging.basicConfig(level=logging.WARNING)
+
+try :
+    import openzwave
+    from openzwave.network import ZWaveNetwork
+    from openzwave.router import ZWaveManagerRouter
+    from openzwave.scene import ZWaveScene
+except :
+    sys.path.insert(0, os.path.abspath('../build/tmp/usr/local/lib/python2.7/dist-packages'))
+    import openzwave
+    from openzwave.network import ZWaveNetwork
+    from openzwave.router import ZWaveManagerRouter
+    from openzwave.scene import ZWaveScene
+from simulated_manager import SimulatedManager
+from timeit import default_timer
+try :
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+nodes = 50
+values = 20
+loops = 20
+output = "bench_api.json"
+compare = None
+threshold = 1.2
+
+for arg in sys.argv:
+    if arg.startswith("--nodes"):
+        temp,nodes = arg.split("=")
+        nodes = int(nodes)
+    elif arg.startswith("--values"):
+        temp,values = arg.split("=")
+        values = int(values)
+    elif arg.startswith("--loops"):
+        temp,loops = arg.split("=")
+        loops = int(loops)
+    elif arg.startswith("--output"):
+        temp,output = arg.split("=")
+    elif arg.startswith("--compare"):
+        temp,compare = arg.split("=")
+    if arg.startswith("--help"):
+        print("help : ")
+        print("  --nodes=50 ")
+        print("  --values=20 ")
+        print("  --loops=20 ")
+        print("  --output=bench_api.json ")
+        print("  --compare=bench_api-old.json ")
+        quit(0)
+
+class SimulatedOptions(object):
+    """
+    The options used by the network : only the device.
+    """
+    device = "/dev/simulated"
+
+def create_network(manager):
+    """
+    A network started on the simulated manager.
+    """
+    network = ZWaveNetwork(SimulatedOptions(), autostart=False, \
+        router=ZWaveManagerRouter(manager=manager))
+    network.start()
+    return network
+
+def bench(name, run, ops):
+    """
+    Run run() loops times, the best of 3 runs is kept.
+    """
+    run()
+    best = None
+    for i in range(3):
+        start = default_timer()
+        for j in range(loops):
+            run()
+        elapsed = default_timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    result = {'loops': loops, 'ops': ops * loops, 'total': best, \
+        'us_per_op': best * 1000000.0 / (ops * loops)}
+    print("  %-36s : %10.3f us/op" % (name, result['us_per_op']))
+    return result
+
+manager = SimulatedManager(nodes=nodes, values=values)
+network = create_network(manager)
+value_ids = sorted(manager.values.keys())
+node_list = [network.nodes[node_id] for node_id in sorted(network.nodes.keys())]
+results = dict()
+
+print("------------------------------------------------------------")
+print("Benchmarks on %s nodes with %s values, %s loops" % (nodes, values, loops))
+print("------------------------------------------------------------")
+
+notifications = [{'notificationType': 'ValueChanged', 'homeId': manager.home_id, \
+    'nodeId': manager.values[value_id]['nodeId'], 'valueId': manager.notification(value_id)} \
+    for value_id in value_ids]
+def run_notifications():
+    for notification in notifications:
+        network.zwcallback(notification)
+results['notifications'] = bench('notifications', run_notifications, len(notifications))
+
+def run_get_value():
+    for value_id in value_ids:
+        network.get_value(value_id)
+results['value_lookup.get_value'] = bench('value_lookup.get_value', run_get_value, len(value_ids))
+
+node_of = dict([(value_id, network.nodes[manager.values[value_id]['nodeId']]) for value_id in value_ids])
+def run_node_values():
+    for value_id in value_ids:
+        node_of[value_id].values[value_id]
+results['value_lookup.node_values'] = bench('value_lookup.node_values', run_node_values, len(value_ids))
+
+FILTERS = [
+    ('get_values.class_id', {'class_id': 0x31}),
+    ('get_values.genre', {'genre': 'User'}),
+    ('get_values.type', {'type': 'Decimal'}),
+    ('get_values.readonly', {'readonly': True}),
+    ('get_values.all_filters', {'class_id': 0x25, 'genre': 'User', 'type': 'Bool', 'readonly': False, 'writeonly': False}),
+]
+for name, kwargs in FILTERS:
+    def run_filter():
+        for node in node_list:
+            node.get_values(**kwargs)
+    results[name] = bench(name, run_filter, len(node_list))
+
+HELPERS = ['get_switches', 'get_dimmers', 'get_sensors', 'get_battery_levels']
+for helper in HELPERS:
+    def run_helper():
+        for node in node_list:
+            getattr(node, helper)()
+    results['command_helpers.%s' % helper] = bench('command_helpers.%s' % helper, run_helper, len(node_list))
+
+scene_id = manager.createScene()
+for value_id in value_ids[::max(1, len(value_ids) // 100)]:
+    manager.addSceneValue(scene_id, value_id, manager.values[value_id]['value'])
+scene = ZWaveScene(scene_id, network=network)
+scene_size = len(manager.scenes[scene_id])
+def run_scene():
+    scene.get_values_by_node()
+results['scene_resolution'] = bench('scene_resolution', run_scene, scene_size)
+
+def allocated(nodes, values):
+    """
+    The number of bytes allocated to start a network.
+    """
+    gc.collect()
+    tracemalloc.start()
+    other = create_network(SimulatedManager(nodes=nodes, values=values))
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del other
+    return size
+
+if tracemalloc is not None:
+    #The nodes are measured alone, the values are what a network with values adds
+    size_nodes = allocated(nodes, 0)
+    size_values = allocated(nodes, values)
+    results['memory'] = {'bytes_per_node': float(size_nodes) / nodes, \
+        'bytes_per_value': float(size_values - size_nodes) / (nodes * values)}
+    print("  %-36s : %10.1f bytes/node" % ('memory.node', results['memory']['bytes_per_node']))
+    print("  %-36s : %10.1f bytes/value" % ('memory.value', results['memory']['bytes_per_value']))
+print("------------------------------------------------------------")
+
+report = {'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+          'python': platform.python_version(),
+          'platform': platform.platform(),
+          'library': manager.getPythonLibraryVersion(),
+          'params': {'nodes': nodes, 'values': values, 'loops': loops},
+          'results': results,
+          }
+with open(output, 'w') as fjson:
+    json.dump(report, fjson, indent=2, sort_keys=True)
+print("Results saved in %s" % output)
+
+if compare is not None:
+    with open(compare, 'r') as fjson:
+        previous = json.load(fjson)
+    regressions = 0
+    print("------------------------------------------------------------")
+    print("Compared with %s (%s)" % (compare, previous.get('date', '')))
+    print("------------------------------------------------------------")
+    for name in sorted(results):
+        if name not in previous['results'] or 'us_per_op' not in results[name]:
+            continue
+        ratio = results[name]['us_per_op'] / previous['results'][name]['us_per_op']
+        flag = ''
+        if ratio > threshold:
+            flag = 'REGRESSION'
+            regressions += 1
+        print("  %-36s : %6.2fx %s" % (name, ratio, flag))
+    print("------------------------------------------------------------")
+    if regressions > 0:
+        quit(1)
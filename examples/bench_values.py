@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+
+This file is part of **python-openzwave** project https://github.com/bibi21000/python-openzwave.
+    :platform: Unix, Windows, MacOS X
+    :sinopsis: openzwave wrapper
+
+.. moduleauthor:: bibi21000 aka Sébastien GALLET <bibi21000@gmail.com>
+
+License : GPL(v3)
+
+**python-openzwave** is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+**python-openzwave** is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with python-openzwave. If not, see http://www.gnu.org/licenses.
+
+
+Compare the time needed to read the data of all the values of a network,
+value by value (getValue) and in batches (getNodeValues, getValues).
+
+    python bench_values.py --device=/dev/ttyUSB0 --loops=100
+
+"""
+
+import logging
+import sys, os
+import time
+
+logging.basicConfig(level=logging.INFO)
+
+try :
+    import openzwave
+    from openzwave.network import ZWaveNetwork
+    from openzwave.option import ZWaveOption
+except :
+    sys.path.insert(0, os.path.abspath('../build/tmp/usr/local/lib/python2.7/dist-packages'))
+    import openzwave
+    from openzwave.network import ZWaveNetwork
+    from openzwave.option import ZWaveOption
+from timeit import default_timer
+
+device = "/dev/zwave-aeon-s2"
+log = "Info"
+loops = 100
+
+for arg in sys.argv:
+    if arg.startswith("--device"):
+        temp,device = arg.split("=")
+    elif arg.startswith("--log"):
+        temp,log = arg.split("=")
+    elif arg.startswith("--loops"):
+        temp,loops = arg.split("=")
+        loops = int(loops)
+    if arg.startswith("--help"):
+        print("help : ")
+        print("  --device=/dev/yourdevice ")
+        print("  --log=Info|Debug")
+        print("  --loops=100")
+
+options = ZWaveOption(device, \
+  config_path="../openzwave/config", \
+  user_path=".", cmd_line="")
+options.set_log_file("OZW_Log.log")
+options.set_append_log_file(False)
+options.set_console_output(False)
+options.set_save_log_level(log)
+options.set_logging(True)
+options.lock()
+
+network = ZWaveNetwork(options, log=None)
+
+print("Waiting for network to become ready : ")
+for i in range(0, 90):
+    if network.state >= network.STATE_READY:
+        break
+    sys.stdout.write(".")
+    sys.stdout.flush()
+    time.sleep(1.0)
+if not network.is_ready:
+    print("Can't start network! Look at the logs in OZW_Log.log")
+    quit(2)
+
+manager = network.manager
+home_id = network.home_id
+ids = dict([(node_id, list(network.nodes[node_id].values.keys())) for node_id in network.nodes])
+count = sum([len(value_ids) for value_ids in ids.values()])
+
+def bench(name, read):
+    start = default_timer()
+    for i in range(loops):
+        read()
+    elapsed = default_timer() - start
+    print("  %-28s : %8.2f us/value" % (name, elapsed * 1000000.0 / (loops * count)))
+    return elapsed
+
+def read_one_by_one():
+    for value_ids in ids.values():
+        for value_id in value_ids:
+            manager.getValue(value_id, homeid=home_id)
+
+def read_by_node():
+    for node_id in ids:
+        manager.getNodeValues(home_id, node_id)
+
+all_ids = [value_id for value_ids in ids.values() for value_id in value_ids]
+def read_by_ids():
+    manager.getValues(all_ids, homeid=home_id)
+
+print("")
+print("------------------------------------------------------------")
+print("Read %s values of %s nodes, %s times" % (count, len(ids), loops))
+print("------------------------------------------------------------")
+single = bench("getValue", read_one_by_one)
+by_node = bench("getNodeValues", read_by_node)
+by_ids = bench("getValues", read_by_ids)
+print("------------------------------------------------------------")
+print("  getNodeValues speedup       : %8.2f" % (single / by_node))
+print("  getValues speedup           : %8.2f" % (single / by_ids))
+print("------------------------------------------------------------")
+
+network.stop()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+
+This file is part of **python-openzwave** project https://github.com/bibi21000/python-openzwave.
+    :platform: Unix, Windows, MacOS X
+    :sinopsis: openzwave wrapper
+
+.. moduleauthor:: bibi21000 aka Sébastien GALLET <bibi21000@gmail.com>
+
+License : GPL(v3)
+
+**python-openzwave** is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+**python-openzwave** is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with python-openzwave. If not, see http://www.gnu.org/licenses.
+
+
+Report the memory used by each value of a synthetic network : the value
+of the baseline (no cached data, everything in a __dict__ and a dict of
+cached properties for each object) against the current slotted value
+with the data and the metadata it keeps from the notifications.
+
+No controller is needed : values are created from fake notifications.
+Only the value objects are measured : the memory.value of bench_api.py
+counts everything a network allocates for a value (registry, ...).
+
+    python memory_values.py --values=10000
+
+"""
+
+import sys, os
+import gc
+
+try :
+    import openzwave
+    from openzwave.value import ZWaveValue
+    from openzwave.object import ZWaveObject
+except :
+    sys.path.insert(0, os.path.abspath('../build/tmp/usr/local/lib/python2.7/dist-packages'))
+    import openzwave
+    from openzwave.value import ZWaveValue
+    from openzwave.object import ZWaveObject
+try :
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+count = 10000
+for arg in sys.argv:
+    if arg.startswith("--values"):
+        temp,count = arg.split("=")
+        count = int(count)
+    if arg.startswith("--help"):
+        print("help : ")
+        print("  --values=10000 ")
+
+LABELS = ['Switch', 'Level', 'Temperature', 'Power', 'Energy', 'Battery Level']
+UNITS = ['', '', 'C', 'W', 'kWh', '%']
+
+def value_data(i):
+    """
+    A notification dict like the one sent by libopenzwave.
+    """
+    return {'homeId': 0x01020304, 'nodeId': 2 + i // 20, 'commandClass': 'COMMAND_CLASS_SENSOR_MULTILEVEL',
+            'instance': 1, 'index': i % 20, 'id': 72057594000000000 + i, 'genre': 'User',
+            'type': 'Decimal', 'value': 20.0 + (i % 100) / 10.0, 'label': LABELS[i % len(LABELS)],
+            'units': UNITS[i % len(UNITS)], 'readOnly': True}
+
+class BaselineValue(object):
+    """
+    The value of the baseline, before the slots and the cached data : the
+    attributes set by ZWaveObject.__init__ and ZWaveValue.__init__ in a
+    __dict__, and a dict of cached properties allocated for each object.
+    """
+    def __init__(self, value_id, network=None, parent=None, use_cache=True):
+        self._network = network
+        self._last_update = None
+        self._outdated = True
+        self._use_cache = use_cache
+        self._object_id = value_id
+        if self._use_cache:
+            self._cached_properties = dict()
+        else :
+            self._cached_properties = None
+        self._parent = parent
+
+def measure(build):
+    """
+    The number of bytes allocated by build() for each value.
+    """
+    gc.collect()
+    if tracemalloc is not None:
+        tracemalloc.start()
+        objects = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+    else:
+        objects = build()
+        size = 0
+        shared = set()
+        for obj in objects:
+            size += sys.getsizeof(obj)
+            if hasattr(obj, '__dict__'):
+                size += sys.getsizeof(obj.__dict__)
+            if getattr(obj, '_cached_properties', None) is not None:
+                size += sys.getsizeof(obj._cached_properties)
+            meta = getattr(obj, '_cached_meta', None)
+            if meta is not None and id(meta) not in shared:
+                #The metadata tuples are shared by the values
+                shared.add(id(meta))
+                size += sys.getsizeof(meta)
+    return float(size) / len(objects), objects
+
+#The notification dicts are built during the measure and freed once
+#handled, as in a network : only what each value keeps of them is counted.
+per_value_before, objects = measure(lambda : [BaselineValue(data['id'], network=None, parent=None) \
+    for data in (value_data(i) for i in range(count))])
+del objects
+per_value_after, objects = measure(lambda : [ZWaveValue(data['id'], network=None, parent=None, value_data=data) \
+    for data in (value_data(i) for i in range(count))])
+del objects
+
+print("------------------------------------------------------------")
+print("Memory use for %s values (%s)" % (count, 'tracemalloc' if tracemalloc is not None else 'getsizeof'))
+print("------------------------------------------------------------")
+print("  baseline (__dict__, no cache)  : %8.1f bytes/value" % per_value_before)
+print("  current  (__slots__, cached)  : %8.1f bytes/value" % per_value_after)
+print("  change                        : %+8.1f bytes/value (%+.0f%%)" % (per_value_after - per_value_before, \
+    100.0 * (per_value_after - per_value_before) / per_value_before))
+print("------------------------------------------------------------")
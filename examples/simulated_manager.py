@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+
+This file is part of **python-openzwave** project https://github.com/bibi21000/python-openzwave.
+    :platform: Unix, Windows, MacOS X
+    :sinopsis: openzwave wrapper
+
+.. moduleauthor:: bibi21000 aka Sébastien GALLET <bibi21000@gmail.com>
+
+License : GPL(v3)
+
+**python-openzwave** is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+**python-openzwave** is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with python-openzwave. If not, see http://www.gnu.org/licenses.
+
+
+A simulated manager : it answers the calls of the python API from an
+in-memory network and sends the notifications of a real driver to the
+watcher. It is used to run the benchmarks without a controller.
+
+Share it with a network through a router :
+
+    manager = SimulatedManager(nodes=50, values=20)
+    network = ZWaveNetwork(options, router=ZWaveManagerRouter(manager=manager))
+
+"""
+
+import libopenzwave
+
+HOME_ID = 0x01020304
+
+#command class, label, units, type, genre, read only, data
+VALUES = [
+    (0x25, 'Switch', '', 'Bool', 'User', False, False),
+    (0x26, 'Level', '', 'Byte', 'User', False, 0),
+    (0x31, 'Temperature', 'C', 'Decimal', 'User', True, 21.5),
+    (0x32, 'Power', 'W', 'Decimal', 'User', True, 3.5),
+    (0x32, 'Energy', 'kWh', 'Decimal', 'User', True, 120.25),
+    (0x80, 'Battery Level', '%', 'Byte', 'User', True, 100),
+    (0x70, 'Parameter', '', 'Byte', 'Config', False, 1),
+    (0x86, 'Library Version', '', 'String', 'System', True, u'3'),
+]
+
+class SimulatedManager(object):
+    """
+    A manager of a simulated network of nodes nodes, with values values by node.
+
+    """
+    COMMAND_CLASS_DESC = libopenzwave.PyManager.COMMAND_CLASS_DESC
+
+    def __init__(self, nodes=50, values=20, home_id=HOME_ID):
+        self.home_id = home_id
+        self.nodes = list(range(1, nodes + 1))
+        self.values = dict()
+        self.scenes = dict()
+        self.watcher = None
+        self.calls = 0
+        for node_id in self.nodes:
+            for index in range(values):
+                cc, label, units, vtype, genre, read_only, data = VALUES[index % len(VALUES)]
+                value_id = (node_id << 32) | (cc << 16) | index
+                self.values[value_id] = {'homeId': home_id, 'nodeId': node_id,
+                    'commandClass': cc, 'instance': 1, 'index': index, 'id': value_id,
+                    'genre': genre, 'type': vtype, 'value': data,
+                    'label': label, 'units': units, 'readOnly': read_only}
+
+    def notification(self, value_id):
+        """
+        The dict of a value sent by the library in the notifications.
+        """
+        value = dict(self.values[value_id])
+        value['commandClass'] = self.COMMAND_CLASS_DESC[value['commandClass']]
+        return value
+
+    def notify(self, notification):
+        """
+        Send a notification to the watcher, like the driver thread.
+        """
+        self.watcher(notification)
+
+    def create(self): pass
+    def addWatcher(self, watcher): self.watcher = watcher
+    def removeWatcher(self, watcher): self.watcher = None
+    def removeDriver(self, device): pass
+    def writeConfig(self, home_id): pass
+
+    def addDriver(self, device):
+        """
+        Start the simulated driver : the notifications of the nodes and their values.
+        """
+        self.notify({'notificationType': 'DriverReady', 'homeId': self.home_id, 'nodeId': 1})
+        for node_id in self.nodes:
+            if node_id != 1:
+                self.notify({'notificationType': 'NodeAdded', 'homeId': self.home_id, 'nodeId': node_id})
+        for value_id in sorted(self.values):
+            self.notify({'notificationType': 'ValueAdded', 'homeId': self.home_id,
+                'nodeId': self.values[value_id]['nodeId'], 'valueId': self.notification(value_id)})
+        self.notify({'notificationType': 'AllNodesQueried', 'homeId': self.home_id, 'nodeId': 1})
+
+    #Controller
+    def getLibraryTypeName(self, home_id): return 'Static Controller'
+    def getLibraryVersion(self, home_id): return 'Z-Wave 3.99'
+    def getPythonLibraryVersion(self): return 'python-openzwave simulated'
+    def getOzwLibraryVersion(self): return 'OpenZWave simulated'
+    def getSendQueueCount(self, home_id): return 0
+    def isPrimaryController(self, home_id): return True
+    def isStaticUpdateController(self, home_id): return True
+    def isBridgeController(self, home_id): return False
+    def getControllerNodeId(self, home_id): return 1
+    def getControllerInterfaceType(self, home_id): return 0
+    def getControllerPath(self, home_id): return b'/dev/simulated'
+
+    #Nodes
+    def getNodeName(self, home_id, node_id): self.calls += 1; return b''
+    def getNodeLocation(self, home_id, node_id): self.calls += 1; return b''
+    def getNodeProductName(self, home_id, node_id): self.calls += 1; return b'Simulated node'
+    def getNodeManufacturerName(self, home_id, node_id): self.calls += 1; return b'Simulated'
+    def getNodeType(self, home_id, node_id): self.calls += 1; return b'Routing Binary Switch'
+    def isNodeAwake(self, home_id, node_id): self.calls += 1; return True
+    def isNodeFailed(self, home_id, node_id): self.calls += 1; return False
+    def getNumGroups(self, home_id, node_id): self.calls += 1; return 0
+
+    #Values
+    def _field(self, value_id, field):
+        self.calls += 1
+        return self.values[value_id][field]
+
+    def getValue(self, value_id, homeid=None): return self._field(value_id, 'value')
+    def getValueLabel(self, value_id, homeid=None): return self._field(value_id, 'label').encode('UTF-8')
+    def getValueUnits(self, value_id, homeid=None): return self._field(value_id, 'units').encode('UTF-8')
+    def getValueType(self, value_id, homeid=None): return self._field(value_id, 'type')
+    def getValueGenre(self, value_id, homeid=None): return self._field(value_id, 'genre')
+    def getValueIndex(self, value_id, homeid=None): return self._field(value_id, 'index')
+    def getValueInstance(self, value_id, homeid=None): return self._field(value_id, 'instance')
+    def getValueCommandClass(self, value_id, homeid=None): return self._field(value_id, 'commandClass')
+    def isValueReadOnly(self, value_id, homeid=None): return self._field(value_id, 'readOnly')
+    def isValueWriteOnly(self, value_id, homeid=None): self.calls += 1; return False
+    def isValueSet(self, value_id, homeid=None): self.calls += 1; return True
+    def isPolled(self, value_id, homeid=None): self.calls += 1; return False
+
+    def setValue(self, value_id, data, homeid=None):
+        self.calls += 1
+        self.values[value_id]['value'] = data
+        return True
+
+    def getValues(self, value_ids, homeid=None):
+        self.calls += 1
+        return dict([(value_id, self.values[value_id]['value']) for value_id in value_ids if value_id in self.values])
+
+    def getNodeValues(self, homeid, node_id):
+        self.calls += 1
+        return dict([(value_id, value['value']) for value_id, value in self.values.items() if value['nodeId'] == node_id])
+
+    #Scenes
+    def getAllScenes(self): return set(self.scenes.keys())
+    def getNumScenes(self): return len(self.scenes)
+
+    def createScene(self):
+        scene_id = len(self.scenes) + 1
+        self.scenes[scene_id] = dict()
+        return scene_id
+
+    def addSceneValue(self, scene_id, value_id, data, homeid=None):
+        self.scenes[scene_id][value_id] = data
+        return 1
+
+    def sceneGetValues(self, scene_id):
+        self.calls += 1
+        return dict(self.scenes[scene_id])
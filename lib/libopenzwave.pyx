@@ -24,13 +24,15 @@ along with python-openzwave. If not, see http://www.gnu.org/licenses.
 
 """
 from cython.operator cimport dereference as deref
+from cython.operator cimport preincrement as inc
 from libcpp.map cimport map, pair
 from libcpp cimport bool
 from libcpp.vector cimport vector
 from libc.stdint cimport uint16_t,  uint32_t, uint64_t, int32_t, int16_t, uint8_t, int8_t
-from mylibc cimport string
+from mylibc cimport string, delete_uint8_array
 from vers cimport ozw_vers_major, ozw_vers_minor, ozw_vers_revision
 from libc.stdlib cimport malloc, free
+from cpython.buffer cimport PyObject_GetBuffer, PyBuffer_Release, PyBUF_SIMPLE
 from mylibc cimport PyEval_InitThreads
 from node cimport NodeData_t, NodeData
 from node cimport SecurityFlag
@@ -42,12 +44,15 @@ from notification cimport Type_CreateButton, Type_DeleteButton, Type_ButtonOn, T
 from notification cimport Type_SceneEvent
 from notification cimport const_notification, pfnOnNotification_t
 from values cimport ValueGenre, ValueType, ValueID
+from values cimport ValueType_Bool, ValueType_Byte, ValueType_Decimal, ValueType_Int, ValueType_List
+from values cimport ValueType_Short, ValueType_Button, ValueType_Raw
 from options cimport Options, Create
 from manager cimport Manager, Create, Get
 from cython.operator cimport dereference
 from log cimport LogLevel
 import os
 import sys
+from timeit import default_timer
 
 #import logging
 #logging.getLogger('openzwave').addHandler(logging.NullHandler())
@@ -218,74 +223,124 @@ PyLogLevels = {
     'Internal' : 10,
     }
 
-cdef map[uint64_t, ValueID] values_map
+#The ValueIDs by home id, then by node id, then by id : the id of a ValueID
+#doesn't contain the home id. The values of a node are read without
+#scanning the values of the other nodes
+ctypedef map[uint64_t, ValueID] NodeValues
+ctypedef map[uint8_t, NodeValues] HomeValues
+cdef map[uint32_t, HomeValues] values_map
+cdef bint notif_timing = False
+#The adjacency matrix of getNodesNeighbors : 232 nodes, 29 bytes by node
+cdef enum:
+    NEIGHBORS_NODES = 232
+    NEIGHBORS_ROW = 29
+#The labels and units of the values : the same few hundred strings are
+#shared by thousands of values
+cdef dict interned_strings = dict()
+
+cdef object internString(string s):
+    """
+    The shared copy of a string.
+    """
+    cdef object ret = s.c_str()
+    return interned_strings.setdefault(ret, ret)
+
+cdef inline uint8_t valueNodeId(uint64_t id):
+    """
+    The node id of a ValueID id : bits 24-31 (look at ValueID::GetNodeId).
+    """
+    return <uint8_t>((id >> 24) & 0xFF)
 
-cdef getValueFromType(Manager *manager, valueId) except+ MemoryError:
+cdef ValueID* findHomeValueId(HomeValues& home, uint64_t id):
+    """
+    Find a ValueID in the map of a home id.
+    """
+    cdef HomeValues.iterator node = home.find(valueNodeId(id))
+    cdef NodeValues.iterator value
+    if node == home.end():
+        return NULL
+    value = deref(node).second.find(id)
+    if value == deref(node).second.end():
+        return NULL
+    return &(deref(value).second)
+
+cdef ValueID* findValueId(uint64_t id, homeid):
+    """
+    Find a ValueID in the map of its home id.
+    Without home id, the maps of all the home ids are searched.
+    """
+    cdef map[uint32_t, HomeValues].iterator shard
+    cdef ValueID* ret
+    if homeid is not None:
+        shard = values_map.find(homeid)
+        if shard == values_map.end():
+            return NULL
+        return findHomeValueId(deref(shard).second, id)
+    shard = values_map.begin()
+    while shard != values_map.end():
+        ret = findHomeValueId(deref(shard).second, id)
+        if ret != NULL:
+            return ret
+        inc(shard)
+    return NULL
+
+cdef getValueFromType(Manager *manager, valueId, homeid=None) except+ MemoryError:
     """
     Translate a value in the right type
     """
+    cdef ValueID* vid = findValueId(valueId, homeid)
+    if vid != NULL:
+        return convertValue(manager, deref(vid))
+    return None
+
+cdef convertValue(Manager *manager, ValueID& v) except+ MemoryError:
+    """
+    Read a ValueID in the right type. Switch on the native type.
+    """
     cdef float type_float
     cdef bool type_bool
     cdef uint8_t type_byte
     cdef int32_t type_int
     cdef int16_t type_short
     cdef string type_string
-    cdef vector[string] vect
     cdef uint8_t* vectraw = NULL
     cdef uint8_t size
-    cdef string s
-    c = ""
+    cdef bool cret
+    cdef ValueType datatype = v.GetType()
     ret = None
-    if values_map.find(valueId) != values_map.end():
-        datatype = PyValueTypes[values_map.at(valueId).GetType()]
-        if datatype == "Bool":
-            cret = manager.GetValueAsBool(values_map.at(valueId), &type_bool)
-            ret = type_bool if cret else None
-            return ret
-        elif datatype == "Byte":
-            cret = manager.GetValueAsByte(values_map.at(valueId), &type_byte)
-            ret = type_byte if cret else None
-            return ret
-        elif datatype == "Raw":
-            cret = manager.GetValueAsRaw(values_map.at(valueId), &vectraw, &size)
-            if cret:
-                for x in range (0, size):
-                    c += chr(vectraw[x])
-            ret = c if cret else None
-            free(vectraw)
-            return ret
-        elif datatype == "Decimal":
-            cret = manager.GetValueAsFloat(values_map.at(valueId), &type_float)
-            ret = type_float if cret else None
-            return ret
-        elif datatype == "Int":
-            cret = manager.GetValueAsInt(values_map.at(valueId), &type_int)
-            ret = type_int if cret else None
-            return ret
-        elif datatype == "Short":
-            cret = manager.GetValueAsShort(values_map.at(valueId), &type_short)
-            ret = type_short if cret else None
-            return ret
-        elif datatype == "String":
-            cret = manager.GetValueAsString(values_map.at(valueId), &type_string)
-            ret = type_string.c_str() if cret else None
-            return ret
-        elif datatype == "Button":
-            cret = manager.GetValueAsBool(values_map.at(valueId), &type_bool)
-            ret = type_bool if cret else None
-            return ret
-        elif datatype == "List":
-            cret = manager.GetValueListSelection(values_map.at(valueId), &type_string)
-            ret = type_string.c_str() if cret else None
-            return ret
-        else :
-            cret = manager.GetValueAsString(values_map.at(valueId), &type_string)
-            ret = type_string.c_str() if cret else None
+    if datatype == ValueType_Bool or datatype == ValueType_Button:
+        cret = manager.GetValueAsBool(v, &type_bool)
+        ret = type_bool if cret else None
+    elif datatype == ValueType_Byte:
+        cret = manager.GetValueAsByte(v, &type_byte)
+        ret = type_byte if cret else None
+    elif datatype == ValueType_Raw:
+        cret = manager.GetValueAsRaw(v, &vectraw, &size)
+        if cret:
+            #One copy of the buffer to a bytes object
+            ret = (<char*>vectraw)[:size] if vectraw != NULL else b''
+        if vectraw != NULL:
+            delete_uint8_array(vectraw)
+    elif datatype == ValueType_Decimal:
+        cret = manager.GetValueAsFloat(v, &type_float)
+        ret = type_float if cret else None
+    elif datatype == ValueType_Int:
+        cret = manager.GetValueAsInt(v, &type_int)
+        ret = type_int if cret else None
+    elif datatype == ValueType_Short:
+        cret = manager.GetValueAsShort(v, &type_short)
+        ret = type_short if cret else None
+    elif datatype == ValueType_List:
+        cret = manager.GetValueListSelection(v, &type_string)
+        ret = type_string.c_str() if cret else None
+    else :
+        cret = manager.GetValueAsString(v, &type_string)
+        ret = type_string.c_str() if cret else None
     return ret
 
 cdef addValueId(ValueID v, n):
     cdef Manager *manager = Get()
-    values_map.insert ( pair[uint64_t, ValueID] (v.GetId(), v))
+    values_map[v.GetHomeId()][v.GetNodeId()].insert ( pair[uint64_t, ValueID] (v.GetId(), v))
     #check is a valid value
     if v.GetInstance() == 0:
         return None
@@ -315,9 +370,9 @@ cdef addValueId(ValueID v, n):
                         'id' : v.GetId(),
                         'genre' : genre,
                         'type' : PyValueTypes[v.GetType()],
-                        'value' : getValueFromType(manager,v.GetId()),
-                        'label' : manager.GetValueLabel(v).c_str(),
-                        'units' : manager.GetValueUnits(v).c_str(),
+                        'value' : getValueFromType(manager,v.GetId(),v.GetHomeId()),
+                        'label' : internString(manager.GetValueLabel(v)),
+                        'units' : internString(manager.GetValueUnits(v)),
                         'readOnly': manager.IsValueReadOnly(v),
                         }
 
@@ -327,6 +382,8 @@ cdef void notif_callback(const_notification _notification, void* _context) with
 
     """
     cdef Notification* notification = <Notification*>_notification
+    if notif_timing:
+        entry = default_timer()
     n = {'notificationType' : PyNotifications[notification.GetType()],
          'homeId' : notification.GetHomeId(),
          'nodeId' : notification.GetNodeId(),
@@ -353,6 +410,9 @@ cdef void notif_callback(const_notification _notification, void* _context) with
     if isAddValueDetails:
         addValueId(notification.GetValueID(), n)
 
+    if notif_timing:
+        n['timing'] = (entry, default_timer())
+
     (<object>_context)(n)
 
 cdef void ctrl_callback(ControllerState _state, ControllerError _error, void* _context) with gil:
@@ -367,6 +427,16 @@ cdef void ctrl_callback(ControllerState _state, ControllerError _error, void* _c
         }
     (<object>_context)(c)
 
+def internedStrings():
+    '''
+Retrieve the number of labels and units shared by the values.
+
+:return: The number of strings in the table
+:rtype: int
+
+    '''
+    return len(interned_strings)
+
 cpdef object driverData():
     cdef DriverData data
 
@@ -1172,7 +1242,7 @@ does not have to cope with more than one poll per second).
         '''
         self.manager.SetPollInterval(milliseconds, bIntervalBetweenPolls)
 
-    def enablePoll(self, id, intensity = 1):
+    def enablePoll(self, id, intensity = 1, homeid=None):
         '''
 .. _enablePoll:
 
@@ -1180,6 +1250,8 @@ Enable the polling of a device's state.
 
 :param id: The ID of the value to start polling
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :param intensity: The intensity of the poll
 :type intensity: int
 :return: True if polling was enabled.
@@ -1187,12 +1259,13 @@ Enable the polling of a device's state.
 :see: getPollInterval_, setPollInterval_, isPolled_, setPollIntensity_, disablePoll_, getPollIntensity_
 
         '''
-        if values_map.find(id) != values_map.end():
-            return self.manager.EnablePoll(values_map.at(id), intensity)
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            return self.manager.EnablePoll(deref(vid), intensity)
         else :
             return False
 
-    def disablePoll(self, id):
+    def disablePoll(self, id, homeid=None):
         '''
 .. _disablePoll:
 
@@ -1200,17 +1273,20 @@ Disable polling of a value.
 
 :param id: The ID of the value to disable polling.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: True if polling was disabled.
 :rtype: bool
 :see: getPollInterval_, setPollInterval_, enablePoll_, isPolled_, setPollIntensity_, getPollIntensity_
 
         '''
-        if values_map.find(id) != values_map.end():
-            return self.manager.DisablePoll(values_map.at(id))
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            return self.manager.DisablePoll(deref(vid))
         else :
             return False
 
-    def isPolled(self, id):
+    def isPolled(self, id, homeid=None):
         '''
 .. _isPolled:
 
@@ -1218,35 +1294,41 @@ Check polling status of a value
 
 :param id: The ID of the value to check polling.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: True if polling is active.
 :rtype: bool
 :see: getPollInterval_, setPollInterval_, enablePoll_, setPollIntensity_, disablePoll_, getPollIntensity_
 
         '''
-        if values_map.find(id) != values_map.end():
-            return self.manager.isPolled(values_map.at(id))
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            return self.manager.isPolled(deref(vid))
         else :
             return False
 
-    def getPollIntensity(self, id):
+    def getPollIntensity(self, id, homeid=None):
         '''
 .. _getPollIntensity:
 
 Get the intensity with which this value is polled (0=none, 1=every time through the list, 2-every other time, etc).
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: A integer containing the poll intensity
 :rtype: int
 :see: getPollInterval_, setPollInterval_, enablePoll_, setPollIntensity_, disablePoll_, isPolled_
 
        '''
-        if values_map.find(id) != values_map.end():
-            intensity = self.manager.GetPollIntensity(values_map.at(id))
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            intensity = self.manager.GetPollIntensity(deref(vid))
             return intensity
         else :
             return 0
 
-    def setPollIntensity(self, id, intensity):
+    def setPollIntensity(self, id, intensity, homeid=None):
         '''
 .. _setPollIntensity:
 
@@ -1254,13 +1336,16 @@ Set the frequency of polling (0=none, 1=every time through the set, 2-every othe
 
 :param id: The ID of the value whose intensity should be set
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :param intensity: the intensity of the poll
 :type intensity: int
 :see: getPollInterval_, setPollInterval_, enablePoll_, isPolled_, disablePoll_, getPollIntensity_
 
         '''
-        if values_map.find(id) != values_map.end():
-            self.manager.SetPollIntensity(values_map.at(id), intensity)
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            self.manager.SetPollIntensity(deref(vid), intensity)
 
 #
 # -----------------------------------------------------------------------------
@@ -1625,34 +1710,53 @@ Get the bitmap of this node's neighbors.
 :rtype: set()
 
         '''
+        cdef uint8_t* neighbors = NULL
+        cdef uint32_t count = self.manager.GetNodeNeighbors(homeid, nodeid, &neighbors)
+        cdef uint32_t i
         data = set()
-        #Allocate memory for the c++ function
-        #Return value is pointer to uint8_t[]
-        cdef uint8_t** dbuf = <uint8_t**>malloc(sizeof(uint8_t)*29)
-        #Get the number of neigbors
-        cdef uint32_t count = self.manager.GetNodeNeighbors(homeid, nodeid, dbuf)
-        if count == 0:
-            #Don't need to allocate memory.
-            free(dbuf)
-            return data
-        #Allocate memory for the returned values
-        cdef RetAlloc retuint8 = RetAlloc(count)
-        cdef uint8_t* p
-        cdef uint32_t start = 0
-        if count:
-            try:
-                p = dbuf[0] # p is now pointing at first element of array
-                for i in range(start, count):
-                    #cdef uint8_t = retuint8[i]
-                    retuint8.data[i] = p[0]
-                    data.add(retuint8.data[i])
-                    p += 1
-            finally:
-                #Free memory
-                free(dbuf)
-                pass
+        if neighbors != NULL:
+            for i in range(count):
+                data.add(neighbors[i])
+            delete_uint8_array(neighbors)
         return data
 
+    def getNodesNeighbors(self, homeid, nodeids=None):
+        '''
+.. _getNodesNeighbors:
+
+Get the neighbors of several nodes in one call, as an adjacency matrix.
+
+:param homeId: The Home ID of the Z-Wave controller that manages the nodes.
+:type homeId: int
+:param nodeIds: The IDs of the nodes to query. All the nodes (1 to 232) if None.
+:type nodeIds: list()
+:return: A bytearray of 232 rows of 29 bytes. The bit (m-1) of the row (n-1) is set if m is a neighbor of n.
+:rtype: bytearray
+:see: getNodeNeighbors_
+
+        '''
+        cdef bytearray matrix = bytearray(NEIGHBORS_NODES * NEIGHBORS_ROW)
+        cdef unsigned char* cmatrix = <unsigned char*><char*>matrix
+        cdef uint8_t* neighbors
+        cdef uint32_t count, i
+        cdef uint8_t node, neighbor
+        if nodeids is None:
+            nodeids = range(1, NEIGHBORS_NODES + 1)
+        for nodeid in nodeids:
+            if nodeid < 1 or nodeid > NEIGHBORS_NODES:
+                continue
+            node = nodeid
+            neighbors = NULL
+            count = self.manager.GetNodeNeighbors(homeid, node, &neighbors)
+            if neighbors == NULL:
+                continue
+            for i in range(count):
+                neighbor = neighbors[i]
+                if neighbor >= 1 and neighbor <= NEIGHBORS_NODES:
+                    cmatrix[(node - 1) * NEIGHBORS_ROW + (neighbor - 1) // 8] |= 1 << ((neighbor - 1) % 8)
+            delete_uint8_array(neighbors)
+        return matrix
+
     def getNodeManufacturerName(self, homeid, nodeid):
         '''
         .. _getNodeManufacturerName:
@@ -2180,7 +2284,7 @@ Helper method to return whether a particular class is available in a node
 #        bool SetValue(ValueID& valueid, string value)
 #        bool SetValueListSelection(ValueID& valueid, string selecteditem)
 
-    def setValue(self, id, value):
+    def setValue(self, id, value, homeid=None):
         '''
 .. _setValue:
 
@@ -2191,67 +2295,75 @@ if the Z-Wave message actually failed to get through.  Notification callbacks wi
 
 :param id: The ID of a value.
 :type id: int
-:param value: The value to set.
-:type value: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
+:param value: The value to set. Raw values accept any object with the buffer protocol (bytes, bytearray, memoryview, ...)
+:type value: int, float, bool, str or bytes
 :return: An integer representing the result of the operation  0 : The C method fails, 1 : The C method succeed, 2 : Can't find id in the map
 :rtype: int
 
         '''
+        cdef ValueID* vid = findValueId(id, homeid)
         cdef float type_float
         cdef bool type_bool
         cdef uint8_t type_byte
         cdef int32_t type_int
         cdef int16_t type_short
         cdef string type_string
-        cdef uint8_t* type_raw
+        cdef Py_buffer type_raw
         ret = 2
-        if values_map.find(id) != values_map.end():
-            datatype = PyValueTypes[values_map.at(id).GetType()]
+        if vid != NULL:
+            datatype = PyValueTypes[deref(vid).GetType()]
             if datatype == "Bool":
                 type_bool = value
-                cret = self.manager.SetValue(values_map.at(id), type_bool)
+                cret = self.manager.SetValue(deref(vid), type_bool)
                 ret = 1 if cret else 0
             elif datatype == "Byte":
                 type_byte = value
-                cret = self.manager.SetValue(values_map.at(id), type_byte)
+                cret = self.manager.SetValue(deref(vid), type_byte)
                 ret = 1 if cret else 0
             elif datatype == "Raw":
-                type_raw = <uint8_t*> malloc(len(value)*sizeof(uint8_t))
-                for x in range(0, len(value)):
-                    print value[x]
-                    type_raw[x] = ord(value[x])
-                cret = self.manager.SetValue(values_map.at(id), type_raw, len(value))
-                ret = 1 if cret else 0
-                free(type_raw)
+                #Any object with the buffer protocol (bytes, bytearray, memoryview, array, ...)
+                #is given to the library without copy. Strings keep one char for one byte.
+                if isinstance(value, unicode):
+                    value = value.encode('latin-1')
+                PyObject_GetBuffer(value, &type_raw, PyBUF_SIMPLE)
+                try:
+                    if type_raw.len > 255:
+                        raise ValueError("Raw values are limited to 255 bytes")
+                    cret = self.manager.SetValue(deref(vid), <uint8_t*>type_raw.buf, <uint8_t>type_raw.len)
+                    ret = 1 if cret else 0
+                finally:
+                    PyBuffer_Release(&type_raw)
             elif datatype == "Decimal":
                 type_float = value
-                cret = self.manager.SetValue(values_map.at(id), type_float)
+                cret = self.manager.SetValue(deref(vid), type_float)
                 ret = 1 if cret else 0
             elif datatype == "Int":
                 type_int = value
-                cret = self.manager.SetValue(values_map.at(id), type_int)
+                cret = self.manager.SetValue(deref(vid), type_int)
                 ret = 1 if cret else 0
             elif datatype == "Short":
                 type_short = value
-                cret = self.manager.SetValue(values_map.at(id), type_short)
+                cret = self.manager.SetValue(deref(vid), type_short)
                 ret = 1 if cret else 0
             elif datatype == "String":
                 type_string = string(value)
-                cret = self.manager.SetValue(values_map.at(id), type_string)
+                cret = self.manager.SetValue(deref(vid), type_string)
                 ret = 1 if cret else 0
             elif datatype == "Button":
                 type_bool = value
-                cret = self.manager.SetValue(values_map.at(id), type_bool)
+                cret = self.manager.SetValue(deref(vid), type_bool)
                 ret = 1 if cret else 0
             elif datatype == "List":
                 type_string = string(value)
                 #logging.debug("SetValueListSelection %s" % value)
-                cret = self.manager.SetValueListSelection(values_map.at(id), type_string)
+                cret = self.manager.SetValueListSelection(deref(vid), type_string)
                 #logging.debug("SetValueListSelection %s" % cret)
                 ret = 1 if cret else 0
         return ret
 
-    def refreshValue(self, id):
+    def refreshValue(self, id, homeid=None):
         '''
 .. _refreshValue:
 
@@ -2261,12 +2373,17 @@ of the specified ValueID (just like a poll, except only one-time, not recurring)
 
 :param id: The unique identifier of the value to be refreshed.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: bool -- True if the driver and node were found; false otherwise
 
         '''
-        return self.manager.RefreshValue(values_map.at(id))
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid == NULL:
+            return False
+        return self.manager.RefreshValue(deref(vid))
 
-    def getValueLabel(self, id):
+    def getValueLabel(self, id, homeid=None):
         '''
 .. _getValueLabel:
 
@@ -2274,19 +2391,22 @@ Gets the user-friendly label for the value
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: A string containing the user-friendly label of the value
 :rtype: str
 :see: setValueLabel_
 
        '''
+        cdef ValueID* vid = findValueId(id, homeid)
         cdef string c_string
-        if values_map.find(id) != values_map.end():
-            c_string = self.manager.GetValueLabel(values_map.at(id))
-            return c_string.c_str()
+        if vid != NULL:
+            c_string = self.manager.GetValueLabel(deref(vid))
+            return internString(c_string)
         else :
             return None
 
-    def setValueLabel(self, id, char *label):
+    def setValueLabel(self, id, char *label, homeid=None):
         '''
 .. _setValueLabel:
 
@@ -2294,15 +2414,18 @@ Sets the user-friendly label for the value
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :param label: The label of the value.
 :type label: str
 :see: getValueLabel_
 
         '''
-        if values_map.find(id) != values_map.end():
-            self.manager.SetValueLabel(values_map.at(id), string(label))
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            self.manager.SetValueLabel(deref(vid), string(label))
 
-    def getValueUnits(self, id):
+    def getValueUnits(self, id, homeid=None):
         '''
 .. _getValueUnits:
 
@@ -2310,19 +2433,22 @@ Gets the units that the value is measured in.
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: A string containing the value of the units.
 :rtype: str
 :see: setValueUnits_
 
         '''
+        cdef ValueID* vid = findValueId(id, homeid)
         cdef string c_string
-        if values_map.find(id) != values_map.end():
-            c_string = self.manager.GetValueUnits(values_map.at(id))
-            return c_string.c_str()
+        if vid != NULL:
+            c_string = self.manager.GetValueUnits(deref(vid))
+            return internString(c_string)
         else :
             return None
 
-    def setValueUnits(self, id, char *unit):
+    def setValueUnits(self, id, char *unit, homeid=None):
         '''
 .. _setValueUnits:
 
@@ -2330,15 +2456,18 @@ Sets the units that the value is measured in.
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :param label: The new value of the units.
 :type label: str
 :see: getValueUnits_
 
         '''
-        if values_map.find(id) != values_map.end():
-            self.manager.SetValueUnits(values_map.at(id), string(unit))
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            self.manager.SetValueUnits(deref(vid), string(unit))
 
-    def getValueHelp(self, id):
+    def getValueHelp(self, id, homeid=None):
         '''
 .. _getValueHelp:
 
@@ -2346,19 +2475,22 @@ Gets a help string describing the value's purpose and usage.
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: A string containing the value help text.
 :rtype: str
 :see: setValueHelp_
 
         '''
+        cdef ValueID* vid = findValueId(id, homeid)
         cdef string c_string
-        if values_map.find(id) != values_map.end():
-            c_string = self.manager.GetValueHelp(values_map.at(id))
+        if vid != NULL:
+            c_string = self.manager.GetValueHelp(deref(vid))
             return c_string.c_str()
         else :
             return None
 
-    def setValueHelp(self, id, char *help):
+    def setValueHelp(self, id, char *help, homeid=None):
         '''
 .. _setValueHelp:
 
@@ -2366,15 +2498,18 @@ Sets a help string describing the value's purpose and usage.
 
 :param id: the ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :param help: The new value of the help text.
 :type help: str
 :see: getValueHelp_
 
         '''
-        if values_map.find(id) != values_map.end():
-            self.manager.SetValueHelp(values_map.at(id), string(help))
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            self.manager.SetValueHelp(deref(vid), string(help))
 
-    def getValueMin(self, id):
+    def getValueMin(self, id, homeid=None):
         '''
 .. _getValueMin:
 
@@ -2382,17 +2517,20 @@ Gets the minimum that this value may contain.
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: The value minimum.
 :rtype: int
 :see: getValueMax_
 
         '''
-        if values_map.find(id) != values_map.end():
-            return self.manager.GetValueMin(values_map.at(id))
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            return self.manager.GetValueMin(deref(vid))
         else :
             return None
 
-    def getValueMax(self, id):
+    def getValueMax(self, id, homeid=None):
         '''
 .. _getValueMax:
 
@@ -2400,17 +2538,20 @@ Gets the maximum that this value may contain.
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: The value maximum.
 :rtype: int
 :see: getValueMin_
 
         '''
-        if values_map.find(id) != values_map.end():
-            return self.manager.GetValueMax(values_map.at(id))
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            return self.manager.GetValueMax(deref(vid))
         else :
             return None
 
-    def isValueReadOnly(self, id):
+    def isValueReadOnly(self, id, homeid=None):
         '''
 .. _isValueReadOnly:
 
@@ -2418,17 +2559,20 @@ Test whether the value is read-only.
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: True if the value cannot be changed by the user.
 :rtype: bool
 :see: isValueWriteOnly_
 
         '''
-        if values_map.find(id) != values_map.end():
-            return self.manager.IsValueReadOnly(values_map.at(id))
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            return self.manager.IsValueReadOnly(deref(vid))
         else :
             return None
 
-    def isValueWriteOnly(self, id):
+    def isValueWriteOnly(self, id, homeid=None):
         '''
 .. _isValueWriteOnly:
 
@@ -2436,17 +2580,20 @@ Test whether the value is write-only.
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: True if the value can only be written to and not read.
 :rtype: bool
 :see: isValueReadOnly_
 
         '''
-        if values_map.find(id) != values_map.end():
-            return self.manager.IsValueWriteOnly(values_map.at(id))
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            return self.manager.IsValueWriteOnly(deref(vid))
         else :
             return None
 
-    def isValueSet(self, id):
+    def isValueSet(self, id, homeid=None):
         '''
 .. _isValueSet:
 
@@ -2454,6 +2601,8 @@ Test whether the value has been set.
 
 :param id: the ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: True if the value has actually been set by a status message from the device, rather than simply being the default.
 :rtype: bool
 :see: getValue_, getValueAsBool_, getValueAsByte_, getValueListItems_, \
@@ -2461,12 +2610,13 @@ getValueAsFloat_, getValueAsShort_, getValueAsInt_, getValueAsString_, \
 getValueType_, getValueInstance_, getValueIndex_
 
         '''
-        if values_map.find(id) != values_map.end():
-            return self.manager.IsValueSet(values_map.at(id))
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            return self.manager.IsValueSet(deref(vid))
         else :
             return None
 
-    def isValuePolled(self, id):
+    def isValuePolled(self, id, homeid=None):
         '''
 .. _isValuePolled:
 
@@ -2474,16 +2624,19 @@ Test whether the value is currently being polled.
 
 :param id: the ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: True if the value is being polled, otherwise false.
 :rtype: bool
 
         '''
-        if values_map.find(id) != values_map.end():
-            return self.manager.IsValuePolled(values_map.at(id))
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            return self.manager.IsValuePolled(deref(vid))
         else :
             return None
 
-    def getValueGenre(self, id):
+    def getValueGenre(self, id, homeid=None):
         '''
 .. _getValueGenre:
 
@@ -2493,6 +2646,8 @@ by the application
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: A string containing the type of the value
 :rtype: str
 :see: isValueSet_, getValueAsBool_, getValueAsByte_, getValueListItems_, \
@@ -2501,13 +2656,14 @@ getValueAsFloat_, getValueAsShort_, getValueAsInt_, getValueCommandClass_\
 getValueAsString_, getValue_, getValueType_, getValueInstance_, getValueIndex_
 
        '''
-        if values_map.find(id) != values_map.end():
-            genre = PyGenres[values_map.at(id).GetGenre()]
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            genre = PyGenres[deref(vid).GetGenre()]
             return genre
         else :
             return None
 
-    def getValueCommandClass(self, id):
+    def getValueCommandClass(self, id, homeid=None):
         '''
 .. _getValueCommandClass:
 
@@ -2520,6 +2676,8 @@ information is exposed in case it is of interest.
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: The command class of the value
 :rtype: int
 :see: isValueSet_, getValueAsBool_, getValueAsByte_, getValueListItems_, \
@@ -2528,13 +2686,14 @@ getValueAsFloat_, getValueAsShort_, getValueAsInt_, getValueGenre_, \
 getValueAsString_, getValue_, getValueType_, getValueInstance_, getValueIndex_
 
        '''
-        if values_map.find(id) != values_map.end():
-            cmd_cls = values_map.at(id).GetCommandClassId()
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            cmd_cls = deref(vid).GetCommandClassId()
             return cmd_cls
         else :
             return None
 
-    def getValueInstance(self, id):
+    def getValueInstance(self, id, homeid=None):
         '''
 .. _getValueInstance:
 
@@ -2544,6 +2703,8 @@ only the SensorMultilevel command class ever does this.
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: A string containing the type of the value
 :rtype: str
 :see: isValueSet_, getValueAsBool_, getValueAsByte_, getValueListItems_, \
@@ -2552,13 +2713,14 @@ getValueAsFloat_, getValueAsShort_, getValueAsInt_, getValueCommandClass_, \
 getValueAsString_, getValue_, getValueType_, getValueIndex_
 
        '''
-        if values_map.find(id) != values_map.end():
-            genre = values_map.at(id).GetInstance()
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            genre = deref(vid).GetInstance()
             return genre
         else :
             return None
 
-    def getValueIndex(self, id):
+    def getValueIndex(self, id, homeid=None):
         '''
 .. _getValueIndex:
 
@@ -2569,6 +2731,8 @@ same as the parameter ID.
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: A string containing the type of the value
 :rtype: str
 :see: isValueSet_, getValueAsBool_, getValueAsByte_, getValueListItems_, \
@@ -2577,13 +2741,14 @@ getValueAsFloat_, getValueAsShort_, getValueAsInt_, getValueCommandClass_, \
 getValueAsString_, getValue_, getValueType_
 
        '''
-        if values_map.find(id) != values_map.end():
-            genre = values_map.at(id).GetIndex()
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            genre = deref(vid).GetIndex()
             return genre
         else :
             return None
 
-    def getValueType(self, id):
+    def getValueType(self, id, homeid=None):
         '''
 .. _getValueType:
 
@@ -2591,6 +2756,8 @@ Gets the type of the value
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: A string containing the type of the value
 :rtype: str
 :see: isValueSet_, getValueAsBool_, getValueAsByte_, getValueListItems_, \
@@ -2599,13 +2766,14 @@ getValueAsFloat_, getValueAsShort_, getValueAsInt_, getValueAsString_, \
 getValue_, getValueInstance_, getValueIndex_, getValueCommandClass_
 
        '''
-        if values_map.find(id) != values_map.end():
-            datatype = PyValueTypes[values_map.at(id).GetType()]
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            datatype = PyValueTypes[deref(vid).GetType()]
             return datatype
         else :
             return None
 
-    def getValue(self, id):
+    def getValue(self, id, homeid=None):
         '''
 .. _getValue:
 
@@ -2613,6 +2781,8 @@ Gets a value.
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :param value: The value to set.
 :type value: int
 :return: Depending of the type of the valueId, None otherwise
@@ -2623,9 +2793,61 @@ getValueAsFloat_, getValueAsShort_, getValueAsInt_, getValueAsString_, \
 getValueType_, getValueInstance_, getValueIndex_, getValueCommandClass_
 
         '''
-        return getValueFromType(self.manager,id)
+        return getValueFromType(self.manager, id, homeid)
+
+    def getValues(self, ids, homeid=None):
+        '''
+.. _getValues:
+
+Gets the values of a list of ids in one call.
+
+:param ids: The IDs of the values.
+:type ids: list()
+:param homeid: The home id of the values. Needed when several controllers are used
+:type homeid: int
+:return: A dict {id: value}. The value is None if the id is unknown or can't be read
+:rtype: dict()
+:see: getValue_, getNodeValues_
+
+        '''
+        cdef ValueID* vid
+        ret = dict()
+        for id in ids:
+            vid = findValueId(id, homeid)
+            ret[id] = convertValue(self.manager, deref(vid)) if vid != NULL else None
+        return ret
+
+    def getNodeValues(self, homeid, nodeid):
+        '''
+.. _getNodeValues:
+
+Gets all the values of a node in one call.
+
+:param homeid: The Home ID of the Z-Wave controller that manages the node.
+:type homeid: int
+:param nodeid: The ID of the node.
+:type nodeid: int
+:return: A dict {id: value}
+:rtype: dict()
+:see: getValue_, getValues_
+
+        '''
+        cdef map[uint32_t, HomeValues].iterator shard = values_map.find(<uint32_t>homeid)
+        cdef HomeValues.iterator node
+        cdef NodeValues.iterator it
+        ret = dict()
+        if shard == values_map.end():
+            return ret
+        node = deref(shard).second.find(<uint8_t>nodeid)
+        if node == deref(shard).second.end():
+            return ret
+        it = deref(node).second.begin()
+        while it != deref(node).second.end():
+            ret[deref(it).first] = convertValue(self.manager, deref(it).second)
+            inc(it)
+        return ret
 
-    def getValueAsBool(self, id):
+    def getValueAsBool(self, id, homeid=None):
         '''
 .. _getValueAsBool:
 
@@ -2633,6 +2855,8 @@ Gets a value as a bool.
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: The value
 :rtype: bool
 :see: isValueSet_, getValue_, getValueAsByte_, getValueListItems_, \
@@ -2641,9 +2865,9 @@ getValueAsFloat_, getValueAsShort_, getValueAsInt_, getValueAsString_, \
 getValueType_, getValueInstance_, getValueIndex_, getValueCommandClass_
 
         '''
-        return getValueFromType(self.manager,id)
+        return getValueFromType(self.manager, id, homeid)
 
-    def getValueAsByte(self, id):
+    def getValueAsByte(self, id, homeid=None):
         '''
 .. _getValueAsByte:
 
@@ -2651,6 +2875,8 @@ Gets a value as an 8-bit unsigned integer.
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: The value
 :rtype: int
 :see: isValueSet_, getValue_, getValueAsBool_, getValueListItems_, \
@@ -2659,9 +2885,9 @@ getValueAsFloat_, getValueAsShort_, getValueAsInt_, getValueAsString_, \
 getValueType_, getValueInstance_, getValueIndex_, getValueCommandClass_
 
         '''
-        return getValueFromType(self.manager,id)
+        return getValueFromType(self.manager, id, homeid)
 
-    def getValueAsFloat(self, id):
+    def getValueAsFloat(self, id, homeid=None):
         '''
 .. _getValueAsFloat:
 
@@ -2669,6 +2895,8 @@ Gets a value as a float.
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: The value
 :rtype: float
 :see: isValueSet_, getValue_, getValueAsBool_, getValueAsByte_, \
@@ -2677,9 +2905,9 @@ getValueAsShort_, getValueAsInt_, getValueAsString_, getValueListItems_, \
 getValueType_, getValueInstance_, getValueIndex_
 
         '''
-        return getValueFromType(self.manager,id)
+        return getValueFromType(self.manager, id, homeid)
 
-    def getValueAsShort(self, id):
+    def getValueAsShort(self, id, homeid=None):
         '''
 .. _getValueAsShort:
 
@@ -2687,6 +2915,8 @@ Gets a value as a 16-bit signed integer.
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: The value
 :rtype: int
 :see: isValueSet_, getValue_, getValueAsBool_, getValueAsByte_, \
@@ -2695,9 +2925,9 @@ getValueAsFloat_, getValueAsInt_, getValueAsString_, getValueListItems_, \
 getValueType_, getValueInstance_, getValueIndex_
 
         '''
-        return getValueFromType(self.manager,id)
+        return getValueFromType(self.manager, id, homeid)
 
-    def getValueAsInt(self, id):
+    def getValueAsInt(self, id, homeid=None):
         '''
 .. _getValueAsInt:
 
@@ -2705,6 +2935,8 @@ Gets a value as a 32-bit signed integer.
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: The value
 :rtype: int
 :see: isValueSet_, getValue_, getValueAsBool_, getValueAsByte_, \
@@ -2713,9 +2945,9 @@ getValueAsFloat_, getValueAsShort_, getValueAsString_, getValueListItems_, \
 getValueType_, getValueInstance_, getValueIndex_
 
         '''
-        return getValueFromType(self.manager,id)
+        return getValueFromType(self.manager, id, homeid)
 
-    def getValueAsString(self, id):
+    def getValueAsString(self, id, homeid=None):
         '''
 .. _getValueAsString:
 
@@ -2723,6 +2955,8 @@ Gets a value as a string.
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: The value
 :rtype: str
 :see: isValueSet_, getValue_, getValueAsBool_, getValueAsByte_, \
@@ -2731,9 +2965,9 @@ getValueAsFloat_, getValueAsShort_, getValueAsInt_, getValueListItems_, \
 getValueType_, getValueInstance_, getValueIndex_
 
         '''
-        return getValueFromType(self.manager,id)
+        return getValueFromType(self.manager, id, homeid)
 
-    def getValueListSelectionStr(self,  id):
+    def getValueListSelectionStr(self,  id, homeid=None):
         '''
 .. _getValueListSelectionStr:
 
@@ -2741,6 +2975,8 @@ Gets value of items from a list value
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: The value
 :rtype: str
 :see: isValueSet_, getValue_, getValueAsBool_, getValueAsByte_, \
@@ -2748,9 +2984,9 @@ getValueListSelectionNum_, getValueListItems_,\
 getValueAsFloat_, getValueAsShort_, getValueAsInt_, getValueAsString_, \
 getValueType_, getValueInstance_, getValueIndex_
     '''
-        return getValueFromType(self.manager,id)
+        return getValueFromType(self.manager, id, homeid)
 
-    def getValueListSelectionNum(self,  id):
+    def getValueListSelectionNum(self,  id, homeid=None):
         '''
 .. _getValueListSelectionNum:
 
@@ -2758,6 +2994,8 @@ Gets value of items from a list value
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: The value
 :rtype: int
 :see: isValueSet_, getValue_, getValueAsBool_, getValueAsByte_, \
@@ -2765,15 +3003,16 @@ getValueListSelectionStr_, getValueListItems_,\
 getValueAsFloat_, getValueAsShort_, getValueAsInt_, getValueAsString_, \
 getValueType_, getValueInstance_, getValueIndex_
     '''
+        cdef ValueID* vid = findValueId(id, homeid)
         cdef int32_t type_int
         ret=-1
-        if values_map.find(id) != values_map.end():
-            if self.manager.GetValueListSelection(values_map.at(id), &type_int):
+        if vid != NULL:
+            if self.manager.GetValueListSelection(deref(vid), &type_int):
                 ret = type_int
         #print "//////// Value Num list item : " ,  ret
         return ret
 
-    def getValueListItems(self, id):
+    def getValueListItems(self, id, homeid=None):
         '''
 .. _getValueListItems:
 
@@ -2781,6 +3020,8 @@ Gets the list of items from a list value
 
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: The list of possible values
 :rtype: set()
 :see: isValueSet_, getValue_, getValueAsBool_, getValueAsByte_, \
@@ -2789,11 +3030,12 @@ getValueAsFloat_, getValueAsShort_, getValueAsInt_, getValueAsString_, \
 getValueType_, getValueInstance_, getValueIndex_
 
         '''
+        cdef ValueID* vid = findValueId(id, homeid)
         #print "**** libopenzwave.GetValueListItems ******"
         cdef vector[string] vect
         ret = set()
-        if values_map.find(id) != values_map.end():
-            if self.manager.GetValueListItems(values_map.at(id), &vect):
+        if vid != NULL:
+            if self.manager.GetValueListItems(deref(vid), &vect):
                 while not vect.empty() :
                     temp = vect.back()
                     ret.add(temp.c_str())
@@ -2801,7 +3043,7 @@ getValueType_, getValueInstance_, getValueIndex_
             #print "++++ list des items : " ,  ret
         return ret
 
-    def pressButton(self, id):
+    def pressButton(self, id, homeid=None):
         '''
 .. _pressButton:
 
@@ -2811,17 +3053,20 @@ no notification callbacks are sent.
 
 :param id: The ID of an integer value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: True if the activity was started. Returns false if the value is not a ValueID::ValueType_Button. The type can be tested with a call to ValueID::GetType.
 :rtype: bool
 :see: releaseButton_
 
         '''
-        if values_map.find(id) != values_map.end():
-            return self.manager.PressButton(values_map.at(id))
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            return self.manager.PressButton(deref(vid))
         else :
             return False
 
-    def releaseButton(self, id):
+    def releaseButton(self, id, homeid=None):
         '''
 .. _releaseButton:
 
@@ -2831,34 +3076,40 @@ no notification callbacks are sent.
 
 :param id: the ID of an integer value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: True if the activity was stopped. Returns false if the value is not a ValueID::ValueType_Button. The type can be tested with a call to ValueID::GetType.
 :rtype: bool
 :see: pressButton_
 
         '''
-        if values_map.find(id) != values_map.end():
-            return self.manager.ReleaseButton(values_map.at(id))
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            return self.manager.ReleaseButton(deref(vid))
         else :
             return False
 
 
-    def getValueFloatPrecision(self, id):
+    def getValueFloatPrecision(self, id, homeid=None):
         '''
 .. _getValueFloatPrecision: Gets a float value's precision
 
 :param id: The unique identifier of the value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return:  a float value's precision.
 :rtype: int
 
         '''
+        cdef ValueID* vid = findValueId(id, homeid)
         cdef uint8_t precision
-        if values_map.find(id) != values_map.end():
-            success = self.manager.GetValueFloatPrecision(values_map.at(id), &precision)
+        if vid != NULL:
+            success = self.manager.GetValueFloatPrecision(deref(vid), &precision)
             return precision if success else None
         return None
 
-    def getChangeVerified(self, id):
+    def getChangeVerified(self, id, homeid=None):
         '''
 .. _getChangeVerified: determine if value changes upon a refresh should be verified.
 If so, the library will immediately refresh the value a second time whenever a change is observed.
@@ -2866,30 +3117,36 @@ This helps to filter out spurious data reported occasionally by some devices.
 
 :param id:  The unique identifier of the value whose changes should or should not be verified.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return:  True if is verified.
 :rtype: bool
 
         '''
+        cdef ValueID* vid = findValueId(id, homeid)
 
-        if values_map.find(id) != values_map.end():
-            return self.manager.GetChangeVerified(values_map.at(id))
+        if vid != NULL:
+            return self.manager.GetChangeVerified(deref(vid))
         return False
 
-    def setChangeVerified(self, id, verify ):
+    def setChangeVerified(self, id, verify , homeid=None):
         '''
 .. _setChangeVerified: Sets a flag indicating whether value changes noted upon a refresh should be verified.
 If so, the library will immediately refresh the value a second time whenever a change is observed. This helps to filter out spurious data reported occasionally by some devices.
 
 :param id:  The unique identifier of the value whose changes should or should not be verified.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :param verify if true, verify changes; if false, don't verify changes
 :type verify: bool
 
 
         '''
+        cdef ValueID* vid = findValueId(id, homeid)
 
-        if values_map.find(id) != values_map.end():
-            self.manager.SetChangeVerified(values_map.at(id), verify)
+        if vid != NULL:
+            self.manager.SetChangeVerified(deref(vid), verify)
 
 #
 # -----------------------------------------------------------------------------
@@ -2906,7 +3163,7 @@ If so, the library will immediately refresh the value a second time whenever a c
 # The switch point methods only modify OpenZWave's copy of the schedule information.  Once all changes
 # have been made, they are sent to the device by calling SetSchedule.
 #
-    def setSwitchPoint(self, id, hours, minutes, setback):
+    def setSwitchPoint(self, id, hours, minutes, setback, homeid=None):
         '''
 .. _setSwitchPoint:
 
@@ -2914,6 +3171,8 @@ Set a switch point in the schedule.
 
 :param id: The unique identifier of the schedule value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :param hours: The hours part of the time when the switch point will trigger. The time is set using the 24-hour clock, so this value must be between 0 and 23.
 :type hours: int
 :param minutes: The minutes part of the time when the switch point will trigger.  This value must be between 0 and 59.
@@ -2925,12 +3184,13 @@ Set a switch point in the schedule.
 :see: removeSwitchPoint_, clearSwitchPoints_, getSwitchPoint_, getNumSwitchPoints_
 
         '''
-        if values_map.find(id) != values_map.end():
-            return self.manager.SetSwitchPoint(values_map.at(id), hours, minutes, setback)
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            return self.manager.SetSwitchPoint(deref(vid), hours, minutes, setback)
         else :
             return False
 
-    def removeSwitchPoint(self, id, hours, minutes):
+    def removeSwitchPoint(self, id, hours, minutes, homeid=None):
         '''
 .. _removeSwitchPoint:
 
@@ -2938,6 +3198,8 @@ Remove a switch point from the schedule
 
 :param id: The unique identifier of the schedule value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :param hours: The hours part of the time when the switch point will trigger.  The time is set using the 24-hour clock, so this value must be between 0 and 23.
 :type hours: int
 :param minutes: The minutes part of the time when the switch point will trigger.  This value must be between 0 and 59.
@@ -2947,12 +3209,13 @@ Remove a switch point from the schedule
 :see: setSwitchPoint_, clearSwitchPoints_, getSwitchPoint_, getNumSwitchPoints_
 
         '''
-        if values_map.find(id) != values_map.end():
-            return self.manager.RemoveSwitchPoint(values_map.at(id), hours, minutes)
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            return self.manager.RemoveSwitchPoint(deref(vid), hours, minutes)
         else :
             return False
 
-    def clearSwitchPoints(self, id):
+    def clearSwitchPoints(self, id, homeid=None):
         '''
 .. _clearSwitchPoints:
 
@@ -2960,15 +3223,18 @@ Clears all switch points from the schedule
 
 :param id: The unique identifier of the schedule value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: True if all switch points are clear.
 :rtype: bool
 :see: setSwitchPoint_, removeSwitchPoint_, getSwitchPoint_, getNumSwitchPoints_
 
         '''
-        if values_map.find(id) != values_map.end():
-            self.manager.ClearSwitchPoints(values_map.at(id))
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            self.manager.ClearSwitchPoints(deref(vid))
 
-    def getSwitchPoint(self, id, idx, hours, minutes, setback):
+    def getSwitchPoint(self, id, idx, hours, minutes, setback, homeid=None):
         '''
 .. _getSwitchPoint:
 
@@ -2976,6 +3242,8 @@ Gets switch point data from the schedule
 
 :param id: The unique identifier of the schedule value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :param idx: The index of the switch point, between zero and one less than the value returned by GetNumSwitchPoints.
 :type idx: int
 :param hours: An integer that will be filled with the hours part of the switch point data.
@@ -2989,11 +3257,12 @@ Gets switch point data from the schedule
 :see: setSwitchPoint_, removeSwitchPoint_, clearSwitchPoints_, getNumSwitchPoints_
 
         '''
+        cdef ValueID* vid = findValueId(id, homeid)
         cdef uint8_t ohours
         cdef uint8_t ominutes
         cdef int8_t osetback
-        if values_map.find(id) != values_map.end():
-            ret=self.manager.GetSwitchPoint(values_map.at(id), idx, \
+        if vid != NULL:
+            ret=self.manager.GetSwitchPoint(deref(vid), idx, \
                 &ohours, &ominutes, &osetback)
             if ret :
                 hours = ohours
@@ -3004,7 +3273,7 @@ Gets switch point data from the schedule
             return False
 #        return False
 
-    def getNumSwitchPoints(self, id):
+    def getNumSwitchPoints(self, id, homeid=None):
         '''
 .. _getNumSwitchPoints:
 
@@ -3012,13 +3281,16 @@ Get the number of switch points defined in a schedule
 
 :param id: The unique identifier of the schedule value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: The number of switch points defined in this schedule.  Returns zero if the value is not a ValueID::ValueType_Schedule. The type can be tested with a call to ValueID::GetType.
 :rtype: int
 :see: setSwitchPoint_, removeSwitchPoint_, clearSwitchPoints_, getSwitchPoint_
 
         '''
-        if values_map.find(id) != values_map.end():
-            return self.manager.GetNumSwitchPoints(values_map.at(id))
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            return self.manager.GetNumSwitchPoints(deref(vid))
         else :
             return 0
 
@@ -3342,6 +3614,37 @@ Remove a notification watcher.
         else:
             self._watcherCallback = None
 
+    def setNotificationTiming(self, enabled):
+        '''
+.. _setNotificationTiming:
+
+Add timestamps to the notifications.
+
+When enabled, the notifications sent to the watcher contain a 'timing' key :
+a tuple (entry, built) of timeit.default_timer() values taken when the callback
+is entered and when the dict of the notification is built.
+
+:param enabled: True to add the timestamps
+:type enabled: bool
+:see: getNotificationTiming_
+
+        '''
+        global notif_timing
+        notif_timing = enabled
+
+    def getNotificationTiming(self):
+        '''
+.. _getNotificationTiming:
+
+Check if timestamps are added to the notifications.
+
+:return: True if the timestamps are added
+:rtype: bool
+:see: setNotificationTiming_
+
+        '''
+        return notif_timing
+
 
 #
 # -----------------------------------------------------------------------------
@@ -3363,7 +3666,7 @@ controller becomes a primary controller ready to add devices to a new network.
 :see: softResetController_
 
         '''
-        values_map.clear()
+        values_map.erase(<uint32_t>homeid)
         self.manager.ResetController(homeid)
 
     def softResetController(self, homeid):
@@ -3641,7 +3944,7 @@ sceneGetValues_, removeAllScenes_
         return ret
 
 
-    def addSceneValue(self, uint8_t sceneid, id, value):
+    def addSceneValue(self, uint8_t sceneid, id, value, homeid=None):
         '''
 .. _addSceneValue:
 
@@ -3653,6 +3956,8 @@ Actually I don't know how to use it :)
 :type sceneid: int
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :param value: The value to set
 :type value: bool, int, float, string
 :return: An integer representing the result of the operation
@@ -3665,6 +3970,7 @@ createScene_, removeScene_, activateScene_, getSceneLabel_, setSceneLabel_, \
 removeSceneValue_, setSceneValue_, sceneGetValues_
 
         '''
+        cdef ValueID* vid = findValueId(id, homeid)
         cdef float type_float
         cdef bool type_bool
         cdef uint8_t type_byte
@@ -3672,43 +3978,43 @@ removeSceneValue_, setSceneValue_, sceneGetValues_
         cdef int16_t type_short
         cdef string type_string
         ret = 2
-        if values_map.find(id) != values_map.end():
-            datatype = PyValueTypes[values_map.at(id).GetType()]
+        if vid != NULL:
+            datatype = PyValueTypes[deref(vid).GetType()]
             if datatype == "Bool":
                 type_bool = value
-                cret = self.manager.AddSceneValue(sceneid, values_map.at(id), type_bool)
+                cret = self.manager.AddSceneValue(sceneid, deref(vid), type_bool)
                 ret = 1 if cret else 0
             elif datatype == "Byte":
                 type_byte = value
-                cret = self.manager.AddSceneValue(sceneid, values_map.at(id), type_byte)
+                cret = self.manager.AddSceneValue(sceneid, deref(vid), type_byte)
                 ret = 1 if cret else 0
             elif datatype == "Decimal":
                 type_float = value
-                cret = self.manager.AddSceneValue(sceneid, values_map.at(id), type_float)
+                cret = self.manager.AddSceneValue(sceneid, deref(vid), type_float)
                 ret = 1 if cret else 0
             elif datatype == "Int":
                 type_int = value
-                cret = self.manager.AddSceneValue(sceneid, values_map.at(id), type_int)
+                cret = self.manager.AddSceneValue(sceneid, deref(vid), type_int)
                 ret = 1 if cret else 0
             elif datatype == "Short":
                 type_short = value
-                cret = self.manager.AddSceneValue(sceneid, values_map.at(id), type_short)
+                cret = self.manager.AddSceneValue(sceneid, deref(vid), type_short)
                 ret = 1 if cret else 0
             elif datatype == "String":
                 type_string = string(value)
-                cret = self.manager.AddSceneValue(sceneid, values_map.at(id), type_string)
+                cret = self.manager.AddSceneValue(sceneid, deref(vid), type_string)
                 ret = 1 if cret else 0
             elif datatype == "Button":
                 type_bool = value
-                cret = self.manager.AddSceneValue(sceneid, values_map.at(id), type_bool)
+                cret = self.manager.AddSceneValue(sceneid, deref(vid), type_bool)
                 ret = 1 if cret else 0
             elif datatype == "List":
                 type_string = string(value)
-                cret = self.manager.AddSceneValueListSelection(sceneid, values_map.at(id), type_string)
+                cret = self.manager.AddSceneValueListSelection(sceneid, deref(vid), type_string)
                 ret = 1 if cret else 0
         return ret
 
-    def removeSceneValue(self, uint8_t sceneid, id):
+    def removeSceneValue(self, uint8_t sceneid, id, homeid=None):
         '''
 .. _removeSceneValue:
 
@@ -3718,6 +4024,8 @@ Remove the Value ID from an existing scene.
 :type sceneid: int
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :return: True if succee. False otherwise
 :rtype: bool
 :see: getNumScenes_, getAllScenes_, sceneExists_, removeAllScenes_, \
@@ -3726,11 +4034,12 @@ getSceneLabel_, setSceneLabel_, removeSceneValue_, setSceneValue_, \
 sceneGetValues_
 
         '''
-        if values_map.find(id) != values_map.end():
-            return self.manager.RemoveSceneValue(sceneid, values_map.at(id))
+        cdef ValueID* vid = findValueId(id, homeid)
+        if vid != NULL:
+            return self.manager.RemoveSceneValue(sceneid, deref(vid))
         return False
 
-    def setSceneValue(self, uint8_t sceneid, id, value):
+    def setSceneValue(self, uint8_t sceneid, id, value, homeid=None):
         '''
 .. _setSceneValue:
 
@@ -3740,6 +4049,8 @@ Set a value to an existing scene's ValueID.
 :type sceneid: int
 :param id: The ID of a value.
 :type id: int
+:param homeid: The home id of the value. Needed when several controllers are used
+:type homeid: int
 :param value: The value to set
 :type value: bool, int, float, string
 :return: An integer representing the result of the operation
@@ -3753,6 +4064,7 @@ getSceneLabel_, setSceneLabel_, removeSceneValue_, addSceneValue_, \
 sceneGetValues_
 
         '''
+        cdef ValueID* vid = findValueId(id, homeid)
         cdef float type_float
         cdef bool type_bool
         cdef uint8_t type_byte
@@ -3760,39 +4072,39 @@ sceneGetValues_
         cdef int16_t type_short
         cdef string type_string
         ret = 2
-        if values_map.find(id) != values_map.end():
-            datatype = PyValueTypes[values_map.at(id).GetType()]
+        if vid != NULL:
+            datatype = PyValueTypes[deref(vid).GetType()]
             if datatype == "Bool":
                 type_bool = value
-                cret = self.manager.SetSceneValue(sceneid, values_map.at(id), type_bool)
+                cret = self.manager.SetSceneValue(sceneid, deref(vid), type_bool)
                 ret = 1 if cret else 0
             elif datatype == "Byte":
                 type_byte = value
-                cret = self.manager.SetSceneValue(sceneid, values_map.at(id), type_byte)
+                cret = self.manager.SetSceneValue(sceneid, deref(vid), type_byte)
                 ret = 1 if cret else 0
             elif datatype == "Decimal":
                 type_float = value
-                cret = self.manager.SetSceneValue(sceneid, values_map.at(id), type_float)
+                cret = self.manager.SetSceneValue(sceneid, deref(vid), type_float)
                 ret = 1 if cret else 0
             elif datatype == "Int":
                 type_int = value
-                cret = self.manager.SetSceneValue(sceneid, values_map.at(id), type_int)
+                cret = self.manager.SetSceneValue(sceneid, deref(vid), type_int)
                 ret = 1 if cret else 0
             elif datatype == "Short":
                 type_short = value
-                cret = self.manager.SetSceneValue(sceneid, values_map.at(id), type_short)
+                cret = self.manager.SetSceneValue(sceneid, deref(vid), type_short)
                 ret = 1 if cret else 0
             elif datatype == "String":
                 type_string = string(value)
-                cret = self.manager.SetSceneValue(sceneid, values_map.at(id), type_string)
+                cret = self.manager.SetSceneValue(sceneid, deref(vid), type_string)
                 ret = 1 if cret else 0
             elif datatype == "Button":
                 type_bool = value
-                cret = self.manager.SetSceneValue(sceneid, values_map.at(id), type_bool)
+                cret = self.manager.SetSceneValue(sceneid, deref(vid), type_bool)
                 ret = 1 if cret else 0
             elif datatype == "List":
                 type_string = string(value)
-                cret = self.manager.SetSceneValueListSelection(sceneid, values_map.at(id), type_string)
+                cret = self.manager.SetSceneValueListSelection(sceneid, deref(vid), type_string)
                 ret = 1 if cret else 0
         return ret
 
@@ -16,6 +16,8 @@ You should have received a copy of the GNU General Public License
 along with python-openzwave. If not, see http://www.gnu.org/licenses.
 
 """
+from libc.stdint cimport uint8_t
+
 #stdlib uint32_t
 #ctypedef unsigned int uint32_t
 #stdlib uint64_t
@@ -51,3 +53,11 @@ cdef extern from "<new>" namespace "std":
     void delete(void* ptr)
 #    void* new[](size_t size)
 #    void delete[](void* ptr)
+
+#The arrays returned by the manager (GetNodeNeighbors, GetValueAsRaw, ...)
+#are allocated with new uint8[] : they must be released with delete[]
+cdef extern from *:
+    """
+    static inline void delete_uint8_array(uint8_t* p) { delete[] p; }
+    """
+    void delete_uint8_array(uint8_t* p)
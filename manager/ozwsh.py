@@ -9,6 +9,8 @@ __author__ = 'bibi21000'
 from select import select
 import sys
 import os
+import time
+import threading
 import urwid
 from urwid.raw_display import Screen
 #import headerpanel
@@ -204,6 +206,45 @@ class MainWindow(Screen):
         self.loop = urwid.MainLoop(self.frame, \
             self._palette, \
             unhandled_input=self._unhandled_input)
+        self._define_redraw()
+
+    def _define_redraw(self, max_fps=10):
+        """
+        Redraws are asked by the notification thread and done by the main loop.
+        During notification storms, they are limited to max_fps by second.
+
+        """
+        self.max_fps = max_fps
+        self._redraw_lock = threading.Lock()
+        self._redraw_pending = False
+        self._redraw_last = 0
+        self._redraw_pipe = self.loop.watch_pipe(self._redraw_wakeup)
+
+    def request_redraw(self):
+        """
+        Ask for a redraw of the screen. Can be called from any thread.
+        Many requests before the redraw lead to only one redraw.
+
+        """
+        with self._redraw_lock:
+            if self._redraw_pending:
+                return
+            self._redraw_pending = True
+        os.write(self._redraw_pipe, b'r')
+
+    def _redraw_wakeup(self, data):
+        delay = self._redraw_last + 1.0 / self.max_fps - time.time()
+        if delay > 0:
+            self.loop.set_alarm_in(delay, self._redraw)
+        else:
+            self._redraw()
+        return True
+
+    def _redraw(self, loop=None, user_data=None):
+        with self._redraw_lock:
+            self._redraw_pending = False
+        self._redraw_last = time.time()
+        self.loop.draw_screen()
 
     @property
     def active_box(self):
@@ -224,6 +265,8 @@ class MainWindow(Screen):
 
         """
         self._active_box = value
+        if self._active_box.walker.dirty:
+            self._active_box.walker.refresh()
         self.frame.set_body(self._active_box)
         self.header_bar.update(self._active_box.walker.fullpath())
 
@@ -551,18 +594,18 @@ class MainWindow(Screen):
         dispatcher.connect(self._louie_ctrl_message, ZWaveController.SIGNAL_CONTROLLER)
 
     def _louie_node_update(self, network, node):
-        self.loop.draw_screen()
+        self.request_redraw()
 
     def _louie_value_update(self, network, node, value):
-        self.loop.draw_screen()
+        self.request_redraw()
 
     def _louie_group(self, network, node):
-        self.loop.draw_screen()
+        self.request_redraw()
 
     def _louie_ctrl_message(self, state, message, network, controller):
         #self.status_bar.update(status='Message from controller: %s : %s' % (state,message))
         self.status_bar.update(status='Message from controller: %s' % (message))
-        self.loop.draw_screen()
+        self.request_redraw()
 
 window = None
 def main():
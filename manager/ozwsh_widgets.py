@@ -33,6 +33,18 @@ import logging
 
 #logger = logging.getLogger('openzwave')
 
+#Number of rows built at once when they become visible
+PAGE_SIZE = 20
+
+class LazyLine(object):
+    """
+    A row of a listing which is built when it becomes visible
+    """
+    def __init__(self, key):
+        self.key = key
+        self.id = key
+        self.selected = False
+
 class OldestTree(urwid.ListWalker):
 
     def __init__(self, window, parent=None, widget_box=None):
@@ -45,6 +57,10 @@ class OldestTree(urwid.ListWalker):
         self.definition = None
         self.key = None
         self.lines = []
+        self.rows = {}
+        self.positions = {}
+        self.row_cache = {}
+        self.dirty = False
         self.focus, oldfocus = (0, 0)
         self.size = 0
 
@@ -55,6 +71,8 @@ class OldestTree(urwid.ListWalker):
 
     def _get_at_pos(self, pos):
         if pos >= 0 and pos < self.size and len(self.lines)>0:
+            if isinstance(self.lines[pos], LazyLine):
+                self.build_page(pos)
             return self.lines[pos], pos
         else:
             return None, None
@@ -70,7 +88,7 @@ class OldestTree(urwid.ListWalker):
         return self._get_at_pos(self.focus)
 
     def get_focus_entry(self):
-        return self.lines[self.focus]
+        return self._get_at_pos(self.focus)[0]
 
     def set_focus(self, focus):
         if self.focus != focus:
@@ -123,10 +141,81 @@ class OldestTree(urwid.ListWalker):
         self._modified()
 
     def refresh(self):
+        self.dirty = False
         self.read_lines()
         self.show_help()
         self._modified()
 
+    def is_visible(self):
+        """
+        Is the walker displayed on screen
+        """
+        return self.window.active_box is self.widget_box
+
+    def add_lazy_row(self, key):
+        """
+        Add a row to the listing. It will be built by build_row when it becomes visible.
+        """
+        self.positions[key] = len(self.lines)
+        self.lines.append(LazyLine(key))
+        self.size += 1
+
+    def build_page(self, pos):
+        """
+        Build the lazy rows of the page of pos
+        """
+        start = pos - pos % PAGE_SIZE
+        for i in range(start, min(start + PAGE_SIZE, len(self.lines))):
+            if isinstance(self.lines[i], LazyLine):
+                key = self.lines[i].key
+                self.lines[i] = self.build_row(key)
+                self.rows[key] = self.lines[i]
+
+    def row_fields(self, key):
+        """
+        The fields of a row, from the cache or from read_row_fields
+        """
+        if key not in self.row_cache:
+            self.row_cache[key] = self.read_row_fields(key)
+        return self.row_cache[key]
+
+    def read_row_fields(self, key):
+        """
+        Read the fields of a row from the network. Must be overloaded
+        """
+        return ()
+
+    def build_row(self, key):
+        """
+        Build the widget of a row. Must be overloaded
+        """
+        return urwid.Text("%s" % key)
+
+    def clear_rows(self):
+        """
+        Forget the rows of the listing but not their cached fields
+        """
+        self.rows = {}
+        self.positions = {}
+
+    def update_row(self, key):
+        """
+        Read the fields of the row of key again and update it if it is built.
+        Return False if there is no row for key : the lines must be read again.
+        """
+        self.row_cache.pop(key, None)
+        if key not in self.positions:
+            return False
+        if key in self.rows:
+            row = self.rows[key]
+            if hasattr(row, 'update'):
+                row.update(*self.row_fields(key))
+            else:
+                self.lines[self.positions[key]] = self.build_row(key)
+                self.rows[key] = self.lines[self.positions[key]]
+            self._modified()
+        return True
+
     def get_selected(self):
         ret = []
         for x in self.lines:
@@ -394,9 +483,12 @@ class GroupsTree(OldestTree):
         self.window.log.info("GroupsTree _louie_network_ready")
 
     def _louie_node_update(self, network, node):
-        self.window.log.info("GroupsTree _louie_node_update")
+        if node is None or node.node_id != self.node_id:
+            return
+        if not self.is_visible():
+            self.dirty = True
+            return
         self.refresh()
-        self.window.log.info("GroupsTree _louie_node_update")
 
     def read_lines(self):
         self.size = 0
@@ -407,6 +499,8 @@ class GroupsTree(OldestTree):
         self.show_directories()
         self.lines.append(self.groups_header.get_header())
         self.size += 1
+        self.clear_rows()
+        self.row_cache = {}
         groups = self.window.network.nodes[self.node_id].groups
         self.window.log.info("GroupsTree groups=%s" % groups)
         for group in groups :
@@ -414,12 +508,17 @@ class GroupsTree(OldestTree):
             self.lines.append(urwid.Text(    "      %s:%s" % (groups[group].index,groups[group].label), align='left'))
             self.size += 1
             for assoc in groups[group].associations:
-                self.lines.append(AssociationItem(assoc, \
-                    self.window.network.nodes[assoc].name
-                    ))
-                self.size += 1
+                self.add_lazy_row((group, assoc))
         self._modified()
 
+    def read_row_fields(self, key):
+        group, assoc = key
+        return (self.window.network.nodes[assoc].name if assoc in self.window.network.nodes else None, )
+
+    def build_row(self, key):
+        group, assoc = key
+        return AssociationItem(assoc, *self.row_fields(key))
+
     def exist(self, directory):
         """
         List directory content
@@ -524,6 +623,9 @@ class RootTree(OldestTree):
 
     def _louie_network_ready(self, network):
         self.window.log.info("RootTree _louie_network_ready")
+        if not self.is_visible():
+            self.dirty = True
+            return
         self.refresh()
         self.window.log.info("RootTree _louie_network_ready")
 
@@ -672,26 +774,40 @@ class NodesTree(OldestTree):
         #dispatcher.connect(self._louie_node_update, ZWaveNetwork.SIGNAL_NODE_REMOVED)
 
     def _louie_node_update(self, network, node):
-        self.refresh()
+        if node is not None:
+            self.row_cache.pop(node.node_id, None)
+        if not self.is_visible():
+            self.dirty = True
+            return
+        if node is None or network.nodes is None or len(self.positions) != len(network.nodes) \
+          or node.node_id not in network.nodes \
+          or not self.update_row(node.node_id):
+            self.refresh()
+
+    def read_row_fields(self, node_id):
+        node = self.window.network.nodes[node_id]
+        return (node.name, \
+                node.location, \
+                node.max_baud_rate, \
+                node.get_battery_level(), \
+                node.isNodeAwake(), \
+                )
+
+    def build_row(self, node_id):
+        return NodesItem(node_id, *self.row_fields(node_id))
 
     def read_lines(self):
         self.size = 0
         #self.focus, self.oldfocus = self.oldfocus, self.focus
         self.lines = []
+        self.clear_rows()
         if self.window.network == None:
             return
         self.show_directories()
         self.lines.append(self.node_header.get_header())
         self.size += 1
         for node in self.window.network.nodes:
-            self.lines.append(NodesItem(self.window.network.nodes[node].node_id, \
-                self.window.network.nodes[node].name, \
-                self.window.network.nodes[node].location, \
-                self.window.network.nodes[node].max_baud_rate, \
-                self.window.network.nodes[node].get_battery_level(), \
-                self.window.network.nodes[node].isNodeAwake(), \
-                ))
-            self.size += 1
+            self.add_lazy_row(node)
         self._modified()
 
     def exist(self, directory):
@@ -770,18 +886,20 @@ class NodesItem (urwid.WidgetWrap):
     def __init__ (self, id=0, name=None, location=None, signal=0, battery_level=-1, awaked=False):
         self.id = id
         #self.content = 'item %s: %s - %s...' % (str(id), name[:20], product_name[:20] )
+        self.fields = [urwid.Text('%s' % field, wrap='clip') \
+            for field in (name, location, signal, battery_level, awaked)]
         self.item = [
             ('fixed', 15, urwid.Padding(
                 urwid.AttrWrap(urwid.Text('%s' % str(id), wrap='clip'), 'body', 'focus'), left=2)),
-                urwid.AttrWrap(urwid.Text('%s' % name, wrap='clip'), 'body'),
-                urwid.AttrWrap(urwid.Text('%s' % location, wrap='clip'), 'body'),
-                urwid.AttrWrap(urwid.Text('%s' % signal, wrap='clip'), 'body'),
-                urwid.AttrWrap(urwid.Text('%s' % battery_level, wrap='clip'), 'body'),
-                urwid.AttrWrap(urwid.Text('%s' % awaked, wrap='clip'), 'body'),
-        ]
+        ] + [urwid.AttrWrap(field, 'body') for field in self.fields]
         w = urwid.Columns(self.item, dividechars=1 )
         self.__super.__init__(w)
 
+    def update (self, name=None, location=None, signal=0, battery_level=-1, awaked=False):
+        for field, data in zip(self.fields, (name, location, signal, battery_level, awaked)):
+            if field.text != '%s' % data:
+                field.set_text('%s' % data)
+
     def get_header (self):
         self.item = [
             ('fixed', 15, urwid.Padding(
@@ -851,6 +969,11 @@ class NodeTree(OldestTree):
         self.window.log.info("NodeTree _louie_network_ready")
 
     def _louie_node_update(self, network, node):
+        if node is None or node.node_id != self.key:
+            return
+        if not self.is_visible():
+            self.dirty = True
+            return
         self.refresh()
 
     def set(self, param, value):
@@ -1225,34 +1348,60 @@ class ValuesTree(OldestTree):
         self.window.log.info('ValuesTree _louie_network_resetted.')
 
     def _louie_value_update(self, network, node, value):
-        self.window.log.info("ValuesTree _louie_value_update")
-        self.refresh()
-        self.window.log.info("ValuesTree _louie_value_update")
+        if value is not None:
+            self.row_cache.pop(value.value_id, None)
+        if node is None or node.node_id != self.node_id:
+            return
+        if not self.is_visible():
+            self.dirty = True
+            return
+        if not self.update_row(value.value_id) and \
+          (self.key == 'All' or self._genre(value) == self.key):
+            self.refresh()
+
+    def _genre(self, value):
+        return value.get_cached('genre') or value.genre
+
+    def read_row_fields(self, value_id):
+        value = self.window.network.nodes[self.node_id].values[value_id]
+        data = value.get_cached('value')
+        read_only = value.get_cached('readOnly')
+        return (value.get_cached('label') or value.label, \
+                value.help, \
+                data if data is not None else value.data, \
+                value.get_cached('type') or value.type, \
+                value.data_items, \
+                read_only if read_only is not None else value.is_read_only, \
+                value.is_polled, \
+                )
+
+    def build_row(self, value_id):
+        return ValuesItem(value_id, *self.row_fields(value_id))
 
     def read_lines(self):
         self.size = 0
         #self.focus, self.oldfocus = self.oldfocus, self.focus
         self.lines = []
+        self.clear_rows()
         if self.window.network == None or self.node_id == None:
             return
         self.show_directories()
         self.lines.append(self.value_header.get_header())
         self.size += 1
-        values = self.window.network.nodes[self.node_id].get_values_by_command_classes(genre=self.key)
-        for cmd in values :
-            self.lines.append(urwid.Text(    "      %s" % (self.window.network.nodes[self.node_id].get_command_class_as_string(cmd)), align='left'))
+        node = self.window.network.nodes[self.node_id]
+        values = dict()
+        for value in node.values.values():
+            if self.key != 'All' and self._genre(value) != self.key:
+                continue
+            cmd = value.get_cached('commandClass') or node.get_command_class_as_string(value.command_class)
+            if cmd not in values:
+                values[cmd] = []
+            values[cmd].append(value.value_id)
+        for cmd in sorted(values.keys()):
+            self.lines.append(urwid.Text(    "      %s" % (cmd), align='left'))
             self.size += 1
-            for val in values[cmd]:
-                self.lines.append(ValuesItem(values[cmd][val].value_id, \
-                    values[cmd][val].label, \
-                    values[cmd][val].help, \
-                    values[cmd][val].data, \
-                    values[cmd][val].type, \
-                    values[cmd][val].data_items, \
-                    values[cmd][val].is_read_only, \
-                    values[cmd][val].is_polled, \
-                    ))
-                self.size += 1
+            for val in sorted(values[cmd]):
+                self.add_lazy_row(val)
         self._modified()
 
     def exist(self, directory):
@@ -1470,9 +1619,15 @@ class SwitchesTree(OldestTree):
         dispatcher.connect(self._louie_node_update, ZWaveNetwork.SIGNAL_NODE)
 
     def _louie_value_update(self, network, node, value):
+        if not self.is_visible():
+            self.dirty = True
+            return
         self.refresh()
 
     def _louie_node_update(self, network, node):
+        if not self.is_visible():
+            self.dirty = True
+            return
         self.refresh()
 
     def read_lines(self):
@@ -1600,9 +1755,15 @@ class DimmersTree(OldestTree):
         dispatcher.connect(self._louie_node_update, ZWaveNetwork.SIGNAL_NODE)
 
     def _louie_value_update(self, network, node, value):
+        if not self.is_visible():
+            self.dirty = True
+            return
         self.refresh()
 
     def _louie_node_update(self, network, node):
+        if not self.is_visible():
+            self.dirty = True
+            return
         self.refresh()
 
     def read_lines(self):
@@ -1767,9 +1928,15 @@ class SensorsTree(OldestTree):
         dispatcher.connect(self._louie_node_update, ZWaveNetwork.SIGNAL_NODE)
 
     def _louie_value_update(self, network, node, value):
+        if not self.is_visible():
+            self.dirty = True
+            return
         self.refresh()
 
     def _louie_node_update(self, network, node):
+        if not self.is_visible():
+            self.dirty = True
+            return
         self.refresh()
 
     def read_lines(self):
@@ -46,10 +46,20 @@ from openzwave.value import ZWaveValue
 from openzwave.scene import ZWaveScene
 from openzwave.controller import ZWaveController
 from openzwave.network import ZWaveNetwork
+from openzwave.history import ZWaveValueHistory
+from openzwave.aggregate import ZWaveAggregate
+from openzwave.store import ZWaveValueStore, ZWaveStoreReader
+from openzwave.router import ZWaveManagerRouter
+from openzwave.shared import ZWaveSharedTable, ZWaveSharedReader
+from openzwave.gateway import ZWaveGateway, ZWaveGatewayClient
 from openzwave.option import ZWaveOption
 from louie import dispatcher, All
 import time
+import json
+import tempfile
+import shutil
 import unittest
+from StringIO import StringIO
 
 class WaitTestCase(unittest.TestCase):
 
@@ -100,6 +110,310 @@ class NetworkTestCase(WaitTestCase):
         myval = "a_bad-id"
         self.assertTrue(network.get_value_from_id_on_network(myval)==None)
 
+    def test_300_network_export(self):
+        stream = StringIO()
+        count = network.export(stream)
+        lines = stream.getvalue().splitlines()
+        self.assertTrue(count == len(lines))
+        self.assertTrue(json.loads(lines[0])['record'] == 'network')
+        nodes = [ json.loads(line) for line in lines if json.loads(line)['record'] == 'node' ]
+        self.assertTrue(len(nodes) == network.nodes_count)
+
+    def test_310_network_export_fields(self):
+        for record in network.iter_records(node_fields=['node_id'], value_fields=['value_id', 'data']):
+            if record['record'] == 'value':
+                self.assertTrue(sorted(record.keys()) == ['data', 'record', 'value_id'])
+            elif record['record'] == 'node':
+                self.assertTrue(sorted(record.keys()) == ['node_id', 'record'])
+
+    def test_320_network_changes_since(self):
+        seq = network.change_seq
+        changes = network.changes_since(seq)
+        self.assertTrue(changes['seq'] == seq)
+        self.assertTrue(changes['reset'] == False)
+        self.assertTrue(changes['changes'] == [])
+        self.assertTrue(network.changes_since(seq + 1)['reset'] == True)
+
+    def test_330_network_subscribe(self):
+        subscriber = network.subscribe(lambda value : None, [ZWaveNetwork.SIGNAL_VALUE_CHANGED], maxsize=16, policy='coalesce', name='test')
+        self.assertTrue(subscriber in network.subscribers)
+        self.assertTrue(subscriber.stats['name'] == 'test')
+        network.unsubscribe(subscriber)
+        self.assertTrue(subscriber not in network.subscribers)
+
+    def test_340_network_timings(self):
+        network.enable_timings()
+        self.assertTrue(network.manager.getNotificationTiming() == True)
+        network.controller.node.refresh_info()
+        time.sleep(2.0)
+        network.enable_timings(False)
+        self.assertTrue(network.manager.getNotificationTiming() == False)
+        self.assertTrue(type(network.timings.stats()) == type(dict()))
+        out = StringIO()
+        network.dump_timings(out)
+        self.assertTrue(len(out.getvalue()) > 0)
+
+    def test_350_value_history(self):
+        history = ZWaveValueHistory(4, 'l')
+        for i in range(6):
+            history.append(float(i), i)
+        self.assertTrue(len(history) == 4)
+        self.assertTrue(history[0] == (2.0, 2))
+        self.assertTrue(history[-1] == (5.0, 5))
+        times, data = history.since(3.0)
+        self.assertTrue(list(data) == [4, 5])
+        self.assertTrue(type(network.export_histories()) == type(dict()))
+
+    def test_360_value_aggregate(self):
+        aggregate = ZWaveAggregate(periods=(60, 3600), units='W')
+        for timestamp in range(0, 7201, 30):
+            aggregate.update(float(timestamp), 1000.0)
+        hour = aggregate.to_dict(now=7210.0)[3600]['previous']
+        self.assertTrue(hour['count'] == 120)
+        self.assertTrue(abs(hour['energy'] - 1.0) < 0.0001)
+        self.assertTrue(type(network.get_aggregates()) == type(dict()))
+
+    def test_370_value_store(self):
+        path = tempfile.mkdtemp()
+        try:
+            store = ZWaveValueStore(path, segment_records=10)
+            store.start()
+            for i in range(25):
+                store.put(1000.0 + i, 1, float(i))
+            store.put(1030.0, 2, True)
+            store.stop()
+            reader = ZWaveStoreReader(path)
+            self.assertTrue(reader.count() == 26)
+            self.assertTrue(len(list(reader.range(1))) == 25)
+            self.assertTrue(list(reader.range(1, start=1020.0, stop=1022.0)) == [(1020.0, 1, 20.0), (1021.0, 1, 21.0)])
+            self.assertTrue(list(reader.range(2)) == [(1030.0, 2, True)])
+        finally:
+            shutil.rmtree(path)
+
+    def test_380_router(self):
+        class FakeOptions(object):
+            def __init__(self, device):
+                self.device = device
+        class FakeNetwork(object):
+            def __init__(self, device):
+                self._options = FakeOptions(device)
+                self.received = []
+            def zwcallback(self, args):
+                self.received.append(args)
+        router = ZWaveManagerRouter(network.manager)
+        first = FakeNetwork('/dev/none')
+        second = FakeNetwork(network.controller.device)
+        third = FakeNetwork('/dev/none')
+        router.add_network(first)
+        router.add_network(second)
+        router.add_network(third)
+        try:
+            #Matched by the path of the controller, not by the order
+            router._route({'notificationType': 'DriverReady', 'homeId': network.home_id, 'nodeId': 1})
+            router._route({'notificationType': 'NodeAdded', 'homeId': network.home_id, 'nodeId': 5})
+            self.assertTrue(router.networks[network.home_id] is second)
+            #No path for an unknown home id : the oldest one
+            router._route({'notificationType': 'DriverReady', 'homeId': 0x0101, 'nodeId': 1})
+            self.assertTrue(router.networks[0x0101] is first)
+            self.assertTrue(len(first.received) == 1)
+            self.assertTrue(len(second.received) == 2)
+            self.assertTrue(router.pending == [third])
+        finally:
+            router.remove_network(first)
+            router.remove_network(second)
+            router.remove_network(third)
+        self.assertTrue(len(router.networks) == 0)
+
+    def test_390_shared_table(self):
+        path = tempfile.mkdtemp()
+        try:
+            count = sum([len(node.values) for node in network.nodes.values()])
+            table = ZWaveSharedTable(os.path.join(path, 'values'), capacity=count + 1)
+            table.attach(network)
+            reader = ZWaveSharedReader(table.path)
+            self.assertTrue(len(reader.value_ids()) == count)
+            table.put(1, 1, 21.5, label='Temperature', units='C')
+            data = reader.get(1)
+            self.assertTrue(data['data'] == 21.5)
+            self.assertTrue(data['units'] == 'C')
+            version = reader.version(1)
+            table.put(1, 1, 22.0, label='Temperature', units='C')
+            self.assertTrue(reader.version(1) == (version[0] + 1, version[1]))
+            reader.close()
+            table.close()
+        finally:
+            shutil.rmtree(path)
+
+    def test_395_shared_table_raw(self):
+        path = tempfile.mkdtemp()
+        try:
+            table = ZWaveSharedTable(os.path.join(path, 'values'), capacity=4)
+            table.open()
+            reader = ZWaveSharedReader(table.path)
+            self.assertTrue(table.put(1, 2, b'\xff\x00\x10'))
+            self.assertTrue(reader.get(1)['data'] == b'\xff\x00\x10')
+            self.assertTrue(table.put(2, 2, bytearray(b'\x00\x01\x00'), raw=True))
+            self.assertTrue(reader.get(2)['data'] == b'\x00\x01\x00')
+            reader.close()
+            table.close()
+        finally:
+            shutil.rmtree(path)
+
+    def test_400_gateway(self):
+        path = tempfile.mkdtemp()
+        gateway = ZWaveGateway(network, os.path.join(path, 'gateway.sock'))
+        gateway.start()
+        try:
+            client = ZWaveGatewayClient(gateway.path)
+            self.assertTrue(client.network.home_id == network.home_id)
+            node = client.network.nodes[network.controller.node_id]
+            self.assertTrue(node.node_id == network.controller.node_id)
+            batch = client.batch()
+            batch.get(node, 'product_name')
+            batch.call(client.network, 'get_value', 0)
+            self.assertTrue(batch.execute() == [network.controller.node.product_name, None])
+            client.close()
+        finally:
+            gateway.stop()
+            shutil.rmtree(path)
+
+    def test_410_slots(self):
+        node = network.controller.node
+        self.assertFalse(hasattr(node, '__dict__'))
+        for value in node.values.values():
+            self.assertFalse(hasattr(value, '__dict__'))
+        for group in node.groups.values():
+            self.assertFalse(hasattr(group, '__dict__'))
+
+    def test_420_shared_strings(self):
+        self.assertTrue(libopenzwave.internedStrings() > 0)
+        labels = dict()
+        for node in network.nodes.values():
+            for value in node.values.values():
+                label = value.get_cached('label')
+                if label in labels:
+                    self.assertTrue(label is labels[label])
+                labels[label] = label
+
+    def test_430_raw_values(self):
+        for node in network.nodes.values():
+            for value in node.get_values(type='Raw').values():
+                self.assertTrue(value.data is None or type(value.data) == type(b''))
+                if not value.is_read_only:
+                    self.assertTrue(value.check_data(bytearray(b'\x01\x02')) is not None)
+                    self.assertTrue(value.check_data(bytearray(256)) is None)
+
+    def test_440_values_batch(self):
+        node = network.controller.node
+        data = node.get_values_data()
+        self.assertTrue(set(data.keys()) == set(node.values.keys()))
+        value_ids = list(node.values.keys())[:3]
+        data = node.get_values_data(value_ids)
+        for value_id in value_ids:
+            self.assertTrue(data[value_id] == node.values[value_id].data)
+
+    def test_450_topology(self):
+        topology = network.topology
+        topology.invalidate()
+        for node_id in network.nodes:
+            self.assertTrue(network.nodes[node_id].neighbors == network.manager.getNodeNeighbors(network.home_id, node_id))
+        self.assertTrue(topology.refreshes > 0)
+        hops = topology.hops()
+        self.assertTrue(hops[network.controller.node_id] == 0)
+        self.assertTrue(type(topology.articulation_nodes()) == type(set()))
+        self.assertTrue(topology.isolated_nodes() <= set(network.nodes.keys()))
+
+    def test_460_heal_scheduler(self):
+        node_ids = [node_id for node_id in network.nodes if node_id != network.controller.node_id][:2]
+        scheduler = network.heal(node_ids=node_ids, node_timeout=60.0)
+        for i in range(0, 120):
+            if not scheduler.is_running:
+                break
+            time.sleep(1.0)
+        progress = scheduler.progress
+        self.assertTrue(progress['state'] == 'stopped')
+        self.assertTrue(progress['done'] == len(node_ids))
+        for node_id in node_ids:
+            self.assertTrue(progress['nodes'][node_id]['duration'] is not None)
+
+    def test_470_write_filter(self):
+        switch = None
+        for node_id in network.nodes:
+            for value_id in network.nodes[node_id].get_switches():
+                switch = network.nodes[node_id].values[value_id]
+                break
+        self.assertTrue(switch is not None)
+        network.write_filter_age = 3600
+        try:
+            #Not filtered until the device has reported the data
+            switch.last_confirmed = None
+            saved = switch.writes_saved
+            switch.data = switch.get_cached('value')
+            self.assertTrue(switch.writes_saved == saved)
+            switch.refresh()
+            time.sleep(2.0)
+            self.assertTrue(switch.last_confirmed is not None)
+            saved = switch.writes_saved
+            switch.data = switch.get_cached('value')
+            self.assertTrue(switch.writes_saved == saved + 1)
+            self.assertTrue(network.get_writes_saved()[switch.value_id] == switch.writes_saved)
+            switch.write_filter_age = 0
+            switch.data = switch.get_cached('value')
+            self.assertTrue(switch.writes_saved == saved + 1)
+            switch.write_filter_age = None
+            #A write reverting a write in flight is sent
+            switch.refresh()
+            time.sleep(2.0)
+            current = switch.get_cached('value')
+            saved = switch.writes_saved
+            switch.data = not current
+            switch.data = current
+            self.assertTrue(switch.writes_saved == saved)
+            time.sleep(2.0)
+            self.assertTrue(switch.get_cached('value') == current)
+        finally:
+            switch.write_filter_age = None
+            network.write_filter_age = None
+
+    def test_480_fetch_config_params(self):
+        node_ids = [node_id for node_id in network.nodes if node_id != network.controller.node_id][:2]
+        future = network.fetch_config_params(node_ids=node_ids, node_timeout=30.0, timeout=120.0)
+        params = future.result(150.0)
+        self.assertTrue(future.done())
+        self.assertTrue(sorted(params.keys()) == sorted(node_ids))
+        progress = network.config_harvester.progress
+        self.assertTrue(progress['state'] == 'stopped')
+        self.assertTrue(progress['done'] == len(node_ids))
+
+    def test_490_pending_writes(self):
+        switch = None
+        for node_id in network.nodes:
+            if network.nodes[node_id].is_sleeping:
+                continue
+            for value_id in network.nodes[node_id].get_switches():
+                switch = network.nodes[node_id].values[value_id]
+                break
+        self.assertTrue(switch is not None)
+        pending_writes = network.pending_writes
+        self.assertFalse(pending_writes.write(switch, switch.data))
+        self.assertFalse(pending_writes.is_pending(switch.value_id))
+        self.assertTrue(pending_writes.pending(switch.parent_id) == {})
+        self.assertTrue(type(pending_writes.stats) == type(dict()))
+
+    def test_500_associations(self):
+        associations = network.associations
+        for node_id in network.nodes:
+            node = network.nodes[node_id]
+            self.assertTrue(node.groups is node.groups or node.num_groups == 0)
+            for index, group in node.groups.items():
+                self.assertTrue(group.associations == network.manager.getAssociations(network.home_id, node_id, index))
+                for target in group.associations:
+                    self.assertTrue((node_id, index) in associations.controllers(target))
+                    self.assertTrue(associations.is_associated(node_id, target))
+        refreshes = associations.refreshes
+        associations.associations()
+        self.assertTrue(associations.refreshes == refreshes)
+
 class ControllerTestCase(WaitTestCase):
 
     def test_010_controller(self):
@@ -556,6 +870,15 @@ class SceneTestCase(WaitTestCase):
         scene = network.get_scenes()[sceneid]
         self.assertTrue( scene.activate() == True)
 
+    def test_320_scene_activate_changes(self):
+        self.wait_for_queue()
+        global sceneid
+        scene = network.get_scenes()[sceneid]
+        ret = scene.activate_changes(dry_run=True)
+        self.assertTrue(len(ret['sent']) + len(ret['skipped']) + len(ret['failed']) == len(scene.get_values()))
+        ret = scene.activate_changes()
+        self.assertTrue(type(ret['skipped']) == type([]))
+
     def test_410_scene_count(self):
         self.wait_for_queue()
         global count
@@ -691,6 +1014,28 @@ class ControllerCommandTestCase(WaitTestCase):
                 time.sleep(1.0)
         self.assertTrue(current == "Failed")
 
+    def test_310_command_wait_node_neigbhor_update(self):
+        command = network.controller.begin_command_request_node_neigbhor_update(2)
+        self.assertTrue(command)
+        self.assertTrue(command.result(self.max_delay) == "Completed")
+        self.assertTrue(command.states[-1]['state'] == "Completed")
+        self.assertTrue(command.elapsed >= command.states[0]['elapsed'])
+        self.ctrl_command_result = None
+
+    def test_320_command_queued_node_neigbhor_update(self):
+        node_ids = [node_id for node_id in network.nodes if node_id != network.controller.node_id][:2]
+        self.assertTrue(len(node_ids) == 2)
+        first = network.controller.begin_command_request_node_neigbhor_update(node_ids[0])
+        second = network.controller.begin_command_request_node_neigbhor_update(node_ids[1])
+        self.assertTrue(first)
+        self.assertTrue(second)
+        self.assertTrue(network.controller.command is first)
+        self.assertTrue(first.result(self.max_delay) == "Completed")
+        self.assertTrue(second.result(self.max_delay) == "Completed")
+        self.assertTrue(second.states[0]['time'] >= first.states[-1]['time'])
+        self.assertTrue(network.controller.commands == [])
+        self.ctrl_command_result = None
+
 #    def test_910_command_command_replication_send(self):
 #        ret = network.controller.begin_command_replication_send(1)
 #        self.assertTrue(ret)